@@ -7,13 +7,14 @@ from datetime import datetime, timedelta
 import inflection
 from cached_property import cached_property
 
-from module.base.decorator import del_cached_property
+from module.base.decorator import del_cached_property, has_cached_property
 from module.config.config import AzurLaneConfig, TaskEnd
 from module.config.utils import deep_get, deep_set
 from module.exception import *
 from module.logger import logger
 from module.notify import handle_notify
 from module.gg_handler.gg_handler import GGHandler
+from module.ocr.cache import OCR_CACHE
 
 
 class AzurLaneAutoScript:
@@ -32,6 +33,7 @@ class AzurLaneAutoScript:
     def config(self):
         try:
             config = AzurLaneConfig(config_name=self.config_name)
+            config.buffered_update = True
             return config
         except RequestHumanTakeover:
             logger.critical('Request human takeover')
@@ -40,6 +42,14 @@ class AzurLaneAutoScript:
             logger.exception(e)
             exit(1)
 
+    def config_reset(self):
+        """
+        Write buffered config modifications, config will be re-created on next access.
+        """
+        if has_cached_property(self, 'config'):
+            self.config.update_pending()
+        del_cached_property(self, 'config')
+
     @cached_property
     def device(self):
         try:
@@ -143,6 +153,10 @@ class AzurLaneAutoScript:
                 content=f"<{self.config_name}> Exception occured",
             )
             exit(1)
+        finally:
+            # Write config modifications buffered during the task, even if Alas is going to exit
+            if has_cached_property(self, 'config'):
+                self.config.update_pending()
 
     def save_error_log(self):
         """
@@ -158,7 +172,11 @@ class AzurLaneAutoScript:
             folder = f'./log/error/{int(time.time() * 1000)}'
             logger.warning(f'Saving error: {folder}')
             os.mkdir(folder)
-            for data in self.device.screenshot_deque:
+            screenshots = self.device.screenshot_deque
+            logger.info(f'Screenshot deque: {len(screenshots)} screenshots, '
+                        f'{round(screenshots.memory / 1024 / 1024, 1)}MB held, '
+                        f'compression ratio {round(screenshots.compression_ratio, 1)}')
+            for data in screenshots:
                 image_time = datetime.strftime(data['time'], '%Y-%m-%d_%H-%M-%S-%f')
                 image = handle_sensitive_image(data['image'])
                 save_image(image, f'{folder}/{image_time}.png')
@@ -462,7 +480,7 @@ class AzurLaneAutoScript:
                     release_resources()
                     self.device.release_during_wait()
                     if not self.wait_until(task.next_run):
-                        del_cached_property(self, 'config')
+                        self.config_reset()
                         continue
                     self.run('start')
                 elif method == 'goto_main':
@@ -471,21 +489,21 @@ class AzurLaneAutoScript:
                     release_resources()
                     self.device.release_during_wait()
                     if not self.wait_until(task.next_run):
-                        del_cached_property(self, 'config')
+                        self.config_reset()
                         continue
                 elif method == 'stay_there':
                     logger.info('Stay there during wait')
                     release_resources()
                     self.device.release_during_wait()
                     if not self.wait_until(task.next_run):
-                        del_cached_property(self, 'config')
+                        self.config_reset()
                         continue
                 else:
                     logger.warning(f'Invalid Optimization_WhenTaskQueueEmpty: {method}, fallback to stay_there')
                     release_resources()
                     self.device.release_during_wait()
                     if not self.wait_until(task.next_run):
-                        del_cached_property(self, 'config')
+                        self.config_reset()
                         continue
             break
 
@@ -506,6 +524,8 @@ class AzurLaneAutoScript:
         self.gg_check()
         logger.set_file_logger(self.config_name)
         logger.info(f'Start scheduler loop: {self.config_name}')
+        from module.webui.supervisor import supervisor_ready
+        supervisor_ready()
         # Try forced task_call restart to reset GG status
         self.checker.wait_until_available()
         GGHandler(config=self.config, device=self.device).handle_restart_before_tasks()
@@ -524,7 +544,7 @@ class AzurLaneAutoScript:
                 # Sometimes, config won't be updated due to blocking
                 # even though it has been changed
                 # So update it once recovered
-                del_cached_property(self, 'config')
+                self.config_reset()
                 logger.info('Server or network is recovered. Restart game client')
                 self.config.task_call('Restart')
             # Get task
@@ -540,7 +560,7 @@ class AzurLaneAutoScript:
                     from module.handler.login import LoginHandler
                     LoginHandler(self.config, self.device).app_restart()
                 self.config.task_delay(server_update=True)
-                del_cached_property(self, 'config')
+                self.config_reset()
                 continue
 
             # Check GG config before a task begins (to reset temporary config), and decide to enable it.
@@ -549,7 +569,7 @@ class AzurLaneAutoScript:
                 GGHandler(config=self.config, device=self.device).check_then_set_gg_status(inflection.underscore(task))
                 check_fail = 0
             except GameStuckError:
-                del_cached_property(self, 'config')
+                self.config_reset()
                 check_fail += 1
                 if check_fail <= 3:
                     continue
@@ -564,6 +584,8 @@ class AzurLaneAutoScript:
             logger.hr(task, level=0)
             success = self.run(inflection.underscore(task))
             logger.info(f'Scheduler: End task `{task}`')
+            OCR_CACHE.show()
+            OCR_CACHE.counter_clear()
             self.is_first_task = False
 
             # Check failures
@@ -586,11 +608,11 @@ class AzurLaneAutoScript:
                 exit(1)
 
             if success:
-                del_cached_property(self, 'config')
+                self.config_reset()
                 continue
             elif self.config.Error_HandleError:
                 # self.config.task_delay(success=False)
-                del_cached_property(self, 'config')
+                self.config_reset()
                 self.checker.check_now()
                 continue
             else:
@@ -598,5 +620,10 @@ class AzurLaneAutoScript:
 
 
 if __name__ == '__main__':
-    alas = AzurLaneAutoScript()
-    alas.loop()
+    import sys
+    if '--profile-imports' in sys.argv:
+        from dev_tools.import_profile import ImportProfiler
+        ImportProfiler().run()
+    else:
+        alas = AzurLaneAutoScript()
+        alas.loop()
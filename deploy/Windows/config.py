@@ -47,6 +47,7 @@ class ConfigModel:
 
     # Misc
     DiscordRichPresence: bool = False
+    EnableSupervisor: bool = False
 
     # Remote Access
     EnableRemoteAccess: bool = False
@@ -0,0 +1,152 @@
+import importlib
+import json
+import os
+
+import numpy as np
+
+from module.base.asset_bundle import ASSET_BUNDLE, ASSET_BUNDLE_FOLDER, ASSET_BUNDLE_VERSION, bundle_key
+from module.base.button import Button
+from module.base.resource import Resource
+from module.base.template import Template
+from module.config.server import VALID_SERVER
+from module.logger import logger
+
+MODULE_FOLDER = './module'
+# Align images in data file
+ALIGNMENT = 64
+
+
+class AssetBundleBuilder:
+    """
+    Pack all asset images into one memory-mapped bundle, see module/base/asset_bundle.py
+
+    Every server specific Button crop and Template image is stored,
+    together with the binary and luma variants used by match_binary() and match_luma().
+    Run this in the root folder of Alas after assets are updated:
+        python -m dev_tools.asset_bundle
+    Assets modified after building are loaded from files, so an outdated bundle is still safe to use.
+    """
+
+    def __init__(self, folder=ASSET_BUNDLE_FOLDER):
+        self.folder = folder
+        self.entries = {}
+        self.files = {}
+        self.data = []
+        self.offset = 0
+
+    @staticmethod
+    def import_assets():
+        for root, _, files in os.walk(MODULE_FOLDER):
+            if 'assets.py' in files:
+                module = os.path.relpath(os.path.join(root, 'assets'), '.').replace('\\', '/').replace('/', '.')
+                importlib.import_module(module)
+
+    def add(self, file, area, variant, image):
+        """
+        Args:
+            file (str):
+            area (tuple):
+            variant (str):
+            image (np.ndarray, list[np.ndarray]):
+        """
+        if image is None:
+            return
+        key = bundle_key(file, area=area, variant=variant)
+        if key in self.entries:
+            return
+        gif = isinstance(image, list)
+        if gif:
+            if len(set(i.shape for i in image)) != 1:
+                logger.warning(f'Frames in different shape, skip: {key}')
+                return
+            image = np.stack(image)
+        image = np.ascontiguousarray(image)
+
+        self.entries[key] = {
+            'offset': self.offset,
+            'shape': list(image.shape),
+            'dtype': image.dtype.str,
+            'gif': gif,
+        }
+        data = image.tobytes()
+        padding = -len(data) % ALIGNMENT
+        self.data.append(data + b'\x00' * padding)
+        self.offset += len(data) + padding
+
+        if file not in self.files:
+            stat = os.stat(file)
+            self.files[file] = [stat.st_mtime_ns, stat.st_size]
+
+    def add_button(self, button, server):
+        """
+        Args:
+            button (Button):
+            server (str):
+        """
+        file = button.parse_property(button.raw_file, server)
+        area = button.parse_property(button.raw_area, server)
+        button = Button(area=area, color=(), button=area, file=file)
+        button.ensure_template()
+        self.add(file, area, 'image', button.image)
+        try:
+            button.ensure_binary_template()
+            self.add(file, area, 'binary', button.image_binary)
+        except Exception as e:
+            logger.info(f'{file} has no binary variant: {type(e).__name__}')
+        try:
+            button.ensure_luma_template()
+            self.add(file, area, 'luma', button.image_luma)
+        except Exception as e:
+            logger.info(f'{file} has no luma variant: {type(e).__name__}')
+
+    def add_template(self, template, server):
+        """
+        Args:
+            template (Template):
+            server (str):
+        """
+        file = template.parse_property(template.raw_file, server)
+        template = Template(file=file)
+        self.add(file, None, 'image', template.image)
+        try:
+            self.add(file, None, 'binary', template.image_binary)
+        except Exception as e:
+            logger.info(f'{file} has no binary variant: {type(e).__name__}')
+        try:
+            self.add(file, None, 'luma', template.image_luma)
+        except Exception as e:
+            logger.info(f'{file} has no luma variant: {type(e).__name__}')
+
+    def build(self):
+        logger.hr('Asset bundle build', level=1)
+        # Load from files only
+        ASSET_BUNDLE.enabled = False
+        self.import_assets()
+
+        for obj in list(Resource.instances.values()):
+            for server in VALID_SERVER:
+                try:
+                    if type(obj) is Button and obj.raw_file:
+                        self.add_button(obj, server)
+                    elif type(obj) is Template:
+                        self.add_template(obj, server)
+                except Exception as e:
+                    logger.warning(f'Failed to pack {obj} on server {server}: {e}')
+
+        os.makedirs(self.folder, exist_ok=True)
+        with open(os.path.join(self.folder, 'data.bin'), 'wb') as f:
+            for data in self.data:
+                f.write(data)
+        index = {
+            'version': ASSET_BUNDLE_VERSION,
+            'files': self.files,
+            'entries': self.entries,
+        }
+        with open(os.path.join(self.folder, 'index.json'), 'w', encoding='utf-8') as f:
+            json.dump(index, f)
+        logger.info(f'Asset bundle built: {len(self.entries)} images, {len(self.files)} files, '
+                    f'{round(self.offset / 1024 / 1024, 1)}MB')
+
+
+if __name__ == '__main__':
+    AssetBundleBuilder().build()
@@ -0,0 +1,143 @@
+"""
+Benchmark config load and bind cycle.
+
+Usage:
+    python -m dev_tools.config_benchmark
+    python -m dev_tools.config_benchmark --config alas --repeat 100
+"""
+import argparse
+import logging
+import os
+import shutil
+import time
+
+import numpy as np
+
+from module.config.config import AzurLaneConfig
+from module.config.config_updater import ConfigUpdater
+from module.config.utils import deep_get, deep_iter, deep_set, filepath_config, read_file
+from module.logger import logger
+
+
+class ConfigBenchmark:
+    # Config copied from template, if the given config does not exist
+    TEMP_CONFIG = 'benchmark_tmp'
+    BIND_TASKS = ['Alas', 'Main', 'Event', 'OpsiExplore', 'GemsFarming']
+
+    def __init__(self, config_name='alas', repeat=50):
+        """
+        Args:
+            config_name (str):
+            repeat (int): Times to run each stage, median cost is reported.
+        """
+        self.config_name = config_name
+        self.repeat = repeat
+        self.is_temp = False
+        # Key: stage name. Value: median cost in seconds.
+        self.results = {}
+
+    def prepare(self):
+        if os.path.exists(filepath_config(self.config_name)):
+            return
+        logger.info(f'Config {self.config_name} not found, use a copy of template')
+        self.config_name = self.TEMP_CONFIG
+        self.is_temp = True
+        shutil.copy(filepath_config('template'), filepath_config(self.config_name))
+
+    def cleanup(self):
+        if not self.is_temp:
+            return
+        file = filepath_config(self.config_name)
+        for suffix in ['', '.lock', '.journal']:
+            if os.path.exists(file + suffix):
+                os.remove(file + suffix)
+
+    def timeit(self, stage, func, number=1):
+        """
+        Run `func` `number` times per round, for `repeat` rounds.
+        """
+        costs = []
+        for _ in range(self.repeat):
+            start = time.perf_counter()
+            for _ in range(number):
+                func()
+            costs.append((time.perf_counter() - start) / number)
+        cost = float(np.median(costs))
+        self.results[stage] = cost
+        return cost
+
+    def show(self):
+        for stage, cost in self.results.items():
+            if cost < 0.001:
+                logger.attr(stage, f'{round(cost * 1000000, 3)}us')
+            else:
+                logger.attr(stage, f'{round(cost * 1000, 3)}ms')
+
+    def run(self):
+        self.prepare()
+        try:
+            self._run()
+        finally:
+            self.cleanup()
+        logger.hr('Results', level=2)
+        self.show()
+
+    def _run(self):
+        raw = read_file(filepath_config(self.config_name))
+        paths = ['.'.join(path) for path, _ in deep_iter(raw, depth=3)]
+        logger.info(f'{len(paths)} arguments')
+
+        def get():
+            for path in paths:
+                deep_get(raw, path)
+
+        def get_list():
+            for path in paths:
+                deep_get(raw, path.split('.'))
+
+        def set_():
+            new = {}
+            for path in paths:
+                deep_set(new, path, 0)
+
+        self.timeit('deep_get, all arguments', get)
+        self.timeit('deep_get with list keys, all arguments', get_list)
+        self.timeit('deep_set, all arguments', set_)
+
+        updater = ConfigUpdater()
+        _ = updater.args
+        self.timeit('config_update', lambda: updater.config_update(raw))
+
+        # Logs from config are not the thing to measure
+        level = logger.level
+        logger.setLevel(logging.WARNING)
+        try:
+            config = AzurLaneConfig(self.config_name)
+            self.timeit('AzurLaneConfig()', lambda: AzurLaneConfig(self.config_name))
+            self.timeit('load', config.load)
+
+            def bind():
+                for task in self.BIND_TASKS:
+                    config.bind(task)
+
+            self.timeit('bind', bind)
+
+            def cycle():
+                # What the scheduler does after every task
+                new = AzurLaneConfig(self.config_name)
+                new.get_next_task()
+                for task in self.BIND_TASKS:
+                    new.bind(task)
+
+            self.timeit('load and bind cycle', cycle)
+        finally:
+            logger.setLevel(level)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Config load and bind benchmark')
+    parser.add_argument('--config', type=str, default='alas', help='Config name in ./config')
+    parser.add_argument('--repeat', type=int, default=50, help='Times to run each stage')
+    args = parser.parse_args()
+
+    ConfigBenchmark(config_name=args.config, repeat=args.repeat).run()
@@ -0,0 +1,124 @@
+import argparse
+import os
+import time
+
+from module.base.utils import load_image
+from module.logger import logger
+from module.ocr.glyph import GlyphRecognizer
+
+
+class GlyphBenchmark:
+    """
+    Benchmark glyph template matching against the neural OCR model, on stored crops.
+
+    Crops are pre-processed images (output of Ocr.pre_process(), letters in black),
+    stored as PNG files in a folder, with a `labels.txt` in it. Each line of labels is
+        <filename>\\t<text>
+    Without labels.txt, crops are labelled by the neural model, and labels.txt is written.
+
+    Usage:
+        python -m dev_tools.glyph_benchmark <folder> --alphabet 0123456789/:IDSB
+        python -m dev_tools.glyph_benchmark <folder> --save
+    """
+
+    def __init__(self, folder, lang='azur_lane', alphabet=None):
+        """
+        Args:
+            folder (str):
+            lang (str):
+            alphabet (str): Candidate alphabet, None for no limit.
+        """
+        self.folder = folder
+        self.lang = lang
+        self.alphabet = alphabet
+        self.files = sorted([f for f in os.listdir(folder) if f.endswith('.png')])
+        self.images = [self.load(f) for f in self.files]
+        logger.info(f'Loaded {len(self.images)} crops from {folder}')
+
+    def load(self, file):
+        image = load_image(os.path.join(self.folder, file))
+        if image.ndim == 3:
+            image = image[:, :, 0]
+        return image
+
+    @property
+    def model(self):
+        from module.ocr.models import OCR_MODEL
+        return OCR_MODEL.__getattribute__(self.lang)
+
+    def labels(self):
+        """
+        Returns:
+            list[str]: Text of each crop.
+        """
+        file = os.path.join(self.folder, 'labels.txt')
+        if os.path.exists(file):
+            with open(file, 'r', encoding='utf-8') as f:
+                rows = dict(line.rstrip('\n').split('\t', 1) for line in f if '\t' in line)
+            return [rows.get(f, '') for f in self.files]
+
+        logger.info('labels.txt not found, label crops with the neural model')
+        result = self.model.atomic_ocr_for_single_lines(self.images, self.alphabet)
+        labels = [''.join(r) for r in result]
+        with open(file, 'w', encoding='utf-8') as f:
+            for name, label in zip(self.files, labels):
+                f.write(f'{name}\t{label}\n')
+        return labels
+
+    def run(self, train=0.5, save=False):
+        """
+        Args:
+            train (float): Ratio of crops to learn templates from, the others are tested.
+            save (bool): Learn from all crops and save templates to GLYPH_FOLDER.
+        """
+        labels = self.labels()
+        split = int(len(self.images) * train)
+        recognizer = GlyphRecognizer(self.lang)
+        # Don't use templates on disk
+        recognizer._loaded = True
+        for image, label in zip(self.images[:split], labels[:split]):
+            recognizer.learn(image, label, trusted=True)
+        logger.info(f'Learnt {sum(len(v) for v in recognizer.templates.values())} glyphs '
+                    f'of {len(recognizer.templates)} chars from {split} crops')
+
+        test_images, test_labels = self.images[split:], labels[split:]
+        if not test_images:
+            logger.warning('No crops to test')
+        else:
+            start = time.time()
+            result = [recognizer.recognize(image, self.alphabet) for image in test_images]
+            cost = time.time() - start
+            accepted = [(''.join(r), label) for r, label in zip(result, test_labels) if r is not None]
+            correct = sum(r == label for r, label in accepted)
+            for r, label in accepted:
+                if r != label:
+                    logger.warning(f'Wrong: {r} != {label}')
+            logger.attr('Accepted', f'{len(accepted)}/{len(test_images)}')
+            logger.attr('Accuracy', f'{correct}/{len(accepted)}')
+            logger.attr('Glyph', f'{round(cost / len(test_images) * 1000, 3)}ms per crop')
+
+            try:
+                model = self.model
+                start = time.time()
+                for image in test_images:
+                    model.atomic_ocr_for_single_lines([image], self.alphabet)
+                cost = time.time() - start
+                logger.attr('Model', f'{round(cost / len(test_images) * 1000, 3)}ms per crop')
+            except ImportError as e:
+                logger.warning(f'Neural model unavailable: {e}')
+
+        if save:
+            for image, label in zip(self.images[split:], labels[split:]):
+                recognizer.learn(image, label, trusted=True)
+            recognizer.save()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Glyph OCR benchmark')
+    parser.add_argument('folder', type=str, help='Folder of pre-processed crops')
+    parser.add_argument('--lang', type=str, default='azur_lane')
+    parser.add_argument('--alphabet', type=str, default=None)
+    parser.add_argument('--train', type=float, default=0.5, help='Ratio of crops to learn from')
+    parser.add_argument('--save', action='store_true', help='Save templates learnt from all crops')
+    args = parser.parse_args()
+    GlyphBenchmark(args.folder, lang=args.lang, alphabet=args.alphabet).run(train=args.train, save=args.save)
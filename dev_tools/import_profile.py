@@ -0,0 +1,131 @@
+import ast
+import re
+import subprocess
+import sys
+
+from module.logger import logger
+
+ALAS_FILE = './alas.py'
+# Modules every task imports before its own, measured as baseline
+BASELINE = [
+    'alas',
+    'module.device.device',
+    'module.handler.login',
+    'module.ui.ui',
+]
+# Methods of AzurLaneAutoScript that have local imports but are not tasks
+NOT_TASK = ['device', 'checker', 'run', 'save_error_log', 'get_next_task', 'loop']
+MARKER = '--- import profile start ---'
+# `import time:       123 |       4567 | module.name`
+REGEX_IMPORT_TIME = re.compile(r'import time:\s*(\d+)\s*\|\s*(\d+)\s*\|(\s*)(\S+)')
+
+
+class ImportProfiler:
+    """
+    Report import cost of each scheduler task, using `python -X importtime`.
+
+    Task modules are imported lazily inside methods of AzurLaneAutoScript,
+    so the cost of a task is what its imports add on top of the baseline every task loads.
+    Run in the root folder of Alas:
+        python alas.py --profile-imports
+    """
+
+    def __init__(self, file=ALAS_FILE, top=5):
+        """
+        Args:
+            file (str): Path to alas.py
+            top (int): Number of slowest modules to show for each task.
+        """
+        self.file = file
+        self.top = top
+
+    def task_imports(self):
+        """
+        Returns:
+            dict: Key: str, task method name. Value: tuple[str], modules imported inside.
+                Tasks with the same imports are listed once.
+        """
+        with open(self.file, 'r', encoding='utf-8') as f:
+            tree = ast.parse(f.read())
+
+        tasks = {}
+        for node in tree.body:
+            if not (isinstance(node, ast.ClassDef) and node.name == 'AzurLaneAutoScript'):
+                continue
+            for method in node.body:
+                if not isinstance(method, ast.FunctionDef) or method.name.startswith('_') \
+                        or method.name in NOT_TASK:
+                    continue
+                modules = []
+                # Imports may be nested in try, if and with blocks
+                for stmt in ast.walk(method):
+                    if isinstance(stmt, ast.ImportFrom) and stmt.module and stmt.level == 0:
+                        modules.append(stmt.module)
+                    elif isinstance(stmt, ast.Import):
+                        modules += [alias.name for alias in stmt.names]
+                modules = tuple(dict.fromkeys(m for m in modules if m.startswith('module.') and m not in BASELINE))
+                if modules and modules not in tasks.values():
+                    tasks[method.name] = modules
+        return tasks
+
+    @staticmethod
+    def import_time(modules):
+        """
+        Args:
+            modules (list[str]): Modules to import after the baseline.
+                Empty list to measure the baseline itself.
+
+        Returns:
+            tuple[float, list[tuple[float, str]]]: Cumulative milliseconds,
+                and (self milliseconds, module name) of each module imported.
+        """
+        code = ';'.join([f'import {m}' for m in BASELINE]
+                        + [f'import sys; sys.stderr.write("{MARKER}\\n")']
+                        + [f'import {m}' for m in modules])
+        result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                                stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, encoding='utf-8')
+        if result.returncode != 0:
+            raise ImportError(result.stderr.strip().splitlines()[-1])
+
+        stderr = result.stderr
+        if modules:
+            stderr = stderr.split(MARKER, 1)[-1]
+        total = 0.
+        rows = []
+        for res in REGEX_IMPORT_TIME.finditer(stderr):
+            us_self, us_cumulative, indent, name = res.groups()
+            rows.append((int(us_self) / 1000, name))
+            # Top level imports have exactly one space of indent
+            if len(indent) == 1:
+                total += int(us_cumulative) / 1000
+        rows = sorted(rows, reverse=True)
+        return total, rows
+
+    def show(self, name, total, rows):
+        logger.info(f'{name}: {round(total)}ms')
+        for ms, module in rows[:self.top]:
+            logger.info(f'    {round(ms):>5}ms  {module}')
+
+    def run(self):
+        logger.hr('Import profile', level=1)
+        logger.hr('Baseline', level=2)
+        self.show('baseline', *self.import_time([]))
+
+        logger.hr('Tasks', level=2)
+        result = []
+        for task, modules in self.task_imports().items():
+            try:
+                total, rows = self.import_time(modules)
+            except ImportError as e:
+                logger.warning(f'{task}: {e}')
+                continue
+            self.show(task, total, rows)
+            result.append((total, task))
+
+        logger.hr('Summary', level=2)
+        for total, task in sorted(result, reverse=True):
+            logger.info(f'{round(total):>6}ms  {task}')
+
+
+if __name__ == '__main__':
+    ImportProfiler().run()
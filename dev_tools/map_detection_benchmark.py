@@ -0,0 +1,223 @@
+import module.config.server as server
+
+server.server = 'cn'  # Don't need to edit, it's used to avoid error.
+
+import argparse
+import importlib
+import json
+import os
+import time
+
+import numpy as np
+
+from module.base.utils import load_image, location2node
+from module.config.config import AzurLaneConfig
+from module.exception import MapDetectionError
+from module.logger import logger
+from module.map_detection.view import View
+
+
+class MapDetectionBenchmark:
+    """
+    Replay saved map screenshots through map detection, outside Alas.
+    Reports timings of each stage, and diffs detection results against golden outputs.
+
+    Screenshots are stored per campaign map, named after files under ./campaign
+        <folder>/<campaign>/<map>/*.png
+        such as: screenshots/campaign_main/campaign_7_2/1.png
+    Config of the map is loaded from campaign.<campaign>.<map>, the same as running that map.
+    Golden outputs are stored in <folder>/<campaign>/<map>/golden.json
+
+    Usage:
+        python -m dev_tools.map_detection_benchmark <folder>
+        python -m dev_tools.map_detection_benchmark <folder> --update
+        python -m dev_tools.map_detection_benchmark <folder> --backend perspective --repeat 10
+    """
+    GOLDEN_FILE = 'golden.json'
+
+    def __init__(self, folder, backend='homography', repeat=5):
+        """
+        Args:
+            folder (str):
+            backend (str): 'homography' or 'perspective'
+            repeat (int): Times to run each stage, median cost is reported.
+        """
+        self.folder = folder
+        self.backend = backend
+        self.repeat = repeat
+        # Key: stage name. Value: list of cost in seconds.
+        self.timings = {}
+
+    def iter_maps(self):
+        """
+        Yields:
+            str, str: Campaign folder name, map name.
+        """
+        for campaign in sorted(os.listdir(self.folder)):
+            path = os.path.join(self.folder, campaign)
+            if not os.path.isdir(path):
+                continue
+            for name in sorted(os.listdir(path)):
+                if os.path.isdir(os.path.join(path, name)):
+                    yield campaign, name
+
+    def get_config(self, campaign, name):
+        """
+        Args:
+            campaign (str): Such as 'campaign_main'.
+            name (str): Such as 'campaign_7_2'.
+
+        Returns:
+            AzurLaneConfig:
+        """
+        config = AzurLaneConfig('template')
+        if os.path.exists(f'./campaign/{campaign}/{name}.py'):
+            module = importlib.import_module(f'campaign.{campaign}.{name}')
+            config = config.merge(module.Config())
+        else:
+            logger.warning(f'Map file not found: ./campaign/{campaign}/{name}.py, use default config')
+        config.DETECTION_BACKEND = self.backend
+        return config
+
+    def timeit(self, stage, func, *args, **kwargs):
+        """
+        Run a stage `repeat` times, record median cost.
+
+        Returns:
+            Result of the last run.
+        """
+        costs = []
+        result = None
+        for _ in range(self.repeat):
+            start = time.perf_counter()
+            result = func(*args, **kwargs)
+            costs.append(time.perf_counter() - start)
+        self.timings.setdefault(stage, []).append(float(np.median(costs)))
+        return result
+
+    def run_image(self, config, image):
+        """
+        Args:
+            config (AzurLaneConfig):
+            image (np.ndarray):
+
+        Returns:
+            dict: Detection results.
+        """
+        view = View(config)
+        # First load, also loads homography if needed
+        view.load(image)
+        backend = view.backend
+
+        if self.backend == 'homography':
+            def detect():
+                # Full search, don't track from last detection
+                backend.track_loca = []
+                backend.load(view.image)
+
+            self.timeit('detect', detect)
+            self.timeit('detect_track', backend.load, view.image)
+        else:
+            self.timeit('detect', backend.load, view.image)
+        self.timeit('load', view.load, image)
+        self.timeit('predict', view.predict)
+
+        result = {
+            'shape': view.shape.tolist(),
+            'center_loca': list(view.center_loca),
+            'edges': [view.left_edge, view.upper_edge, view.right_edge, view.lower_edge],
+            'grids': {location2node(grid.location): grid.str for grid in view},
+        }
+        if self.backend == 'homography':
+            result['homo_loca'] = np.round(backend.homo_loca, 3).tolist()
+        return result
+
+    @staticmethod
+    def diff(golden, result):
+        """
+        Args:
+            golden (dict):
+            result (dict):
+
+        Returns:
+            list[str]: Differences.
+        """
+        out = []
+        for key in ['shape', 'center_loca', 'edges', 'homo_loca', 'error']:
+            if golden.get(key) != result.get(key):
+                out.append(f'{key}: {golden.get(key)} -> {result.get(key)}')
+        grids_golden = golden.get('grids', {})
+        grids_result = result.get('grids', {})
+        for node in sorted(set(grids_golden) | set(grids_result)):
+            if grids_golden.get(node) != grids_result.get(node):
+                out.append(f'{node}: {grids_golden.get(node)} -> {grids_result.get(node)}')
+        return out
+
+    def run(self, update=False):
+        """
+        Args:
+            update (bool): True to write results as golden outputs.
+
+        Returns:
+            int: Number of screenshots that differ from golden outputs.
+        """
+        differ = 0
+        total = 0
+        for campaign, name in self.iter_maps():
+            logger.hr(f'{campaign}/{name}', level=2)
+            path = os.path.join(self.folder, campaign, name)
+            config = self.get_config(campaign, name)
+            golden_file = os.path.join(path, self.GOLDEN_FILE)
+            golden = {}
+            if os.path.exists(golden_file):
+                with open(golden_file, 'r', encoding='utf-8') as f:
+                    golden = json.load(f)
+
+            results = {}
+            for file in sorted(os.listdir(path)):
+                if not file.endswith('.png'):
+                    continue
+                total += 1
+                image = load_image(os.path.join(path, file))
+                try:
+                    result = self.run_image(config, image)
+                except MapDetectionError as e:
+                    result = {'error': str(e)}
+                results[file] = result
+
+                if update:
+                    continue
+                if file not in golden:
+                    logger.warning(f'{file}: no golden output')
+                    continue
+                diff = self.diff(golden[file], result)
+                if diff:
+                    differ += 1
+                    logger.warning(f'{file}: {len(diff)} differences')
+                    for line in diff[:20]:
+                        logger.info(f'  {line}')
+
+            if update:
+                with open(golden_file, 'w', encoding='utf-8') as f:
+                    json.dump(results, f, indent=2, sort_keys=True)
+                logger.info(f'Golden outputs saved: {golden_file}')
+
+        logger.hr('Timings', level=1)
+        for stage, costs in self.timings.items():
+            logger.attr(stage, f'mean {round(np.mean(costs) * 1000, 2)}ms, '
+                               f'max {round(np.max(costs) * 1000, 2)}ms, {len(costs)} screenshots')
+        if not update:
+            logger.attr('Differ', f'{differ}/{total}')
+        return differ
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Map detection benchmark on saved screenshots')
+    parser.add_argument('folder', type=str, help='Folder of screenshots, <folder>/<campaign>/<map>/*.png')
+    parser.add_argument('--backend', type=str, default='homography', choices=['homography', 'perspective'])
+    parser.add_argument('--repeat', type=int, default=5, help='Times to run each stage')
+    parser.add_argument('--update', action='store_true', help='Write results as golden outputs')
+    args = parser.parse_args()
+
+    differ = MapDetectionBenchmark(args.folder, backend=args.backend, repeat=args.repeat).run(update=args.update)
+    exit(1 if differ else 0)
@@ -0,0 +1,258 @@
+"""
+Check that NumpyOcr gives the same output as AlOcr on mxnet.
+
+Outputs of AlOcr are stored in ./bin/cnocr_models/<model>/reference.npz with the input images,
+so NumpyOcr can be checked on machines without mxnet.
+
+Usage:
+    python -m dev_tools.ocr_backend_parity
+    python -m dev_tools.ocr_backend_parity --model azur_lane --folder <folder of pre-processed crops>
+    # Check NumpyOcr against stored outputs of AlOcr, doesn't need mxnet
+    python -m dev_tools.ocr_backend_parity --check
+    # Store outputs of AlOcr again after models changed, needs mxnet
+    python -m dev_tools.ocr_backend_parity --save --model azur_lane
+"""
+import argparse
+import json
+import os
+import time
+
+import cv2
+import numpy as np
+
+from module.base.utils import load_image
+from module.logger import logger
+from module.ocr.models import OcrModel
+
+
+def random_images(count=64, seed=0):
+    """
+    Random single line images, letters in black, background in white.
+    """
+    random = np.random.RandomState(seed)
+    images = []
+    for _ in range(count):
+        height = random.randint(16, 48)
+        width = random.randint(height, height * 8)
+        image = np.full((height, width), 255, dtype=np.uint8)
+        image[random.rand(height, width) > 0.7] = 0
+        images.append(image)
+    return images
+
+
+def text_images(count=120, seed=0):
+    """
+    Rendered digits and letters in different sizes and lengths, letters in black, background in white.
+    """
+    random = np.random.RandomState(seed)
+    fonts = [cv2.FONT_HERSHEY_SIMPLEX, cv2.FONT_HERSHEY_DUPLEX, cv2.FONT_HERSHEY_PLAIN]
+    chars = '0123456789/:ABCDEFGHIJKLMNPQRSTUVWXYZ'
+    images = []
+    for _ in range(count):
+        text = ''.join(random.choice(list(chars), size=random.randint(1, 12)))
+        font = fonts[random.randint(len(fonts))]
+        scale = random.uniform(0.5, 1.2)
+        (width, height), baseline = cv2.getTextSize(text, font, scale, 2)
+        image = np.full((height + baseline + 8, width + 8), 255, dtype=np.uint8)
+        cv2.putText(image, text, (4, height + 4), font, scale, 0, 2)
+        images.append(image)
+    return images
+
+
+def multiline_images(count=16, seed=0):
+    """
+    2 to 4 rendered lines stacked vertically, for ocr() which splits lines.
+    """
+    random = np.random.RandomState(seed)
+    lines = text_images(count=count * 4, seed=seed + 1)
+    images = []
+    for _ in range(count):
+        rows = [lines.pop() for _ in range(random.randint(2, 5))]
+        width = max(row.shape[1] for row in rows)
+        stack = []
+        for row in rows:
+            stack.append(np.pad(row, ((0, 0), (0, width - row.shape[1])), 'constant', constant_values=255))
+            stack.append(np.full((random.randint(4, 12), width), 255, dtype=np.uint8))
+        images.append(np.concatenate(stack[:-1], axis=0))
+    return images
+
+
+def load_images(folder):
+    images = []
+    for file in sorted(os.listdir(folder)):
+        if file.endswith('.png'):
+            image = load_image(os.path.join(folder, file))
+            images.append(image[:, :, 0] if image.ndim == 3 else image)
+    return images
+
+
+def get_model(name, backend):
+    """
+    Args:
+        name (str): Model name in OcrModel.
+        backend (str): 'mxnet' or 'numpy'
+
+    Returns:
+        AlOcr, NumpyOcr:
+    """
+    backends = OcrModel.BACKEND
+    try:
+        OcrModel.BACKEND = {**backends, name: backend}
+        return OcrModel().__getattribute__(name)
+    finally:
+        OcrModel.BACKEND = backends
+
+
+def predict(model, key, images, multi, alphabet=None):
+    """
+    Args:
+        model (AlOcr, NumpyOcr):
+        key (str): Name to show in log.
+        images (list[np.ndarray]): Single line images.
+        multi (list[np.ndarray]): Multi-line images.
+        alphabet (str):
+
+    Returns:
+        dict: Key: mode. Value: list of results.
+    """
+    # Load model first
+    model.atomic_ocr_for_single_lines(images[:1], alphabet)
+    start = time.time()
+    single = [model.atomic_ocr_for_single_lines([image], alphabet)[0] for image in images]
+    cost_single = time.time() - start
+    start = time.time()
+    batch = model.atomic_ocr_for_single_lines(images, alphabet)
+    cost_batch = time.time() - start
+    logger.attr(key, f'single {round(cost_single / len(images) * 1000, 2)}ms per image, '
+                     f'batch {round(cost_batch * 1000, 2)}ms for {len(images)} images')
+    return {
+        'single': single,
+        'batch': batch,
+        'multi': [model.atomic_ocr(image, alphabet) for image in multi],
+    }
+
+
+def compare(expected, result, name='mxnet'):
+    """
+    Args:
+        expected (dict): Output of predict() on mxnet.
+        result (dict): Output of predict() on numpy.
+        name (str): Name of expected results to show in log.
+
+    Returns:
+        bool: If all results are the same.
+    """
+    same = True
+    for mode, rows in expected.items():
+        diff = [(a, b) for a, b in zip(rows, result[mode]) if a != b]
+        logger.attr(f'{mode} mismatch', f'{len(diff)}/{len(rows)}')
+        for a, b in diff[:10]:
+            logger.warning(f'{name}: {a}, numpy: {b}')
+        same &= not diff
+    return same
+
+
+def parity(name, images, multi, alphabet=None):
+    """
+    Args:
+        name (str): Model name in OcrModel.
+        images (list[np.ndarray]): Single line images.
+        multi (list[np.ndarray]): Multi-line images.
+        alphabet (str):
+
+    Returns:
+        bool: If all results are the same.
+    """
+    logger.hr(name, level=2)
+    expected = predict(get_model(name, 'mxnet'), 'mxnet', images, multi, alphabet)
+    result = predict(get_model(name, 'numpy'), 'numpy', images, multi, alphabet)
+    return compare(expected, result)
+
+
+def reference_file(name):
+    return f'./bin/cnocr_models/{name}/reference.npz'
+
+
+# Alphabet of reference outputs, None for all classes and digits for the masked path.
+REFERENCE_ALPHABET = [None, '0123456789']
+
+
+def save_reference(name, images, multi):
+    """
+    Store images and outputs of AlOcr, needs mxnet.
+
+    Args:
+        name (str): Model name in OcrModel.
+        images (list[np.ndarray]): Single line images.
+        multi (list[np.ndarray]): Multi-line images.
+    """
+    logger.hr(name, level=2)
+    model = get_model(name, 'mxnet')
+    results = [predict(model, f'mxnet {alphabet}', images, multi, alphabet) for alphabet in REFERENCE_ALPHABET]
+    data = {f'single_{i}': image for i, image in enumerate(images)}
+    data.update({f'multi_{i}': image for i, image in enumerate(multi)})
+    data['results'] = np.array(json.dumps({
+        'alphabet': REFERENCE_ALPHABET,
+        'results': results,
+    }))
+    file = reference_file(name)
+    np.savez_compressed(file, **data)
+    logger.info(f'Saved: {file}')
+
+
+def check_reference(name):
+    """
+    Compare NumpyOcr with the stored outputs of AlOcr, doesn't need mxnet.
+
+    Args:
+        name (str): Model name in OcrModel.
+
+    Returns:
+        bool: If all results are the same.
+    """
+    logger.hr(name, level=2)
+    with np.load(reference_file(name)) as data:
+        images = [data[f'single_{i}'] for i in range(sum(key.startswith('single_') for key in data.files))]
+        multi = [data[f'multi_{i}'] for i in range(sum(key.startswith('multi_') for key in data.files))]
+        reference = json.loads(str(data['results']))
+
+    model = get_model(name, 'numpy')
+    same = True
+    for alphabet, expected in zip(reference['alphabet'], reference['results']):
+        result = predict(model, f'numpy {alphabet}', images, multi, alphabet)
+        # JSON has no tuples, compare in the same types
+        result = json.loads(json.dumps(result))
+        same &= compare(expected, result, name='reference')
+    return same
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='OCR backend parity check')
+    parser.add_argument('--model', type=str, nargs='*', default=None, help='Default to all models')
+    parser.add_argument('--folder', type=str, default=None, help='Folder of pre-processed crops')
+    parser.add_argument('--alphabet', type=str, default=None)
+    parser.add_argument('--check', action='store_true', help='Check NumpyOcr against stored outputs of AlOcr')
+    parser.add_argument('--save', action='store_true', help='Store outputs of AlOcr, needs mxnet')
+    args = parser.parse_args()
+
+    if args.check:
+        models = args.model or [name for name in OcrModel.BACKEND if os.path.exists(reference_file(name))]
+        same = all([check_reference(model) for model in models])
+        exit(0 if same else 1)
+
+    images = load_images(args.folder) if args.folder else text_images(count=64) + random_images(count=16)
+    multi = multiline_images()
+    models = args.model or list(OcrModel.BACKEND.keys())
+    if args.save:
+        for model in models:
+            save_reference(model, images, multi)
+        exit(0)
+
+    same = True
+    for model in models:
+        try:
+            same &= parity(model, images, multi, alphabet=args.alphabet)
+        except Exception as e:
+            logger.warning(f'{model}: {e}')
+            same = False
+    exit(0 if same else 1)
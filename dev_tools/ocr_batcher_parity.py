@@ -0,0 +1,88 @@
+"""
+Check that OcrBatcher gives the same output as running each request alone,
+when requests from many instances arrive at the same time.
+
+Runs on the numpy backend by default, so it doesn't need mxnet.
+
+Usage:
+    python -m dev_tools.ocr_batcher_parity
+    python -m dev_tools.ocr_batcher_parity --model cnocr --backend mxnet
+    python -m dev_tools.ocr_batcher_parity --folder <folder of pre-processed crops>
+"""
+import argparse
+
+import gevent
+import numpy as np
+
+from dev_tools.ocr_backend_parity import load_images, text_images
+from module.logger import logger
+from module.ocr.batcher import OcrBatcher
+from module.ocr.models import OcrModel
+
+
+def split_requests(images, seed=0):
+    """
+    Group images into requests of 1 to 4 images, like OCR objects with multiple buttons.
+    """
+    random = np.random.RandomState(seed)
+    requests = []
+    index = 0
+    while index < len(images):
+        size = random.randint(1, 5)
+        requests.append(images[index:index + size])
+        index += size
+    return requests
+
+
+def parity(name, requests, backend='numpy', alphabet=None):
+    """
+    Args:
+        name (str): Model name in OcrModel.
+        requests (list[list[np.ndarray]]):
+        backend (str): 'numpy' or 'mxnet'
+        alphabet (str):
+
+    Returns:
+        int: Number of requests that differ.
+    """
+    logger.hr(f'{name} ({backend})', level=2)
+    backends = OcrModel.BACKEND
+    try:
+        OcrModel.BACKEND = {**backends, name: backend}
+        model = OcrModel().__getattribute__(name)
+    finally:
+        OcrModel.BACKEND = backends
+
+    single = [model.atomic_ocr_for_single_lines(images, alphabet) for images in requests]
+
+    batcher = OcrBatcher(model, name=name)
+    # All requests arrive at the same time, as if from different instances
+    greenlets = [gevent.spawn(batcher.submit, images, alphabet) for images in requests]
+    gevent.joinall(greenlets)
+    batched = [greenlet.get() for greenlet in greenlets]
+
+    differ = 0
+    for images, a, b in zip(requests, single, batched):
+        if a != b:
+            differ += 1
+            logger.warning(f'single: {["".join(r) for r in a]}, batched: {["".join(r) for r in b]}')
+    for key, value in batcher.stats.items():
+        logger.attr(key, value)
+    logger.attr('Differ', f'{differ}/{len(requests)}')
+    return differ
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='OCR batcher parity check')
+    parser.add_argument('--model', type=str, nargs='*', default=['azur_lane'])
+    parser.add_argument('--backend', type=str, default='numpy', choices=['numpy', 'mxnet'])
+    parser.add_argument('--folder', type=str, default=None, help='Folder of pre-processed crops')
+    parser.add_argument('--alphabet', type=str, default=None)
+    args = parser.parse_args()
+
+    images = load_images(args.folder) if args.folder else text_images()
+    requests = split_requests(images)
+    differ = 0
+    for model in args.model:
+        differ += parity(model, requests, backend=args.backend, alphabet=args.alphabet)
+    exit(1 if differ else 0)
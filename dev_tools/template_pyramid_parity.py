@@ -0,0 +1,100 @@
+import module.config.server as server
+
+server.server = 'cn'  # Don't need to edit, it's used to avoid error.
+
+import argparse
+import importlib
+import os
+import time
+
+import numpy as np
+
+from module.base.template import Template
+from module.base.utils import load_image
+from module.logger import logger
+
+
+class TemplatePyramidParity:
+    """
+    Check that coarse-to-fine template matching (pyramid=True) gives the same results as full search,
+    on stored screenshots.
+
+    Screenshots are 1280x720 PNG files in a folder, such as screenshots taken at the SOS signal list.
+    Templates are all Template objects in an assets module.
+
+    Usage:
+        python -m dev_tools.template_pyramid_parity <folder>
+        python -m dev_tools.template_pyramid_parity <folder> --assets module.sos.assets --server en
+        python -m dev_tools.template_pyramid_parity <folder> --template TEMPLATE_SIGNAL_SEARCH
+    """
+
+    def __init__(self, folder, assets='module.sos.assets', templates=None, similarity=0.85):
+        """
+        Args:
+            folder (str):
+            assets (str): Module of assets.
+            templates (list[str]): Template names to check, None for all templates in module.
+            similarity (float):
+        """
+        self.folder = folder
+        self.similarity = similarity
+        module = importlib.import_module(assets)
+        self.templates = {
+            name: obj for name, obj in vars(module).items()
+            if isinstance(obj, Template) and (not templates or name in templates)
+        }
+        self.files = sorted([f for f in os.listdir(folder) if f.endswith('.png')])
+        # Key: 'full' or 'pyramid'. Value: list of cost in seconds.
+        self.timings = {'full': [], 'pyramid': []}
+
+    def match(self, template, image, pyramid):
+        """
+        Returns:
+            tuple[bool, list[tuple]]: Result of match(), areas of match_multi() results.
+        """
+        # Both of them modify image in place when de-dithering
+        start = time.perf_counter()
+        matched = template.match(image.copy(), similarity=self.similarity, pyramid=pyramid)
+        buttons = template.match_multi(image.copy(), similarity=self.similarity, pyramid=pyramid)
+        self.timings['pyramid' if pyramid else 'full'].append(time.perf_counter() - start)
+        return matched, sorted(tuple(button.area) for button in buttons)
+
+    def run(self):
+        """
+        Returns:
+            int: Number of (screenshot, template) pairs that differ.
+        """
+        logger.info(f'{len(self.files)} screenshots, {len(self.templates)} templates')
+        differ = 0
+        total = 0
+        for file in self.files:
+            image = load_image(os.path.join(self.folder, file))
+            for name, template in self.templates.items():
+                total += 1
+                full = self.match(template, image, pyramid=False)
+                pyramid = self.match(template, image, pyramid=True)
+                if full != pyramid:
+                    differ += 1
+                    logger.warning(f'{file} {name}: full {full}, pyramid {pyramid}')
+
+        logger.hr('Results', level=1)
+        for key, costs in self.timings.items():
+            if costs:
+                logger.attr(key, f'mean {round(np.mean(costs) * 1000, 2)}ms, max {round(np.max(costs) * 1000, 2)}ms')
+        logger.attr('Differ', f'{differ}/{total}')
+        return differ
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Parity of pyramid template matching on stored screenshots')
+    parser.add_argument('folder', type=str, help='Folder of screenshots')
+    parser.add_argument('--assets', type=str, default='module.sos.assets', help='Module of assets')
+    parser.add_argument('--template', type=str, nargs='*', default=None, help='Template names, default to all')
+    parser.add_argument('--server', type=str, default='cn', choices=['cn', 'en', 'jp', 'tw'])
+    parser.add_argument('--similarity', type=float, default=0.85)
+    args = parser.parse_args()
+
+    server.server = args.server
+    differ = TemplatePyramidParity(
+        args.folder, assets=args.assets, templates=args.template, similarity=args.similarity).run()
+    exit(1 if differ else 0)
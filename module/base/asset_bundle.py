@@ -0,0 +1,118 @@
+import json
+import os
+
+import numpy as np
+
+from module.base.decorator import cached_property, del_cached_property
+from module.logger import logger
+
+ASSET_BUNDLE_FOLDER = './assets/bundle'
+ASSET_BUNDLE_VERSION = 1
+
+
+def bundle_key(file, area=None, variant='image'):
+    """
+    Args:
+        file (str): Filepath of asset.
+        area (tuple): Area to crop, None for the whole image.
+        variant (str): 'image', 'binary' or 'luma'.
+
+    Returns:
+        str: Such as `binary|./assets/cn/ui/MAIN_CHECK.png|1172,42,1275,111`
+    """
+    area = ','.join(map(str, map(int, area))) if area is not None else ''
+    return f'{variant}|{file}|{area}'
+
+
+class AssetBundle:
+    """
+    Asset images packed into one file, built by dev_tools/asset_bundle.py.
+
+    Images are served as views of a memory-mapped file, instead of decoding PNG/GIF files on first use.
+    Pages of the mapped file are shared by all Alas instances on the same machine.
+    Assets modified after the bundle was built are loaded from files as usual.
+    """
+
+    def __init__(self, folder=ASSET_BUNDLE_FOLDER):
+        self.folder = folder
+        # Set to False to bypass bundle, such as when building it
+        self.enabled = True
+
+    @cached_property
+    def index(self):
+        """
+        Returns:
+            dict: {
+                'version': ASSET_BUNDLE_VERSION,
+                'files': {file: [mtime_ns, size]},
+                'entries': {key: {'offset': int, 'shape': list, 'dtype': str, 'gif': bool}},
+            }
+        """
+        file = os.path.join(self.folder, 'index.json')
+        try:
+            with open(file, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning(f'Failed to load asset bundle: {e}')
+            return {}
+        if index.get('version') != ASSET_BUNDLE_VERSION:
+            logger.warning('Asset bundle version mismatch, please rebuild it')
+            return {}
+        logger.info(f'Asset bundle loaded: {len(index["entries"])} images')
+        return index
+
+    @cached_property
+    def data(self):
+        """
+        Returns:
+            np.memmap: Copy-on-write, writing to images won't change the file or other instances.
+        """
+        return np.memmap(os.path.join(self.folder, 'data.bin'), dtype=np.uint8, mode='c')
+
+    def is_outdated(self, file):
+        """
+        Args:
+            file (str):
+
+        Returns:
+            bool: If asset file was modified after the bundle was built.
+        """
+        try:
+            stat = os.stat(file)
+        except OSError:
+            return True
+        return self.index['files'].get(file) != [stat.st_mtime_ns, stat.st_size]
+
+    def get(self, file, area=None, variant='image'):
+        """
+        Args:
+            file (str): Filepath of asset.
+            area (tuple): Area to crop, None for the whole image.
+            variant (str): 'image', 'binary' or 'luma'.
+
+        Returns:
+            np.ndarray: Or list[np.ndarray] for gif, or None if not in bundle.
+        """
+        if not self.enabled or not self.index:
+            return None
+        entry = self.index['entries'].get(bundle_key(file, area=area, variant=variant))
+        if entry is None or self.is_outdated(file):
+            return None
+
+        dtype = np.dtype(entry['dtype'])
+        shape = tuple(entry['shape'])
+        count = int(np.prod(shape)) * dtype.itemsize
+        image = np.asarray(self.data[entry['offset']:entry['offset'] + count]).view(dtype).reshape(shape)
+        if entry['gif']:
+            return list(image)
+        else:
+            return image
+
+    def release(self):
+        del_cached_property(self, 'index')
+        del_cached_property(self, 'data')
+
+
+ASSET_BUNDLE = AssetBundle()
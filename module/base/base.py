@@ -1,4 +1,4 @@
-from module.base.button import Button
+from module.base.button import Button, ButtonSet
 from module.base.decorator import cached_property
 from module.base.timer import Timer
 from module.base.utils import *
@@ -13,6 +13,74 @@ from module.statistics.azurstats import AzurStats
 from module.webui.setting import cached_class_property
 
 
+class DetectionCache:
+    """
+    Detection results on one screenshot.
+    Handler loops usually test the same button several times on the same image,
+    such as `appear()` then `appear_then_click()`, results are reused until `Device.image_id` changes.
+    """
+
+    def __init__(self):
+        self.image_id = None
+        # Key: (method, button name, area, color, offset, threshold)
+        # Value: (result, button offset after detection)
+        self.data = {}
+        self.hit = 0
+        self.miss = 0
+
+    @staticmethod
+    def key(method, button, offset, threshold):
+        """
+        Args:
+            method (str): 'appear_on', 'match', 'match_binary', 'match_luma'
+            button (Button):
+            offset (int, tuple):
+            threshold (int, float):
+
+        Returns:
+            tuple:
+        """
+        if method == 'appear_on':
+            offset = 0
+        return method, button.name, tuple(button.area), tuple(button.color), offset, threshold
+
+    def update(self, image_id):
+        """
+        Drop all results if image changed.
+
+        Args:
+            image_id (int): `Device.image_id`
+        """
+        if image_id != self.image_id:
+            self.image_id = image_id
+            self.data.clear()
+
+    def get(self, image_id, key):
+        """
+        Args:
+            image_id (int): `Device.image_id`
+            key (tuple):
+
+        Returns:
+            tuple: (result, button offset), or None if not cached.
+        """
+        self.update(image_id)
+        try:
+            value = self.data[key]
+            self.hit += 1
+            return value
+        except KeyError:
+            self.miss += 1
+            return None
+
+    def set(self, key, value):
+        self.data[key] = value
+
+    def clear(self):
+        self.image_id = None
+        self.data.clear()
+
+
 class ModuleBase:
     config: AzurLaneConfig
     device: Device
@@ -62,6 +130,10 @@ class ModuleBase:
     def emotion(self) -> Emotion:
         return Emotion(config=self.config)
 
+    @cached_property
+    def detection_cache(self) -> DetectionCache:
+        return DetectionCache()
+
     def early_ocr_import(self):
         """
         Start a thread to import cnocr and mxnet while the Alas instance just starting to take screenshots
@@ -73,6 +145,11 @@ class ModuleBase:
         if not self.config.is_actual_task:
             logger.info('No actual task bound, skip early_ocr_import')
             return
+        from module.ocr.models import OcrModel
+        if 'mxnet' not in OcrModel.BACKEND.values():
+            logger.info('No OCR model runs on mxnet, skip early_ocr_import')
+            ModuleBase.EARLY_OCR_IMPORT = True
+            return
 
         def do_ocr_import():
             # Wait first image
@@ -148,31 +225,172 @@ class ModuleBase:
         button = self.ensure_button(button)
         self.device.stuck_record_add(button)
 
-        if interval:
-            if button.name in self.interval_timer:
-                if self.interval_timer[button.name].limit != interval:
-                    self.interval_timer[button.name] = Timer(interval)
-            else:
-                self.interval_timer[button.name] = Timer(interval)
-            if not self.interval_timer[button.name].reached():
-                return False
+        if interval and not self._appear_interval_reached(button, interval):
+            return False
 
         if isinstance(button, HierarchyButton):
             appear = bool(button)
         elif offset:
             if isinstance(offset, bool):
                 offset = self.config.BUTTON_OFFSET
-            appear = button.match(self.device.image, offset=offset,
-                                  threshold=self.config.BUTTON_MATCH_SIMILARITY if threshold is None else threshold)
+            appear = self.cached_detect(
+                button, method='match', offset=offset,
+                threshold=self.config.BUTTON_MATCH_SIMILARITY if threshold is None else threshold)
         else:
-            appear = button.appear_on(self.device.image,
-                                      threshold=self.config.COLOR_SIMILAR_THRESHOLD if threshold is None else threshold)
+            appear = self.cached_detect(
+                button, method='appear_on',
+                threshold=self.config.COLOR_SIMILAR_THRESHOLD if threshold is None else threshold)
 
         if appear and interval:
             self.interval_timer[button.name].reset()
 
         return appear
 
+    def cached_detect(self, button, method='match', offset=30, threshold=0.85):
+        """
+        Run a detection method of button on current screenshot.
+        Results are cached until the next screenshot.
+
+        Args:
+            button (Button):
+            method (str): 'appear_on', 'match', 'match_binary', 'match_luma'
+            offset (int, tuple): Detection area offset, not used in 'appear_on'.
+            threshold (int, float):
+
+        Returns:
+            bool:
+        """
+        if not isinstance(button, Button):
+            if method == 'appear_on':
+                return button.appear_on(self.device.image, threshold=threshold)
+            return button.__getattribute__(method)(self.device.image, offset=offset, threshold=threshold)
+
+        cache = self.detection_cache
+        key = cache.key(method, button, offset, threshold)
+        cached = cache.get(self.device.image_id, key)
+        if cached is not None:
+            result, button_offset = cached
+            if method != 'appear_on':
+                # Template matching moves the button to where it matched
+                button._button_offset = button_offset
+            return result
+
+        if method == 'appear_on':
+            result = button.appear_on(self.device.image, threshold=threshold)
+        else:
+            result = button.__getattribute__(method)(self.device.image, offset=offset, threshold=threshold)
+        cache.set(key, (result, button._button_offset))
+        return result
+
+    def match_binary(self, button, offset=30, threshold=0.85):
+        """
+        Cached `Button.match_binary()` on current screenshot.
+        """
+        return self.cached_detect(button, method='match_binary', offset=offset, threshold=threshold)
+
+    def match_luma(self, button, offset=30, threshold=0.85):
+        """
+        Cached `Button.match_luma()` on current screenshot.
+        """
+        return self.cached_detect(button, method='match_luma', offset=offset, threshold=threshold)
+
+    def _appear_interval_reached(self, button, interval):
+        """
+        Args:
+            button (Button, Template, HierarchyButton):
+            interval (int, float):
+
+        Returns:
+            bool: False if button is still in its interval and should be considered not appeared.
+        """
+        if button.name in self.interval_timer:
+            if self.interval_timer[button.name].limit != interval:
+                self.interval_timer[button.name] = Timer(interval)
+        else:
+            self.interval_timer[button.name] = Timer(interval)
+        return self.interval_timer[button.name].reached()
+
+    def appear_any(self, buttons, offset=0, interval=0, threshold=None):
+        """
+        Batched version of `appear()`, detect a group of buttons on the current screenshot.
+        Color checks of all buttons are done in one vectorized pass,
+        template matching shares crops among buttons whose search areas overlap.
+
+        Args:
+            buttons (ButtonSet, list[Button]):
+            offset (bool, int):
+            interval (int, float): interval between two active events.
+            threshold (int, float): 0 to 1 if use offset, bigger means more similar,
+                0 to 255 if not use offset, smaller means more similar
+
+        Returns:
+            Button: The first appeared button in the given order, or None if nothing appeared.
+
+        Examples:
+            ```
+            button = self.appear_any([GET_ITEMS_1, GET_ITEMS_2, GET_SHIP], offset=(30, 30), interval=3)
+            if button is not None:
+                self.device.click(button)
+            ```
+        """
+        if not isinstance(buttons, ButtonSet):
+            buttons = ButtonSet(buttons)
+        for button in buttons:
+            self.device.stuck_record_add(button)
+
+        appear = None
+        if offset:
+            if isinstance(offset, bool):
+                offset = self.config.BUTTON_OFFSET
+            if threshold is None:
+                threshold = self.config.BUTTON_MATCH_SIMILARITY
+            cache = self.detection_cache
+            for button, parsed, search in buttons.iter_search(self.device.image, offset=offset):
+                if interval and not self._appear_interval_reached(button, interval):
+                    continue
+                key = cache.key('match', button, offset, threshold)
+                cached = cache.get(self.device.image_id, key)
+                if cached is not None:
+                    matched, button._button_offset = cached
+                else:
+                    button.ensure_template()
+                    matched = button.match_on_search(search, offset=parsed, threshold=threshold)
+                    cache.set(key, (matched, button._button_offset))
+                if matched:
+                    appear = button
+                    break
+        else:
+            if threshold is None:
+                threshold = self.config.COLOR_SIMILAR_THRESHOLD
+            cache = self.detection_cache
+            result = buttons.appear_on(self.device.image, threshold=threshold)
+            cache.update(self.device.image_id)
+            for button, matched in zip(buttons, result):
+                cache.set(cache.key('appear_on', button, 0, threshold), (bool(matched), None))
+            for button, matched in zip(buttons, result):
+                if interval and not self._appear_interval_reached(button, interval):
+                    continue
+                if matched:
+                    appear = button
+                    break
+
+        if appear is not None and interval:
+            self.interval_timer[appear.name].reset()
+
+        return appear
+
+    def appear_then_click_any(self, buttons, offset=0, interval=0, threshold=None):
+        """
+        Batched version of `appear_then_click()`.
+
+        Returns:
+            Button: The clicked button, or None if nothing appeared.
+        """
+        button = self.appear_any(buttons, offset=offset, interval=interval, threshold=threshold)
+        if button is not None:
+            self.device.click(button)
+        return button
+
     def appear_then_click(self, button, screenshot=False, genre='items', offset=0, interval=0, threshold=None):
         button = self.ensure_button(button)
         appear = self.appear(button, offset=offset, interval=interval, threshold=threshold)
@@ -213,7 +431,8 @@ class ModuleBase:
                 self.device.screenshot()
 
             if button._match_init:
-                if button.match(self.device.image, offset=(0, 0)):
+                # Unchanged screenshot always matches the template loaded from previous one
+                if self.device.image_unchanged or button.match(self.device.image, offset=(0, 0)):
                     if timer.reached():
                         break
                 else:
@@ -4,9 +4,11 @@ import traceback
 import imageio
 from PIL import ImageDraw
 
+from module.base.asset_bundle import ASSET_BUNDLE
 from module.base.decorator import cached_property
 from module.base.resource import Resource
 from module.base.utils import *
+import module.config.server as server
 from module.config.server import VALID_SERVER
 
 
@@ -151,7 +153,10 @@ class Button(Resource):
         If needs to call self.match, call this first.
         """
         if not self._match_init:
-            if self.is_gif:
+            image = ASSET_BUNDLE.get(self.file, area=self.area)
+            if image is not None:
+                self.image = image
+            elif self.is_gif:
                 self.image = []
                 for image in imageio.mimread(self.file):
                     image = image[:, :, :3].copy() if len(image.shape) == 3 else image
@@ -167,7 +172,10 @@ class Button(Resource):
         If needs to call self.match, call this first.
         """
         if not self._match_binary_init:
-            if self.is_gif:
+            image = ASSET_BUNDLE.get(self.file, area=self.area, variant='binary')
+            if image is not None:
+                self.image_binary = image
+            elif self.is_gif:
                 self.image_binary = []
                 for image in self.image:
                     image_gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
@@ -180,7 +188,10 @@ class Button(Resource):
 
     def ensure_luma_template(self):
         if not self._match_luma_init:
-            if self.is_gif:
+            image = ASSET_BUNDLE.get(self.file, area=self.area, variant='luma')
+            if image is not None:
+                self.image_luma = image
+            elif self.is_gif:
                 self.image_luma = []
                 for image in self.image:
                     luma = rgb2luma(image)
@@ -211,15 +222,39 @@ class Button(Resource):
         """
         self.ensure_template()
 
+        offset = self.parse_offset(offset)
+        image = crop(image, offset + self.area, copy=False)
+        return self.match_on_search(image, offset=offset, threshold=threshold)
+
+    @staticmethod
+    def parse_offset(offset):
+        """
+        Args:
+            offset (int, tuple): Detection area offset.
+
+        Returns:
+            np.ndarray: (x1, y1, x2, y2) relative to button area.
+        """
         if isinstance(offset, tuple):
             if len(offset) == 2:
-                offset = np.array((-offset[0], -offset[1], offset[0], offset[1]))
+                return np.array((-offset[0], -offset[1], offset[0], offset[1]))
             else:
-                offset = np.array(offset)
+                return np.array(offset)
         else:
-            offset = np.array((-3, -offset, 3, offset))
-        image = crop(image, offset + self.area, copy=False)
+            return np.array((-3, -offset, 3, offset))
 
+    def match_on_search(self, image, offset, threshold=0.85):
+        """
+        Template matching on an image which is already cropped to the search area.
+
+        Args:
+            image: Search area cropped from screenshot, `crop(screenshot, offset + self.area)`.
+            offset (np.ndarray): Detection area offset, from `parse_offset()`.
+            threshold (float): 0-1. Similarity.
+
+        Returns:
+            bool.
+        """
         if self.is_gif:
             for template in self.image:
                 res = cv2.matchTemplate(template, image, cv2.TM_CCOEFF_NORMED)
@@ -395,6 +430,156 @@ class Button(Resource):
         return out
 
 
+class ButtonSet:
+    def __init__(self, buttons, name=None):
+        """
+        A group of buttons which are usually detected on the same screenshot,
+        such as check buttons of all pages or popups handled in one loop.
+
+        Args:
+            buttons (list[Button]):
+            name (str):
+
+        Examples:
+            POPUPS = ButtonSet([POPUP_CONFIRM, POPUP_CANCEL, GET_ITEMS_1])
+            button = self.appear_any(POPUPS, offset=(30, 30), interval=3)
+        """
+        self.buttons = list(buttons)
+        self.name = name if name else 'BUTTON_SET'
+        # Key: (server, offset), value: list of (search_area, list[int])
+        self._search_groups = {}
+
+    def __iter__(self):
+        return iter(self.buttons)
+
+    def __len__(self):
+        return len(self.buttons)
+
+    def __str__(self):
+        return self.name
+
+    __repr__ = __str__
+
+    def appear_on(self, image, threshold=10):
+        """
+        Vectorized `Button.appear_on()`.
+        Average colors of all buttons are calculated from one integral image of their bounding box,
+        instead of cropping and calculating area by area.
+
+        Args:
+            image (np.ndarray): Screenshot.
+            threshold (int): Default to 10.
+
+        Returns:
+            np.ndarray: Array of bool, True if button appears on screenshot.
+        """
+        if not self.buttons:
+            return np.array([], dtype=bool)
+
+        for button in self.buttons:
+            dedither_area(image, button.area)
+        # Round like crop()
+        area = np.round(np.array([button.area for button in self.buttons], dtype=float)).astype(int)
+        color = np.array([button.color for button in self.buttons]).astype(int)
+        h, w = image.shape[:2]
+        # Outside of image is black, which means it adds nothing to the sum but still counts in size
+        x1, x2 = np.clip(area[:, 0], 0, w), np.clip(area[:, 2], 0, w)
+        y1, y2 = np.clip(area[:, 1], 0, h), np.clip(area[:, 3], 0, h)
+        x2, y2 = np.maximum(x1, x2), np.maximum(y1, y2)
+        bx, by = np.min(x1), np.min(y1)
+        integral = cv2.integral(image[by:np.max(y2), bx:np.max(x2)])
+        if integral.ndim == 2:
+            integral = integral[:, :, np.newaxis]
+        x1, x2, y1, y2 = x1 - bx, x2 - bx, y1 - by, y2 - by
+        total = integral[y2, x2] - integral[y1, x2] - integral[y2, x1] + integral[y1, x1]
+        size = np.maximum((area[:, 2] - area[:, 0]) * (area[:, 3] - area[:, 1]), 1)
+        mean = total / size[:, np.newaxis]
+        if mean.shape[1] < 3:
+            # Grayscale image, follow cv2.mean() which returns (v, 0, 0, 0)
+            mean = np.pad(mean, ((0, 0), (0, 3 - mean.shape[1])))
+        mean = mean[:, :3]
+
+        # Same as color_similar()
+        diff = mean.astype(int) - color
+        diff = np.max(np.maximum(diff, 0), axis=1) - np.min(np.minimum(diff, 0), axis=1)
+        return diff <= threshold
+
+    def search_groups(self, offset):
+        """
+        Group buttons whose search areas overlap.
+
+        Args:
+            offset (int, tuple): Detection area offset.
+
+        Returns:
+            list[tuple[tuple[int], list[int]]]: (search_area, index of buttons)
+        """
+        key = (server.server, offset)
+        if key in self._search_groups:
+            return self._search_groups[key]
+
+        offset = Button.parse_offset(offset)
+        groups = []
+        for index, button in enumerate(self.buttons):
+            area = offset + np.round(button.area).astype(int)
+            indexes = [index]
+            while 1:
+                merged = [group for group in groups if area_cross_area(group[0], area, threshold=0)]
+                if not merged:
+                    break
+                groups = [group for group in groups if group not in merged]
+                for group_area, group_indexes in merged:
+                    area = np.append(np.minimum(area[:2], group_area[:2]), np.maximum(area[2:], group_area[2:]))
+                    indexes += group_indexes
+            groups.append((tuple(area.tolist()), sorted(indexes)))
+
+        self._search_groups[key] = groups
+        return groups
+
+    def iter_search(self, image, offset=30):
+        """
+        Crop search areas for `Button.match_on_search()`.
+        Buttons with overlapping search areas share the same crop.
+
+        Args:
+            image (np.ndarray): Screenshot.
+            offset (int, tuple): Detection area offset.
+
+        Yields:
+            Button, np.ndarray, np.ndarray: Button, parsed offset, search image, in the order of buttons.
+        """
+        parsed = Button.parse_offset(offset)
+        search = {}
+        for area, indexes in self.search_groups(offset):
+            for index in indexes:
+                search[index] = area
+        cropped = {}
+        for index, button in enumerate(self.buttons):
+            group = search[index]
+            if group not in cropped:
+                cropped[group] = crop(image, group, copy=False)
+            x1, y1, x2, y2 = parsed + np.round(button.area).astype(int) - np.tile(group[:2], 2)
+            yield button, parsed, cropped[group][y1:y2, x1:x2]
+
+    def match(self, image, offset=30, threshold=0.85):
+        """
+        `Button.match()` on all buttons.
+
+        Args:
+            image: Screenshot.
+            offset (int, tuple): Detection area offset.
+            threshold (float): 0-1. Similarity.
+
+        Returns:
+            np.ndarray: Array of bool.
+        """
+        result = []
+        for button, parsed, search in self.iter_search(image, offset=offset):
+            button.ensure_template()
+            result.append(button.match_on_search(search, offset=parsed, threshold=threshold))
+        return np.array(result, dtype=bool)
+
+
 class ButtonGrid:
     def __init__(self, origin, delta, button_shape, grid_shape, name=None):
         self.origin = np.array(origin)
@@ -110,6 +110,10 @@ def release_resources(next_task=''):
             models = ['cnocr', 'jp', 'tw']
         else:
             models = ['azur_lane', 'cnocr', 'jp', 'tw']
+        if State.supervised:
+            # Models preloaded by supervisor are shared with other instances, releasing them frees nothing
+            from module.webui.supervisor import PRELOAD_OCR_MODELS
+            models = [model for model in models if model not in PRELOAD_OCR_MODELS]
         for model in models:
             del_cached_property(OCR_MODEL, model)
 
@@ -2,6 +2,7 @@ import os
 
 import imageio
 
+from module.base.asset_bundle import ASSET_BUNDLE
 from module.base.button import Button
 from module.base.decorator import cached_property
 from module.base.resource import Resource
@@ -37,8 +38,24 @@ class Template(Resource):
     def is_gif(self):
         return os.path.splitext(self.file)[1] == '.gif'
 
+    @property
+    def _bundle_available(self):
+        """
+        Bundle stores images loaded by Template itself, subclasses that load differently can't use it.
+        """
+        cls = type(self)
+        return cls.image is Template.image and cls.pre_process is Template.pre_process
+
+    def _bundle_get(self, variant):
+        if self._bundle_available:
+            return ASSET_BUNDLE.get(self.file, variant=variant)
+        else:
+            return None
+
     @property
     def image(self):
+        if self._image is None:
+            self._image = self._bundle_get('image')
         if self._image is None:
             if self.is_gif:
                 self._image = []
@@ -61,6 +78,8 @@ class Template(Resource):
 
     @property
     def image_binary(self):
+        if self._image_binary is None:
+            self._image_binary = self._bundle_get('binary')
         if self._image_binary is None:
             if self.is_gif:
                 self._image_binary = []
@@ -76,6 +95,8 @@ class Template(Resource):
 
     @property
     def image_luma(self):
+        if self._image_luma is None:
+            self._image_luma = self._bundle_get('luma')
         if self._image_luma is None:
             if self.is_gif:
                 self._image_luma = []
@@ -114,23 +135,42 @@ class Template(Resource):
         else:
             return self.image.shape[0:2][::-1]
 
-    def match(self, image, scaling=1.0, similarity=0.85):
+    @staticmethod
+    def _match_template(image, template, similarity=0.85, pyramid=False):
+        """
+        Args:
+            image (np.ndarray):
+            template (np.ndarray):
+            similarity (float): 0 to 1.
+            pyramid (bool): True to search coarse-to-fine, see match_template_pyramid().
+
+        Returns:
+            np.ndarray: Result of cv2.matchTemplate()
+        """
+        if pyramid:
+            return match_template_pyramid(image, template, similarity=similarity)
+        else:
+            return cv2.matchTemplate(image, template, cv2.TM_CCOEFF_NORMED)
+
+    def match(self, image, scaling=1.0, similarity=0.85, pyramid=False):
         """
         Args:
             image:
             scaling (int, float): Scale the template to match image
             similarity (float): 0 to 1.
+            pyramid (bool): True to search coarse-to-fine, faster on large images.
 
         Returns:
             bool: If matches.
         """
+        dedither_area(image)
         scaling = 1 / scaling
         if scaling != 1.0:
             image = cv2.resize(image, None, fx=scaling, fy=scaling)
 
         if self.is_gif:
             for template in self.image:
-                res = cv2.matchTemplate(image, template, cv2.TM_CCOEFF_NORMED)
+                res = self._match_template(image, template, similarity=similarity, pyramid=pyramid)
                 _, sim, _, _ = cv2.minMaxLoc(res)
                 # print(self.file, sim)
                 if sim > similarity:
@@ -139,7 +179,7 @@ class Template(Resource):
             return False
 
         else:
-            res = cv2.matchTemplate(image, self.image, cv2.TM_CCOEFF_NORMED)
+            res = self._match_template(image, self.image, similarity=similarity, pyramid=pyramid)
             _, sim, _, _ = cv2.minMaxLoc(res)
             # print(self.file, sim)
             return sim > similarity
@@ -155,6 +195,7 @@ class Template(Resource):
         Returns:
             bool: If matches.
         """
+        dedither_area(image)
         if self.is_gif:
             # graying
             image_gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
@@ -182,6 +223,7 @@ class Template(Resource):
             return sim > similarity
 
     def match_luma(self, image, similarity=0.85):
+        dedither_area(image)
         if self.is_gif:
             image = rgb2luma(image)
             for template in self.image_luma:
@@ -227,6 +269,7 @@ class Template(Resource):
             float: Similarity
             Button:
         """
+        dedither_area(image)
         res = cv2.matchTemplate(image, self.image, cv2.TM_CCOEFF_NORMED)
         _, sim, _, point = cv2.minMaxLoc(res)
         # print(self.file, sim)
@@ -235,6 +278,7 @@ class Template(Resource):
         return sim, button
 
     def match_luma_result(self, image, name=None):
+        dedither_area(image)
         image = rgb2luma(image)
         res = cv2.matchTemplate(image, self.image_luma, cv2.TM_CCOEFF_NORMED)
         _, sim, _, point = cv2.minMaxLoc(res)
@@ -243,7 +287,7 @@ class Template(Resource):
         button = self._point_to_button(point, image=image, name=name)
         return sim, button
 
-    def match_multi(self, image, scaling=1.0, similarity=0.85, threshold=3, name=None):
+    def match_multi(self, image, scaling=1.0, similarity=0.85, threshold=3, name=None, pyramid=False):
         """
         Args:
             image:
@@ -251,10 +295,12 @@ class Template(Resource):
             similarity (float): 0 to 1.
             threshold (int): Distance to delete nearby results.
             name (str):
+            pyramid (bool): True to search coarse-to-fine, faster on large images.
 
         Returns:
             list[Button]:
         """
+        dedither_area(image)
         scaling = 1 / scaling
         if scaling != 1.0:
             image = cv2.resize(image, None, fx=scaling, fy=scaling)
@@ -263,12 +309,12 @@ class Template(Resource):
         if self.is_gif:
             result = []
             for template in self.image:
-                res = cv2.matchTemplate(image, template, cv2.TM_CCOEFF_NORMED)
+                res = self._match_template(image, template, similarity=similarity, pyramid=pyramid)
                 res = np.array(np.where(res > similarity)).T[:, ::-1].tolist()
                 result += res
             result = np.array(result)
         else:
-            result = cv2.matchTemplate(image, self.image, cv2.TM_CCOEFF_NORMED)
+            result = self._match_template(image, self.image, similarity=similarity, pyramid=pyramid)
             result = np.array(np.where(result > similarity)).T[:, ::-1]
 
         # result: np.array([[x0, y0], [x1, y1], ...)
@@ -531,6 +531,72 @@ def save_image(image, file):
     Image.fromarray(image).save(file)
 
 
+class LazyDeditherImage(np.ndarray):
+    """
+    Screenshot that is de-dithered lazily.
+
+    `cv2.fastNlMeansDenoising` on the whole 1280x720 image costs 40-60ms,
+    here only areas accessed through `crop()` get denoised, on their first access, in blocks of 32x32.
+    Blocks are denoised from a raw copy with padding, so results are the same as denoising the whole image.
+
+    Views and copies are plain images, they don't dedither anymore.
+    """
+    BLOCK = 32
+    PADDING = 4
+
+    def __new__(cls, image):
+        obj = image.view(cls)
+        obj._raw = image.copy()
+        h, w = image.shape[:2]
+        obj._done = np.zeros((-(-h // cls.BLOCK), -(-w // cls.BLOCK)), dtype=bool)
+        return obj
+
+    def __array_finalize__(self, obj):
+        self._raw = None
+        self._done = None
+
+    def dedither(self, area=None):
+        """
+        Args:
+            area (tuple): Area to dedither, or None for the whole image.
+        """
+        if self._done is None:
+            return
+        h, w = self.shape[:2]
+        if area is None:
+            x1, y1, x2, y2 = 0, 0, w, h
+        else:
+            x1, y1, x2, y2 = map(int, map(round, area))
+            x1, y1, x2, y2 = max(x1, 0), max(y1, 0), min(x2, w), min(y2, h)
+        if x2 <= x1 or y2 <= y1:
+            return
+        block = self.BLOCK
+        bx1, by1, bx2, by2 = x1 // block, y1 // block, -(-x2 // block), -(-y2 // block)
+        if self._done[by1:by2, bx1:bx2].all():
+            return
+
+        x1, y1, x2, y2 = bx1 * block, by1 * block, min(bx2 * block, w), min(by2 * block, h)
+        pad = self.PADDING
+        px1, py1, px2, py2 = max(x1 - pad, 0), max(y1 - pad, 0), min(x2 + pad, w), min(y2 + pad, h)
+        denoised = cv2.fastNlMeansDenoising(
+            self._raw[py1:py2, px1:px2], None, h=17, templateWindowSize=1, searchWindowSize=2)
+        np.asarray(self)[y1:y2, x1:x2] = denoised[y1 - py1:y2 - py1, x1 - px1:x2 - px1]
+        self._done[by1:by2, bx1:bx2] = True
+
+
+def dedither_area(image, area=None):
+    """
+    Make sure an area of image is de-dithered before reading it.
+    Does nothing if image is not a LazyDeditherImage.
+
+    Args:
+        image (np.ndarray):
+        area (tuple): Area to dedither, or None for the whole image.
+    """
+    if isinstance(image, LazyDeditherImage):
+        image.dedither(area)
+
+
 def crop(image, area, copy=True):
     """
     Crop image like pillow, when using opencv / numpy.
@@ -544,6 +610,7 @@ def crop(image, area, copy=True):
     Returns:
         np.ndarray:
     """
+    dedither_area(image, area)
     x1, y1, x2, y2 = map(int, map(round, area))
     h, w = image.shape[:2]
     border = np.maximum((0 - y1, y2 - h, 0 - x1, x2 - w), 0)
@@ -681,6 +748,54 @@ def rgb2luma(image):
     return luma
 
 
+def match_template_pyramid(image, template, similarity=0.85, level=1, margin=0.15):
+    """
+    Coarse-to-fine `cv2.matchTemplate(image, template, cv2.TM_CCOEFF_NORMED)`.
+    Search on images downscaled by 2 ** level first,
+    then match at full resolution only around candidates whose coarse similarity > similarity - margin.
+
+    Args:
+        image (np.ndarray):
+        template (np.ndarray):
+        similarity (float): Similarity to find at full resolution.
+        level (int): Number of times to downscale by 2.
+        margin (float): Coarse similarity is lower than full resolution one, candidates need a margin.
+
+    Returns:
+        np.ndarray: Result in the same shape as cv2.matchTemplate(),
+            positions not around any candidate are filled with -1.
+    """
+    scale = 2 ** level
+    th, tw = template.shape[:2]
+    ih, iw = image.shape[:2]
+    # Too small to downscale, or search area is not larger than template much
+    if min(th, tw) < 8 * scale or ih - th < 4 * scale or iw - tw < 4 * scale:
+        return cv2.matchTemplate(image, template, cv2.TM_CCOEFF_NORMED)
+
+    small_image, small_template = image, template
+    for _ in range(level):
+        small_image = cv2.pyrDown(small_image)
+        small_template = cv2.pyrDown(small_template)
+    coarse = cv2.matchTemplate(small_image, small_template, cv2.TM_CCOEFF_NORMED)
+
+    height, width = ih - th + 1, iw - tw + 1
+    result = np.full((height, width), -1, dtype=np.float32)
+    candidate = (coarse > similarity - margin).astype(np.uint8)
+    if not candidate.any():
+        return result
+
+    # Match each group of candidates in one window, with a tolerance of 2 coarse pixels
+    _, _, stats, _ = cv2.connectedComponentsWithStats(candidate, connectivity=8)
+    pad = 2 * scale
+    for x, y, w, h, _ in stats[1:]:
+        x1, y1 = max(x * scale - pad, 0), max(y * scale - pad, 0)
+        x2, y2 = min((x + w) * scale + pad, width), min((y + h) * scale + pad, height)
+        window = image[y1:y2 + th - 1, x1:x2 + tw - 1]
+        result[y1:y2, x1:x2] = cv2.matchTemplate(window, template, cv2.TM_CCOEFF_NORMED)
+
+    return result
+
+
 def get_color(image, area):
     """Calculate the average color of a particular area of the image.
 
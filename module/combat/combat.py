@@ -83,16 +83,16 @@ class Combat(Level, HPBalancer, Retirement, SubmarineCall, CombatAuto, CombatMan
         """
         self.device.stuck_record_add(PAUSE)
         if self.config.SERVER in ['cn', 'en']:
-            if PAUSE.match_luma(self.device.image, offset=(20, 20)):
+            if self.match_luma(PAUSE, offset=(20, 20)):
                 return PAUSE
         else:
             color = get_color(self.device.image, PAUSE.area)
             if color_similar(color, PAUSE.color) or color_similar(color, (238, 244, 248)):
                 if np.max(self.image_crop(PAUSE_DOUBLE_CHECK, copy=False)) < 153:
                     return PAUSE
-        if PAUSE_New.match_luma(self.device.image, offset=(20, 20)):
+        if self.match_luma(PAUSE_New, offset=(20, 20)):
             return PAUSE_New
-        if PAUSE_Iridescent_Fantasy.match_luma(self.device.image, offset=(20, 20)):
+        if self.match_luma(PAUSE_Iridescent_Fantasy, offset=(20, 20)):
             return PAUSE_Iridescent_Fantasy
         return False
 
@@ -100,15 +100,15 @@ class Combat(Level, HPBalancer, Retirement, SubmarineCall, CombatAuto, CombatMan
         timer = self.get_interval_timer(QUIT, interval=interval)
         if not timer.reached():
             return False
-        if QUIT.match_luma(self.device.image, offset=offset):
+        if self.match_luma(QUIT, offset=offset):
             self.device.click(QUIT)
             timer.reset()
             return True
-        if QUIT_New.match_luma(self.device.image, offset=offset):
+        if self.match_luma(QUIT_New, offset=offset):
             self.device.click(QUIT_New)
             timer.reset()
             return True
-        if QUIT_Iridescent_Fantasy.match_luma(self.device.image, offset=offset):
+        if self.match_luma(QUIT_Iridescent_Fantasy, offset=offset):
             self.device.click(QUIT_Iridescent_Fantasy)
             timer.reset()
             return True
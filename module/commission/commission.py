@@ -1,7 +1,6 @@
 import copy
 from datetime import datetime, timedelta
 
-from scipy import signal
 
 from module.base.timer import Timer
 from module.base.utils import *
@@ -41,6 +40,7 @@ def lines_detect(image):
     # (597, 0, 619, 720) is somewhere with white lines only.
     color_height = np.mean(rgb2gray(crop(image, (597, 0, 619, 720), copy=False)), axis=1)
     parameters = {'height': 200, 'distance': 100}
+    from scipy import signal
     peaks, _ = signal.find_peaks(color_height, **parameters)
     # 67 is the height of commission list header
     # 117 is the height of one commission card.
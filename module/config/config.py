@@ -1,14 +1,17 @@
 import copy
 import datetime
-import operator
+import heapq
 import threading
 
 import pywebio
 
+from module.base.decorator import cached_property
 from module.base.filter import Filter
+from module.base.timer import Timer
 from module.config.config_generated import GeneratedConfig
 from module.config.config_manual import ManualConfig, OutputConfig
 from module.config.config_updater import ConfigUpdater
+from module.config.journal import journal_append, journal_clear
 from module.config.watcher import ConfigWatcher
 from module.config.utils import *
 from module.exception import RequestHumanTakeover, ScriptError
@@ -42,6 +45,189 @@ class Function:
             return False
 
 
+class SchedulerIndex:
+    """
+    Tasks to schedule, indexed from config data.
+
+    Tasks are kept in a heap keyed by (next_run, rank), rank is the position in SCHEDULER_PRIORITY.
+    Changing a task costs O(log n), getting pending tasks costs O(k log n) where k is the number of pending tasks,
+    instead of creating all Function objects and filtering them with SCHEDULER_PRIORITY every time.
+    """
+    # Key: SCHEDULER_PRIORITY. Value: dict, key: command in lowercase, value: rank
+    _ranks_cache = {}
+
+    def __init__(self, priority):
+        """
+        Args:
+            priority (str): SCHEDULER_PRIORITY
+        """
+        self.ranks = self.priority_to_ranks(priority)
+        # Key: section in config data. Value: tuple, (Scheduler.Enable, Scheduler.Command, Scheduler.NextRun)
+        self.state = {}
+        # Key: section. Value: Function
+        self.functions = {}
+        # Key: section. Value: int, order in config data, to sort tasks in the same rank
+        self.order = {}
+        # Key: section. Value: tuple, heap entry (next_run, rank, order, section) of schedulable tasks
+        self.entries = {}
+        # Heap of entries. Entries replaced or removed are dropped when popped
+        self.heap = []
+        # Sections of enabled tasks whose NextRun is not a datetime
+        self.error_sections = set()
+
+    @classmethod
+    def priority_to_ranks(cls, priority):
+        """
+        Args:
+            priority (str): SCHEDULER_PRIORITY
+
+        Returns:
+            dict: Key: command in lowercase. Value: rank. Commands not in priority will never be scheduled.
+        """
+        try:
+            return cls._ranks_cache[priority]
+        except KeyError:
+            pass
+        # Parse with Filter, the same as filtering tasks with it
+        f = Filter(regex=r"(.*)", attr=["command"])
+        f.load(priority)
+        ranks = {}
+        for rank, (command,) in enumerate(f.filter):
+            if command not in ranks:
+                ranks[command] = rank
+        cls._ranks_cache[priority] = ranks
+        return ranks
+
+    def set(self, section, enable, command, next_run):
+        """
+        Update a task, O(log n).
+
+        Args:
+            section (str): Section in config data, such as `Main`
+            enable (bool): Scheduler.Enable
+            command (str): Scheduler.Command
+            next_run (datetime): Scheduler.NextRun
+        """
+        self.state[section] = (enable, command, next_run)
+        func = Function({"Scheduler": {"Enable": enable, "Command": command, "NextRun": next_run}})
+        self.functions[section] = func
+        if section not in self.order:
+            self.order[section] = len(self.order)
+
+        self.error_sections.discard(section)
+        rank = self.ranks.get(str(func.command).lower())
+        if not func.enable:
+            self.entries.pop(section, None)
+        elif not isinstance(func.next_run, datetime):
+            self.entries.pop(section, None)
+            self.error_sections.add(section)
+        elif rank is None:
+            self.entries.pop(section, None)
+        else:
+            entry = (func.next_run, rank, self.order[section], section)
+            if self.entries.get(section) != entry:
+                self.entries[section] = entry
+                heapq.heappush(self.heap, entry)
+                self._compact()
+
+    def remove(self, section):
+        self.state.pop(section, None)
+        self.functions.pop(section, None)
+        self.entries.pop(section, None)
+        self.error_sections.discard(section)
+
+    def _compact(self):
+        # Rebuild heap if too many dropped entries
+        if len(self.heap) > 2 * len(self.entries) + 32:
+            self.heap = list(self.entries.values())
+            heapq.heapify(self.heap)
+
+    def sync(self, data, sections=None):
+        """
+        Update tasks that changed in config data.
+
+        Args:
+            data (dict): Config data.
+            sections (Iterable[str]): Sections to check, None to check all.
+        """
+        if sections is None:
+            sections = data.keys()
+            for section in list(self.state.keys()):
+                if section not in data:
+                    self.remove(section)
+        for section in sections:
+            task = data.get(section)
+            if not isinstance(task, dict):
+                if section in self.state:
+                    self.remove(section)
+                continue
+            scheduler = task.get("Scheduler")
+            if not isinstance(scheduler, dict):
+                scheduler = {}
+            state = (scheduler.get("Enable"), scheduler.get("Command"), scheduler.get("NextRun"))
+            if self.state.get(section) != state:
+                self.set(section, *state)
+
+    @property
+    def error(self):
+        """
+        Returns:
+            list[Function]: Enabled tasks whose NextRun is not a datetime, in config order.
+        """
+        if not self.error_sections:
+            return []
+        return [func for section, func in self.functions.items() if section in self.error_sections]
+
+    def pending(self, now):
+        """
+        Args:
+            now (datetime):
+
+        Returns:
+            list[Function]: Tasks with NextRun before `now`, in the order of SCHEDULER_PRIORITY.
+        """
+        heap = self.heap
+        popped = []
+        while heap and heap[0][0] < now:
+            popped.append(heapq.heappop(heap))
+        pending = {}
+        for entry in popped:
+            section = entry[3]
+            if self.entries.get(section) == entry:
+                heapq.heappush(heap, entry)
+                pending[section] = entry
+        return self._to_functions(sorted(pending.values(), key=lambda e: (e[1], e[2])))
+
+    def waiting(self, now):
+        """
+        Args:
+            now (datetime):
+
+        Returns:
+            list[Function]: Tasks with NextRun after `now`, sorted by NextRun and SCHEDULER_PRIORITY.
+        """
+        return self._to_functions(entry for entry in sorted(self.entries.values()) if entry[0] >= now)
+
+    def _to_functions(self, entries):
+        """
+        Args:
+            entries (Iterable[tuple]): Heap entries.
+
+        Returns:
+            list[Function]: Functions that are equal are dropped, the same as Filter.apply()
+        """
+        out = []
+        visited = set()
+        for entry in entries:
+            func = self.functions[entry[3]]
+            key = (func.command, func.next_run)
+            if key in visited:
+                continue
+            visited.add(key)
+            out.append(func)
+        return out
+
+
 def name_to_function(name):
     """
     Args:
@@ -68,7 +254,7 @@ class AzurLaneConfig(ConfigUpdater, ManualConfig, GeneratedConfig, ConfigWatcher
             path = self.bound[key]
             self.modified[path] = value
             if self.auto_update:
-                self.update()
+                self.update_buffered()
         else:
             super().__setattr__(key, value)
 
@@ -85,6 +271,12 @@ class AzurLaneConfig(ConfigUpdater, ManualConfig, GeneratedConfig, ConfigWatcher
         self.bound = {}
         # If write after every variable modification.
         self.auto_update = True
+        # If buffer modifications and write at most once per CONFIG_SAVE_INTERVAL.
+        # Enabled by the scheduler, which writes buffered modifications at the end of tasks.
+        self.buffered_update = False
+        self.save_timer = Timer(self.CONFIG_SAVE_INTERVAL).start()
+        # Modifications written to journal. Key: Argument path in yaml file. Value: Modified value.
+        self.journaled = {}
         # Force override variables
         # Key: Argument name in GeneratedConfig. Value: Modified value.
         self.overridden = {}
@@ -193,39 +385,21 @@ class AzurLaneConfig(ConfigUpdater, ManualConfig, GeneratedConfig, ConfigWatcher
     def is_actual_task(self):
         return self.task.command.lower() not in ['alas', 'template']
 
+    @cached_property
+    def scheduler(self):
+        return SchedulerIndex(self.SCHEDULER_PRIORITY)
+
     def get_next_task(self):
         """
         Calculate tasks, set pending_task and waiting_task
         """
-        pending = []
-        waiting = []
-        error = []
         now = datetime.now()
         if AzurLaneConfig.is_hoarding_task:
             now -= self.hoarding
-        for func in self.data.values():
-            func = Function(func)
-            if not func.enable:
-                continue
-            if not isinstance(func.next_run, datetime):
-                error.append(func)
-            elif func.next_run < now:
-                pending.append(func)
-            else:
-                waiting.append(func)
+        self.scheduler.sync(self.data)
 
-        f = Filter(regex=r"(.*)", attr=["command"])
-        f.load(self.SCHEDULER_PRIORITY)
-        if pending:
-            pending = f.apply(pending)
-        if waiting:
-            waiting = f.apply(waiting)
-            waiting = sorted(waiting, key=operator.attrgetter("next_run"))
-        if error:
-            pending = error + pending
-
-        self.pending_task = pending
-        self.waiting_task = waiting
+        self.pending_task = self.scheduler.error + self.scheduler.pending(now)
+        self.waiting_task = self.scheduler.waiting(now)
 
     def get_next(self):
         """
@@ -267,6 +441,10 @@ class AzurLaneConfig(ConfigUpdater, ManualConfig, GeneratedConfig, ConfigWatcher
         # Don't use self.modified = {}, that will create a new object.
         self.modified.clear()
         self.write_file(self.config_name, data=self.data)
+        # Journal is compacted into file
+        journal_clear(self.get_filepath())
+        self.journaled.clear()
+        self.save_timer.reset()
 
     def update(self):
         self.load()
@@ -274,6 +452,38 @@ class AzurLaneConfig(ConfigUpdater, ManualConfig, GeneratedConfig, ConfigWatcher
         self.bind(self.task)
         self.save()
 
+    def update_buffered(self):
+        """
+        Same as update(), but buffer modifications if `buffered_update` is enabled.
+
+        Modifications are applied to `data` and bound arguments immediately,
+        appended to journal, and written to file at most once per CONFIG_SAVE_INTERVAL,
+        so tasks setting arguments in loops won't rewrite the whole config file every time.
+        Journal keeps buffered modifications if the process is killed, and GUI reads them through read_file().
+        """
+        if not self.buffered_update or self.CONFIG_SAVE_INTERVAL <= 0 or self.save_timer.reached():
+            self.update()
+            return
+
+        for path, value in self.modified.items():
+            deep_set(self.data, keys=path, value=value)
+        self.scheduler.sync(self.data, sections={deep_keys(path)[0] for path in self.modified.keys()})
+        for arg, path in self.bound.items():
+            if path in self.modified and arg not in self.overridden:
+                super().__setattr__(arg, self.modified[path])
+
+        delta = {k: v for k, v in self.modified.items()
+                 if k not in self.journaled or self.journaled[k] != v}
+        journal_append(self.get_filepath(), delta)
+        self.journaled.update(delta)
+
+    def update_pending(self):
+        """
+        Write buffered modifications to file, if any.
+        """
+        if self.modified:
+            self.update()
+
     def override(self, **kwargs):
         now = datetime.now().replace(microsecond=0)
         limited = set()
@@ -368,7 +578,7 @@ class AzurLaneConfig(ConfigUpdater, ManualConfig, GeneratedConfig, ConfigWatcher
         """
         self.modified[keys] = value
         if self.auto_update:
-            self.update()
+            self.update_buffered()
 
     def task_delay(self, success=None, server_update=None, target=None, minute=None, task=None):
         """
@@ -573,7 +783,7 @@ class AzurLaneConfig(ConfigUpdater, ManualConfig, GeneratedConfig, ConfigWatcher
             )
             self.modified[f"{task}.Scheduler.Enable"] = True
             if self.auto_update:
-                self.update()
+                self.update_buffered()
             return True
         else:
             logger.info(f"Task call: {task} (skipped because disabled by user)")
@@ -24,6 +24,7 @@ class GeneratedConfig:
     Emulator_ScreenshotMethod = 'auto'  # auto, ADB, ADB_nc, uiautomator2, aScreenCap, aScreenCap_nc, DroidCast, DroidCast_raw, scrcpy, nemu_ipc, ldopengl
     Emulator_ControlMethod = 'MaaTouch'  # ADB, uiautomator2, minitouch, Hermit, MaaTouch
     Emulator_ScreenshotDedithering = False
+    Emulator_ScreenshotDeditheringLazy = False
     Emulator_AdbRestart = False
 
     # Group `EmulatorInfo`
@@ -36,10 +37,13 @@ class GeneratedConfig:
     Error_SaveError = True
     Error_OnePushConfig = 'provider: null'
     Error_ScreenshotLength = 1
+    Error_ScreenshotMemoryLimit = 100
 
     # Group `Optimization`
     Optimization_ScreenshotInterval = 0.3
     Optimization_CombatScreenshotInterval = 1.0
+    Optimization_ScreenshotAdaptiveInterval = False
+    Optimization_ScreenshotPrefetch = False
     Optimization_TaskHoardingDuration = 0
     Optimization_WhenTaskQueueEmpty = 'goto_main'  # stay_there, goto_main, close_game
 
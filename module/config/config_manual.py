@@ -69,6 +69,16 @@ class ManualConfig:
     LV32_TRIGGERED = False
     STOP_IF_REACH_LV32 = False
 
+    """
+    module.config
+    """
+    # Seconds to buffer config modifications when `buffered_update` is enabled,
+    # buffered modifications are written at most once per interval, and at multi_set() exit and task end.
+    # In the meantime, they are appended to ./config/<name>.json.journal immediately,
+    # so they survive process kill and are visible to GUI.
+    # Set 0 to write on every modification.
+    CONFIG_SAVE_INTERVAL = 5
+
     """
     module.device
     """
@@ -197,6 +207,10 @@ class ManualConfig:
     DETECTION_BACKEND = 'homography'
     # In event_20200723_cn B3D3, Grid have 1.2x width, images on the grid still remain the same.
     GRID_IMAGE_A_MULTIPLY = 1.0
+    # Calculate grid features of all grids at once in View.predict()
+    MAP_PREDICT_BATCH = True
+    # Threads to predict grids, 0 or 1 to predict in current thread.
+    MAP_PREDICT_THREADS = 0
 
     """
     module.map_detection.homography
@@ -211,6 +225,10 @@ class ManualConfig:
     HOMO_CENTER_THRESHOLD = 0.8
     HOMO_CORNER_THRESHOLD = 0.8
     HOMO_RECTANGLE_THRESHOLD = 10
+    # Track tile center after the first detection, search around the position
+    # predicted from last detection and swipe, fallback to full search if not found.
+    HOMO_TRACK = True
+    HOMO_TRACK_MARGIN = 20
 
     HOMO_EDGE_DETECT = True
     HOMO_EDGE_HOUGHLINES_THRESHOLD = 180
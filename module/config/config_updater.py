@@ -9,7 +9,9 @@ from module.base.timer import timer
 from module.config.env import IS_ON_PHONE_CLOUD
 from module.config.redirect_utils.utils import *
 from module.config.server import VALID_CHANNEL_PACKAGE, VALID_PACKAGE, VALID_SERVER_LIST, to_package, to_server
+from module.config.journal import filepath_journal, journal_clear, journal_replay
 from module.config.utils import *
+from module.config.watcher import file_signature
 
 CONFIG_IMPORT = '''
 import datetime
@@ -547,7 +549,80 @@ class ConfigGenerator:
         self.generate_deploy_template()
 
 
+def copy_config(data):
+    """
+    Copy dicts and lists in config data.
+    Values are shared, they are all immutable after `parse_value()`, much faster than deepcopy.
+
+    Args:
+        data (dict):
+
+    Returns:
+        dict:
+    """
+    if isinstance(data, dict):
+        return {k: copy_config(v) for k, v in data.items()}
+    if isinstance(data, list):
+        return [copy_config(v) for v in data]
+    return data
+
+
+class ArgsCache:
+    # (signature, data) of args.json, shared by all ConfigUpdater in this process
+    cache = (None, {})
+    # (args, flat index of args)
+    index_cache = (None, {})
+
+    @classmethod
+    def get(cls):
+        """
+        Returns:
+            dict: Content of args.json, the same object until the file is modified.
+        """
+        signature = file_signature(filepath_args())
+        if signature is None or signature != cls.cache[0]:
+            cls.cache = (signature, read_file(filepath_args()))
+        return cls.cache[1]
+
+    @classmethod
+    def index(cls, args):
+        """
+        Args:
+            args (dict): Content of args.json
+
+        Returns:
+            dict: Key: tuple[str], argument path, such as ('Main', 'Campaign', 'Name').
+                Value: dict, argument definition.
+        """
+        if cls.index_cache[0] is not args:
+            cls.index_cache = (args, deep_flat(args, depth=3))
+        return cls.index_cache[1]
+
+
+class ResidentConfig:
+    """
+    A parsed config file kept in memory between reads.
+    """
+
+    def __init__(self, signature, args, old, new):
+        """
+        Args:
+            signature (tuple): file_signature() of the config file and its journal.
+            args (dict): args.json that `new` was parsed with.
+            old (dict): Raw content of the config file.
+            new (dict): Updated config, must not be modified.
+        """
+        self.signature = signature
+        self.args = args
+        self.old = old
+        self.new = new
+
+
 class ConfigUpdater:
+    # Parsed config files, shared by all ConfigUpdater in this process.
+    # Key: (filepath, is_template). Value: ResidentConfig
+    resident = {}
+
     # source, target, (optional)convert_func
     redirection = [
         # ('OpsiDaily.OpsiDaily.BuySupply', 'OpsiShop.Scheduler.Enable'),
@@ -604,7 +679,42 @@ class ConfigUpdater:
 
     @cached_property
     def args(self):
-        return read_file(filepath_args())
+        return ArgsCache.get()
+
+    @cached_property
+    def args_index(self):
+        return ArgsCache.index(self.args)
+
+    @staticmethod
+    def config_parse(value, data, is_template=False):
+        """
+        Args:
+            value: Raw value in old config, None if not exists.
+            data (dict): Argument definition in args.json
+            is_template (bool):
+
+        Returns:
+            Parsed value.
+        """
+        typ = data['type']
+        if is_template or value is None or value == '' \
+                or typ == 'lock' or typ == 'state' or (typ != 'stored' and data.get('display') == 'hide'):
+            value = data['value']
+        return parse_value(value, data=data)
+
+    def config_load(self, old, new, keys, is_template=False):
+        """
+        Load an argument from old config into new config.
+
+        Args:
+            old (dict):
+            new (dict):
+            keys (tuple[str]): Argument path, such as ('Main', 'Campaign', 'Name')
+            is_template (bool):
+        """
+        data = self.args_index.get(keys, {})
+        value = self.config_parse(deep_get(old, keys=keys), data, is_template=is_template)
+        deep_set(new, keys=keys, value=value)
 
     def config_update(self, old, is_template=False):
         """
@@ -615,22 +725,87 @@ class ConfigUpdater:
         Returns:
             dict:
         """
+        # Same as calling config_load() on every argument, but walk dicts level by level
         new = {}
+        parse = self.config_parse
+        for task, groups in self.args.items():
+            old_task = old.get(task)
+            if not isinstance(old_task, dict):
+                old_task = {}
+            new_task = {}
+            for group, arguments in groups.items():
+                old_group = old_task.get(group)
+                if not isinstance(old_group, dict):
+                    old_group = {}
+                new_group = {}
+                for arg, data in arguments.items():
+                    new_group[arg] = parse(old_group.get(arg), data, is_template=is_template)
+                if new_group:
+                    new_task[group] = new_group
+            if new_task:
+                new[task] = new_task
+
+        return self.config_update_rules(old, new, is_template=is_template)
+
+    def config_update_incremental(self, resident, old, is_template=False):
+        """
+        Update config from a previous result, only arguments changed in file are loaded again.
+        Result is the same as `config_update(old)`.
 
-        def deep_load(keys):
-            data = deep_get(self.args, keys=keys, default={})
-            value = deep_get(old, keys=keys, default=data['value'])
-            typ = data['type']
-            display = data.get('display')
-            if is_template or value is None or value == '' \
-                    or typ in ['lock', 'state'] or (display == 'hide' and typ != 'stored'):
-                value = data['value']
-            value = parse_value(value, data=data)
-            deep_set(new, keys=keys, value=value)
-
-        for path, _ in deep_iter(self.args, depth=3):
-            deep_load(path)
+        Args:
+            resident (ResidentConfig): Previous result.
+            old (dict): New raw content of the config file.
+            is_template (bool):
 
+        Returns:
+            dict:
+        """
+        new = copy_config(resident.new)
+        for path in self.config_diff(resident.old, old):
+            self.config_load(old, new, path, is_template=is_template)
+
+        return self.config_update_rules(old, new, is_template=is_template)
+
+    def config_diff(self, before, after):
+        """
+        Args:
+            before (dict): Raw content of a config file.
+            after (dict): Raw content of a config file.
+
+        Yields:
+            tuple[str]: Path of arguments that have different values.
+        """
+        for task, groups in self.args.items():
+            task_before = before.get(task)
+            task_after = after.get(task)
+            if task_before == task_after:
+                continue
+            task_before = task_before if isinstance(task_before, dict) else {}
+            task_after = task_after if isinstance(task_after, dict) else {}
+            for group, arguments in groups.items():
+                group_before = task_before.get(group)
+                group_after = task_after.get(group)
+                if group_before == group_after:
+                    continue
+                group_before = group_before if isinstance(group_before, dict) else {}
+                group_after = group_after if isinstance(group_after, dict) else {}
+                for arg in arguments.keys():
+                    if group_before.get(arg) != group_after.get(arg):
+                        yield task, group, arg
+
+    def config_update_rules(self, old, new, is_template=False):
+        """
+        Rules that depend on multiple arguments, applied after arguments are loaded.
+        All rules are idempotent, so they can run again on a updated config.
+
+        Args:
+            old (dict):
+            new (dict):
+            is_template (bool):
+
+        Returns:
+            dict:
+        """
         # AzurStatsID
         if is_template:
             deep_set(new, 'Alas.DropRecord.AzurStatsID', None)
@@ -763,6 +938,9 @@ class ConfigUpdater:
         """
         Read and update config file.
 
+        Parsed config is kept resident in memory, reading an unmodified file costs a dict copy only,
+        and reading a modified file loads the changed arguments only.
+
         Args:
             config_name (str): ./config/{file}.json
             is_template (bool):
@@ -770,8 +948,27 @@ class ConfigUpdater:
         Returns:
             dict:
         """
-        old = read_file(filepath_config(config_name))
-        new = self.config_update(old, is_template=is_template)
+        file = filepath_config(config_name)
+        key = (file, is_template)
+        # Get signature before reading, so changes during reading will be noticed next time
+        signature = file_signature(file)
+        if signature is not None:
+            signature = (signature, file_signature(filepath_journal(file)))
+        resident = self.resident.get(key)
+        if resident is not None and resident.args is not self.args:
+            resident = None
+        if signature is not None and resident is not None and resident.signature == signature:
+            return copy_config(resident.new)
+
+        old = read_file(file)
+        journal_replay(file, old)
+        if resident is None:
+            new = self.config_update(old, is_template=is_template)
+        else:
+            new = self.config_update_incremental(resident, old, is_template=is_template)
+        if signature is not None:
+            self.resident[key] = ResidentConfig(signature=signature, args=self.args, old=old, new=new)
+            new = copy_config(new)
         # The updated config did not write into file, although it doesn't matters.
         # Commented for performance issue
         # self.write_file(config_name, new)
@@ -787,7 +984,10 @@ class ConfigUpdater:
             data (dict):
             mod_name (str):
         """
-        write_file(filepath_config(config_name, mod_name), data)
+        file = filepath_config(config_name, mod_name)
+        write_file(file, data)
+        # Journal is included in data, as data comes from read_file()
+        journal_clear(file)
 
     @timer
     def update_file(self, config_name, is_template=False):
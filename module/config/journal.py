@@ -0,0 +1,82 @@
+import json
+import os
+
+from filelock import FileLock
+
+from module.config.utils import deep_set
+
+
+def filepath_journal(file):
+    """
+    Args:
+        file (str): Config file, such as ./config/alas.json
+
+    Returns:
+        str: Such as ./config/alas.json.journal
+    """
+    return f'{file}.journal'
+
+
+def journal_append(file, modified):
+    """
+    Append config modifications to journal, as one json line.
+    Much cheaper than writing the whole config file.
+
+    Args:
+        file (str): Config file, such as ./config/alas.json
+        modified (dict): Key: Argument path, such as `Main.Scheduler.NextRun`. Value: Modified value.
+    """
+    if not modified:
+        return
+    line = json.dumps(modified, ensure_ascii=False, default=str)
+    with FileLock(f'{file}.lock'):
+        with open(filepath_journal(file), 'a', encoding='utf-8', newline='') as f:
+            f.write(line + '\n')
+
+
+def journal_replay(file, data):
+    """
+    Apply modifications in journal to raw config data.
+
+    Args:
+        file (str): Config file, such as ./config/alas.json
+        data (dict): Raw content of the config file, will be modified.
+
+    Returns:
+        int: Number of records applied.
+    """
+    journal = filepath_journal(file)
+    if not os.path.exists(journal):
+        return 0
+    with FileLock(f'{file}.lock'):
+        with open(journal, 'r', encoding='utf-8') as f:
+            lines = f.readlines()
+
+    count = 0
+    for line in lines:
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            # Incomplete line, process died while writing
+            continue
+        for path, value in record.items():
+            deep_set(data, keys=path, value=value)
+        count += 1
+    return count
+
+
+def journal_clear(file):
+    """
+    Remove journal, should be called after the whole config file is written.
+
+    Args:
+        file (str): Config file, such as ./config/alas.json
+    """
+    journal = filepath_journal(file)
+    if not os.path.exists(journal):
+        return
+    with FileLock(f'{file}.lock'):
+        try:
+            os.remove(journal)
+        except FileNotFoundError:
+            pass
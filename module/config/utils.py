@@ -201,6 +201,33 @@ def alas_instance():
     return out
 
 
+# Key: str, such as `Scheduler.NextRun.value`. Value: tuple[str], such as ('Scheduler', 'NextRun', 'value')
+_DEEP_KEYS_CACHE = {}
+
+
+def deep_keys(keys):
+    """
+    Split dotted keys, results are cached as the same keys are used again and again.
+
+    Args:
+        keys (str, list, tuple): Such as `Scheduler.NextRun.value`
+
+    Returns:
+        list, tuple: Such as ('Scheduler', 'NextRun', 'value')
+    """
+    if isinstance(keys, str):
+        try:
+            return _DEEP_KEYS_CACHE[keys]
+        except KeyError:
+            split = tuple(keys.split('.'))
+            # Keys are from code mostly, but don't grow forever if keys are generated
+            if len(_DEEP_KEYS_CACHE) < 65536:
+                _DEEP_KEYS_CACHE[keys] = split
+            return split
+    assert type(keys) is list or type(keys) is tuple
+    return keys
+
+
 def deep_get(d, keys, default=None):
     """
     Get values in dictionary safely.
@@ -208,34 +235,38 @@ def deep_get(d, keys, default=None):
 
     Args:
         d (dict):
-        keys (str, list): Such as `Scheduler.NextRun.value`
+        keys (str, list, tuple): Such as `Scheduler.NextRun.value`
         default: Default return if key not found.
 
     Returns:
 
     """
-    if isinstance(keys, str):
-        keys = keys.split('.')
-    assert type(keys) is list
+    for key in deep_keys(keys):
+        if d is None:
+            return default
+        d = d.get(key)
     if d is None:
         return default
-    if not keys:
-        return d
-    return deep_get(d.get(keys[0]), keys[1:], default)
+    return d
 
 
 def deep_set(d, keys, value):
     """
     Set value into dictionary safely, imitating deep_get().
     """
-    if isinstance(keys, str):
-        keys = keys.split('.')
-    assert type(keys) is list
+    keys = deep_keys(keys)
     if not keys:
         return value
     if not isinstance(d, dict):
         d = {}
-    d[keys[0]] = deep_set(d.get(keys[0], {}), keys[1:], value)
+    node = d
+    for key in keys[:-1]:
+        child = node.get(key)
+        if not isinstance(child, dict):
+            child = {}
+            node[key] = child
+        node = child
+    node[keys[-1]] = value
     return d
 
 
@@ -243,16 +274,16 @@ def deep_pop(d, keys, default=None):
     """
     Pop value from dictionary safely, imitating deep_get().
     """
-    if isinstance(keys, str):
-        keys = keys.split('.')
-    assert type(keys) is list
+    keys = deep_keys(keys)
     if not isinstance(d, dict):
         return default
     if not keys:
         return default
-    elif len(keys) == 1:
-        return d.pop(keys[0], default)
-    return deep_pop(d.get(keys[0]), keys[1:], default)
+    for key in keys[:-1]:
+        d = d.get(key)
+        if not isinstance(d, dict):
+            return default
+    return d.pop(keys[-1], default)
 
 
 def deep_default(d, keys, value):
@@ -260,9 +291,7 @@ def deep_default(d, keys, value):
     Set default value into dictionary safely, imitating deep_get().
     Value is set only when the dict doesn't contain such keys.
     """
-    if isinstance(keys, str):
-        keys = keys.split('.')
-    assert type(keys) is list
+    keys = deep_keys(keys)
     if not keys:
         if d:
             return d
@@ -270,7 +299,16 @@ def deep_default(d, keys, value):
             return value
     if not isinstance(d, dict):
         d = {}
-    d[keys[0]] = deep_default(d.get(keys[0], {}), keys[1:], value)
+    node = d
+    for key in keys[:-1]:
+        child = node.get(key, {})
+        if not isinstance(child, dict):
+            child = {}
+        node[key] = child
+        node = child
+    key = keys[-1]
+    current = node.get(key, {})
+    node[key] = current if current else value
     return d
 
 
@@ -287,13 +325,37 @@ def deep_iter(data, depth=0, current_depth=1):
         list: Key path
         Any:
     """
-    if isinstance(data, dict) \
-            and (depth and current_depth <= depth):
-        for key, value in data.items():
-            for child_path, child_value in deep_iter(value, depth=depth, current_depth=current_depth + 1):
-                yield [key] + child_path, child_value
-    else:
+    if not isinstance(data, dict) or not (depth and current_depth <= depth):
         yield [], data
+        return
+    # Iterate without recursion, same order as depth-first recursion
+    path = []
+    stack = [iter(data.items())]
+    while stack:
+        for key, value in stack[-1]:
+            if isinstance(value, dict) and current_depth + len(stack) <= depth:
+                path.append(key)
+                stack.append(iter(value.items()))
+                break
+            yield path + [key], value
+        else:
+            stack.pop()
+            if path:
+                path.pop()
+
+
+def deep_flat(data, depth=0):
+    """
+    Flatten a dictionary into a path index.
+
+    Args:
+        data (dict):
+        depth (int): Maximum depth to iter
+
+    Returns:
+        dict: Key: tuple[str], key path. Value: Any.
+    """
+    return {tuple(path): value for path, value in deep_iter(data, depth=depth)}
 
 
 def parse_value(value, data):
@@ -1,22 +1,60 @@
+import hashlib
 import os
 from datetime import datetime
 
-from module.config.utils import filepath_config, DEFAULT_TIME
+from module.config.utils import filepath_config
 from module.logger import logger
 
 
+def file_signature(file):
+    """
+    Cheap check on whether a file is modified, without reading it.
+
+    Args:
+        file (str):
+
+    Returns:
+        tuple[int, int]: Modify time in nanoseconds and file size, or None if file not exists.
+    """
+    try:
+        stat = os.stat(file)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def file_hash(file):
+    """
+    Args:
+        file (str):
+
+    Returns:
+        str: md5 of file content, or '' if file not exists.
+    """
+    try:
+        with open(file, 'rb') as f:
+            return hashlib.md5(f.read()).hexdigest()
+    except FileNotFoundError:
+        return ''
+
+
 class ConfigWatcher:
     config_name = 'alas'
-    start_mtime = DEFAULT_TIME
+    start_signature = None
+    start_hash = ''
 
     def start_watching(self) -> None:
-        self.start_mtime = self.get_mtime()
+        self.start_signature = file_signature(self.get_filepath())
+        self.start_hash = file_hash(self.get_filepath())
+
+    def get_filepath(self) -> str:
+        return filepath_config(self.config_name)
 
     def get_mtime(self) -> datetime:
         """
         Last modify time of the file
         """
-        timestamp = os.stat(filepath_config(self.config_name)).st_mtime
+        timestamp = os.stat(self.get_filepath()).st_mtime
         mtime = datetime.fromtimestamp(timestamp).replace(microsecond=0)
         return mtime
 
@@ -25,9 +63,13 @@ class ConfigWatcher:
         Returns:
             bool: Whether the file has been modified and configs should reload
         """
-        mtime = self.get_mtime()
-        if mtime > self.start_mtime:
-            logger.info(f'Config "{self.config_name}" changed at {mtime}')
-            return True
-        else:
+        signature = file_signature(self.get_filepath())
+        if signature == self.start_signature:
             return False
+        # File saved with the same content, such as setting an option back to its old value
+        if file_hash(self.get_filepath()) == self.start_hash:
+            self.start_signature = signature
+            return False
+
+        logger.info(f'Config "{self.config_name}" changed at {self.get_mtime()}')
+        return True
@@ -484,15 +484,16 @@ class Connection(ConnectionAttr):
         logger.error('No `netcat` command available, please use screenshot methods without `_nc` suffix')
         raise RequestHumanTakeover
 
-    def adb_shell_nc(self, cmd, timeout=5, chunk_size=262144):
+    def adb_shell_nc(self, cmd, timeout=5, chunk_size=262144, buffer=None):
         """
         Args:
             cmd (list):
             timeout (int):
             chunk_size (int): Default to 262144
+            buffer (ScreenshotBuffer): Receive into a reused buffer if given
 
         Returns:
-            bytes:
+            bytes: Or memoryview if buffer is given
         """
         # Server start listening
         server = self.reverse_server
@@ -510,7 +511,10 @@ class Connection(ConnectionAttr):
             raise AdbTimeout('reverse server accept timeout')
 
         # Server receive data
-        data = recv_all(conn, chunk_size=chunk_size, recv_interval=0.001)
+        if buffer is None:
+            data = recv_all(conn, chunk_size=chunk_size, recv_interval=0.001)
+        else:
+            data = buffer.receive_stream(conn, chunk_size=chunk_size, recv_interval=0.001)
 
         # Server close connection
         conn.close()
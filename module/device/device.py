@@ -199,6 +199,7 @@ class Device(Screenshot, Control, AppControl):
         return super().dump_hierarchy()
 
     def release_during_wait(self):
+        self.screenshot_prefetch_stop()
         # Scrcpy server is still sending video stream,
         # stop it during wait
         if self.config.Emulator_ScreenshotMethod == 'scrcpy':
@@ -250,6 +251,7 @@ class Device(Screenshot, Control, AppControl):
             raise GameNotRunningError('Game died')
 
     def handle_control_check(self, button):
+        self.screenshot_on_control()
         self.stuck_record_clear()
         self.click_record_add(button)
         self.click_record_check()
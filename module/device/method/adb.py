@@ -7,11 +7,11 @@ import numpy as np
 from adbutils.errors import AdbError
 from lxml import etree
 
-from module.base.decorator import Config
+from module.base.decorator import Config, cached_property
 from module.config.server import DICT_PACKAGE_TO_ACTIVITY
 from module.device.connection import Connection
-from module.device.method.utils import (ImageTruncated, PackageNotInstalled, RETRY_TRIES, handle_adb_error,
-                                        handle_unknown_host_service, remove_prefix, retry_sleep)
+from module.device.method.utils import (ImageTruncated, PackageNotInstalled, RETRY_TRIES, ScreenshotBuffer,
+                                        handle_adb_error, handle_unknown_host_service, retry_sleep)
 from module.exception import RequestHumanTakeover, ScriptError
 from module.logger import logger
 
@@ -93,10 +93,11 @@ def retry(func):
     return retry_wrapper
 
 
-def load_screencap(data):
+def load_screencap(data, buffer=None):
     """
     Args:
-        data: Raw data from `screencap`
+        data (bytes, memoryview): Raw data from `screencap`
+        buffer (ScreenshotBuffer): Reuse receiving buffers if given
 
     Returns:
         np.ndarray:
@@ -116,7 +117,10 @@ def load_screencap(data):
         # ValueError: cannot reshape array of size 0 into shape (720,1280,4)
         raise ImageTruncated(str(e))
 
-    image = cv2.cvtColor(image, cv2.COLOR_BGRA2BGR)
+    if buffer is None:
+        image = cv2.cvtColor(image, cv2.COLOR_BGRA2BGR)
+    else:
+        image = cv2.cvtColor(image, cv2.COLOR_BGRA2BGR, dst=buffer.output((int(height), int(width), 3)))
     if image is None:
         raise ImageTruncated('Empty image after cv2.cvtColor')
 
@@ -127,21 +131,35 @@ class Adb(Connection):
     __screenshot_method = [0, 1, 2]
     __screenshot_method_fixed = [0, 1, 2]
 
+    @cached_property
+    def screencap_buffer(self):
+        return ScreenshotBuffer()
+
     @staticmethod
     def __load_screenshot(screenshot, method):
+        """
+        Args:
+            screenshot (bytes, memoryview):
+            method (int):
+
+        Returns:
+            np.ndarray:
+        """
         if method == 0:
             pass
         elif method == 1:
-            screenshot = screenshot.replace(b'\r\n', b'\n')
+            screenshot = bytes(screenshot).replace(b'\r\n', b'\n')
         elif method == 2:
-            screenshot = screenshot.replace(b'\r\r\n', b'\n')
+            screenshot = bytes(screenshot).replace(b'\r\r\n', b'\n')
         else:
             raise ScriptError(f'Unknown method to load screenshots: {method}')
 
         # fix compatibility issues for adb screencap decode problem when the data is from vmos pro
         # When use adb screencap for a screenshot from vmos pro, there would be a header more than that from emulator
         # which would cause image decode problem. So i check and remove the header there.
-        screenshot = remove_prefix(screenshot, b'long long=8 fun*=10\n')
+        prefix = b'long long=8 fun*=10\n'
+        if screenshot[:len(prefix)] == prefix:
+            screenshot = screenshot[len(prefix):]
 
         image = np.frombuffer(screenshot, np.uint8)
         if image is None:
@@ -157,7 +175,36 @@ class Adb(Connection):
 
         return image
 
+    @staticmethod
+    def __detect_screenshot_method(screenshot):
+        """
+        Detect how line endings were converted by shell, from the PNG signature `\\x89PNG\\r\\n\\x1a\\n`.
+
+        Args:
+            screenshot (bytes, memoryview):
+
+        Returns:
+            int: Method to load screenshots, or None if unknown.
+        """
+        head = bytes(screenshot[:64])
+        index = head.find(b'\x89PNG')
+        if index < 0:
+            return None
+        head = head[index + 4:index + 12]
+        if head.startswith(b'\r\n\x1a\n'):
+            return 0
+        if head.startswith(b'\r\r\n\x1a\r\n'):
+            return 1
+        if head.startswith(b'\r\r\r\n\x1a\r\r\n'):
+            return 2
+        return None
+
     def __process_screenshot(self, screenshot):
+        # Try the method detected from PNG signature first, instead of guessing by decoding
+        method = self.__detect_screenshot_method(screenshot)
+        if method is not None and method != self.__screenshot_method_fixed[0]:
+            self.__screenshot_method_fixed = [method] + self.__screenshot_method
+
         for method in self.__screenshot_method_fixed:
             try:
                 result = self.__load_screenshot(screenshot, method=method)
@@ -168,15 +215,16 @@ class Adb(Connection):
 
         self.__screenshot_method_fixed = self.__screenshot_method
         if len(screenshot) < 500:
-            logger.warning(f'Unexpected screenshot: {screenshot}')
+            logger.warning(f'Unexpected screenshot: {bytes(screenshot)}')
         raise OSError(f'cannot load screenshot')
 
     @retry
     @Config.when(DEVICE_OVER_HTTP=False)
     def screenshot_adb(self):
-        data = self.adb_shell(['screencap', '-p'], stream=True)
+        stream = self.adb_shell(['screencap', '-p'], stream=True, recvall=False)
+        data = self.screencap_buffer.receive_stream(stream)
         if len(data) < 500:
-            logger.warning(f'Unexpected screenshot: {data}')
+            logger.warning(f'Unexpected screenshot: {bytes(data)}')
 
         return self.__process_screenshot(data)
 
@@ -187,15 +235,15 @@ class Adb(Connection):
         if len(data) < 500:
             logger.warning(f'Unexpected screenshot: {data}')
 
-        return load_screencap(data)
+        return load_screencap(data, buffer=self.screencap_buffer)
 
     @retry
     def screenshot_adb_nc(self):
-        data = self.adb_shell_nc(['screencap'])
+        data = self.adb_shell_nc(['screencap'], buffer=self.screencap_buffer)
         if len(data) < 500:
-            logger.warning(f'Unexpected screenshot: {data}')
+            logger.warning(f'Unexpected screenshot: {bytes(data)}')
 
-        return load_screencap(data)
+        return load_screencap(data, buffer=self.screencap_buffer)
 
     @retry
     def click_adb(self, x, y):
@@ -10,7 +10,8 @@ from module.base.decorator import cached_property, del_cached_property, Config
 from module.base.timer import Timer
 from module.device.method.uiautomator_2 import ProcessInfo, Uiautomator2
 from module.device.method.utils import (
-    ImageTruncated, PackageNotInstalled, RETRY_TRIES, handle_adb_error, handle_unknown_host_service, retry_sleep)
+    ImageTruncated, PackageNotInstalled, RETRY_TRIES, ScreenshotBuffer, handle_adb_error, handle_unknown_host_service,
+    retry_sleep)
 from module.exception import RequestHumanTakeover
 from module.logger import logger
 
@@ -109,6 +110,10 @@ class DroidCast(Uiautomator2):
         self._droidcast_port = self.adb_forward('tcp:53516')
         return session
 
+    @cached_property
+    def droidcast_buffer(self):
+        return ScreenshotBuffer()
+
     """
     Check APIs from source code:
     https://github.com/Torther/DroidCast_raw/blob/DroidCast_raw/app/src/main/java/ink/mol/droidcast_raw/KtMain.kt
@@ -234,7 +239,9 @@ class DroidCast(Uiautomator2):
 
         rotate = self.is_mumu_over_version_356 and self.orientation == 1
 
-        image = self.droidcast_session.get(self.droidcast_raw_url(), timeout=3).content
+        buffer = self.droidcast_buffer
+        with self.droidcast_session.get(self.droidcast_raw_url(), timeout=3, stream=True) as resp:
+            image = buffer.receive(resp.raw.readinto)
         # DroidCast_raw returns a RGB565 bitmap
 
         try:
@@ -243,13 +250,13 @@ class DroidCast(Uiautomator2):
                 arr = arr.reshape(shape)
                 # arr = cv2.rotate(arr, cv2.ROTATE_90_CLOCKWISE)
                 # A little bit faster?
-                arr = cv2.transpose(arr)
+                arr = cv2.transpose(arr, dst=buffer.scratch('rotate', shape[::-1], np.uint16))
                 cv2.flip(arr, 1, dst=arr)
             else:
                 arr = arr.reshape(shape)
         except ValueError as e:
             if len(image) < 500:
-                logger.warning(f'Unexpected screenshot: {image}')
+                logger.warning(f'Unexpected screenshot: {bytes(image)}')
             # Try to load as `DroidCast`
             image = np.frombuffer(image, np.uint8)
             if image is not None:
@@ -277,22 +284,30 @@ class DroidCast(Uiautomator2):
         # The same as the code above but costs about 3~4ms instead of 10ms.
         # Note that cv2.convertScaleAbs is 5x fast as cv2.multiply, cv2.add is 8x fast as cv2.convertScaleAbs
         # Note that cv2.convertScaleAbs includes rounding
-        r = cv2.bitwise_and(arr, 0b1111100000000000)
-        r = cv2.convertScaleAbs(r, alpha=0.00390625)
-        m = cv2.convertScaleAbs(r, alpha=0.03125)
+        # All intermediate results are written into reused buffers
+        shape = arr.shape
+        masked = buffer.scratch('masked', shape, np.uint16)
+        m = buffer.scratch('m', shape)
+        r = buffer.scratch('r', shape)
+        g = buffer.scratch('g', shape)
+        b = buffer.scratch('b', shape)
+
+        cv2.bitwise_and(arr, 0b1111100000000000, dst=masked)
+        cv2.convertScaleAbs(masked, alpha=0.00390625, dst=r)
+        cv2.convertScaleAbs(r, alpha=0.03125, dst=m)
         cv2.add(r, m, dst=r)
 
-        g = cv2.bitwise_and(arr, 0b0000011111100000)
-        g = cv2.convertScaleAbs(g, alpha=0.125)
-        m = cv2.convertScaleAbs(g, alpha=0.015625, dst=m)
+        cv2.bitwise_and(arr, 0b0000011111100000, dst=masked)
+        cv2.convertScaleAbs(masked, alpha=0.125, dst=g)
+        cv2.convertScaleAbs(g, alpha=0.015625, dst=m)
         cv2.add(g, m, dst=g)
 
-        b = cv2.bitwise_and(arr, 0b0000000000011111)
-        b = cv2.convertScaleAbs(b, alpha=8)
-        m = cv2.convertScaleAbs(b, alpha=0.03125, dst=m)
+        cv2.bitwise_and(arr, 0b0000000000011111, dst=masked)
+        cv2.convertScaleAbs(masked, alpha=8, dst=b)
+        cv2.convertScaleAbs(b, alpha=0.03125, dst=m)
         cv2.add(b, m, dst=b)
 
-        image = cv2.merge([r, g, b])
+        image = cv2.merge([r, g, b], dst=buffer.output((shape[0], shape[1], 3)))
 
         return image
 
@@ -5,6 +5,7 @@ import socket
 import time
 import typing as t
 
+import numpy as np
 import uiautomator2 as u2
 import uiautomator2cache
 from adbutils import AdbTimeout
@@ -131,6 +132,115 @@ def recv_all(stream, chunk_size=4096, recv_interval=0.000) -> bytes:
         raise AdbTimeout('adb read timeout')
 
 
+class ScreenshotBuffer:
+    """
+    Reusable buffers for screenshot receiving and decoding.
+
+    Received data is read into one persistent bytearray which only grows when a larger frame comes.
+    Intermediate results are written into persistent scratch arrays.
+    Decoded images are always new arrays, callers may keep a screenshot as long as they want,
+    such as `self.main_image = self.device.image`.
+    """
+
+    def __init__(self):
+        self.data = bytearray(4 * 1280 * 720 + 4096)
+        self.scratches = {}
+
+    def receive(self, readinto, chunk_size=262144, recv_interval=0.000):
+        """
+        Read data until the end of stream.
+
+        Args:
+            readinto (callable): Function that reads into a memoryview and returns the number of bytes read,
+                such as `socket.recv_into` and `HTTPResponse.readinto`.
+            chunk_size (int):
+            recv_interval (float): Default to 0.000, use 0.001 if receiving as server
+
+        Returns:
+            memoryview: Received data without shell warnings.
+                Data is valid until the next receive() call.
+        """
+        received = 0
+        view = memoryview(self.data)
+        while 1:
+            if received + chunk_size > len(self.data):
+                # Grow buffer, don't resize the old one as it may still be exported
+                data = bytearray(max(len(self.data) * 2, received + chunk_size))
+                data[:received] = view[:received]
+                self.data = data
+                view = memoryview(self.data)
+            n = readinto(view[received:received + chunk_size])
+            if n:
+                received += n
+                time.sleep(recv_interval)
+            else:
+                break
+
+        view = view[:received]
+        # WARNING: linker: [vdso]: unused DT entry: type 0x70000001 arg 0x0\n\x89PNG\r\n\x1a\n\x00\x00\x00\rIH
+        if view[:7] == b'WARNING':
+            index = self.data.find(b'\n', 0, received)
+            if index >= 0:
+                view = view[index + 1:]
+        return view
+
+    def receive_stream(self, stream, chunk_size=262144, recv_interval=0.000):
+        """
+        Same as `recv_all()` but receives into buffer.
+
+        Args:
+            stream (socket.socket, AdbConnection):
+            chunk_size (int):
+            recv_interval (float):
+
+        Returns:
+            memoryview:
+
+        Raises:
+            AdbTimeout
+        """
+        if isinstance(stream, AdbConnection):
+            stream = stream.conn
+        stream.settimeout(10)
+        try:
+            return self.receive(stream.recv_into, chunk_size=chunk_size, recv_interval=recv_interval)
+        except socket.timeout:
+            raise AdbTimeout('adb read timeout')
+
+    @staticmethod
+    def output(shape, dtype=np.uint8):
+        """
+        Get an array to write the decoded image into.
+        Screenshots are kept by callers so output arrays can't be reused.
+
+        Args:
+            shape (tuple):
+            dtype:
+
+        Returns:
+            np.ndarray:
+        """
+        return np.empty(shape, dtype=dtype)
+
+    def scratch(self, name, shape, dtype=np.uint8):
+        """
+        Get a persistent array for intermediate results.
+
+        Args:
+            name (str):
+            shape (tuple):
+            dtype:
+
+        Returns:
+            np.ndarray:
+        """
+        array = self.scratches.get(name)
+        if array is None or array.shape != shape or array.dtype != dtype:
+            array = np.empty(shape, dtype=dtype)
+            self.scratches[name] = array
+        return array
+
+
 def possible_reasons(*args):
     """
     Show possible reasons
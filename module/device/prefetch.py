@@ -0,0 +1,114 @@
+import threading
+import time
+
+from module.logger import logger
+
+
+class ScreenshotPrefetcher:
+    """
+    Take screenshots in a background thread, one frame ahead of the caller,
+    so that screenshot latency overlaps with image recognition.
+
+    Once a frame is taken by get(), capture of the next frame starts immediately.
+    Frames started before the given timestamp are discarded, so a frame taken before a click never returns.
+    """
+
+    def __init__(self, capture, wait):
+        """
+        Args:
+            capture (callable): Function that takes a screenshot and returns np.ndarray.
+            wait (callable): Function that waits screenshot interval, called before each capture.
+        """
+        self.capture = capture
+        self.wait = wait
+        self.cond = threading.Condition()
+        self.thread = None
+        self.alive = False
+
+        # Next capture is requested
+        self.requested = False
+        # Start time of current capture, None if not capturing
+        self.capturing = None
+        # Tuple of (start time, image), the latest frame not taken yet
+        self.frame = None
+        # Exception raised in capture, re-raised in get()
+        self.error = None
+
+    def start(self):
+        with self.cond:
+            if self.thread is not None and self.thread.is_alive():
+                return
+            logger.info('Screenshot prefetch start')
+            self.alive = True
+            self.thread = threading.Thread(target=self._loop, name='ScreenshotPrefetch', daemon=True)
+            self.thread.start()
+
+    def stop(self):
+        with self.cond:
+            if self.thread is None:
+                return
+            logger.info('Screenshot prefetch stop')
+            self.alive = False
+            self.requested = False
+            self.frame = None
+            self.error = None
+            self.cond.notify_all()
+            thread = self.thread
+            self.thread = None
+        thread.join(3)
+
+    def _loop(self):
+        while 1:
+            with self.cond:
+                while self.alive and not self.requested:
+                    self.cond.wait()
+                if not self.alive:
+                    return
+                self.requested = False
+
+            self.wait()
+            start = time.time()
+            with self.cond:
+                self.capturing = start
+            try:
+                image, error = self.capture(), None
+            except Exception as e:
+                image, error = None, e
+
+            with self.cond:
+                self.capturing = None
+                if error is None:
+                    self.frame = (start, image)
+                else:
+                    self.error = error
+                self.cond.notify_all()
+
+    def get(self, after=0.):
+        """
+        Args:
+            after (float): Timestamp, only return frames that started capturing after it.
+
+        Returns:
+            np.ndarray:
+        """
+        self.start()
+        with self.cond:
+            while 1:
+                if self.error is not None:
+                    error, self.error = self.error, None
+                    raise error
+                if self.frame is not None:
+                    start, image = self.frame
+                    self.frame = None
+                    if start >= after:
+                        # Prefetch next frame
+                        self.requested = True
+                        self.cond.notify_all()
+                        return image
+                # Request a new frame, unless there's a valid one capturing
+                if not self.requested and (self.capturing is None or self.capturing < after):
+                    self.requested = True
+                    self.cond.notify_all()
+                if self.thread is None or not self.thread.is_alive():
+                    raise RuntimeError('Screenshot prefetch thread died')
+                self.cond.wait(1)
@@ -1,6 +1,5 @@
 import os
 import time
-from collections import deque
 from datetime import datetime
 
 import cv2
@@ -9,7 +8,7 @@ from PIL import Image
 
 from module.base.decorator import cached_property
 from module.base.timer import Timer
-from module.base.utils import get_color, image_size, limit_in, save_image
+from module.base.utils import LazyDeditherImage, get_color, image_size, limit_in, save_image
 from module.device.method.adb import Adb
 from module.device.method.ascreencap import AScreenCap
 from module.device.method.droidcast import DroidCast
@@ -17,6 +16,8 @@ from module.device.method.ldopengl import LDOpenGL
 from module.device.method.nemu_ipc import NemuIpc
 from module.device.method.scrcpy import Scrcpy
 from module.device.method.wsa import WSA
+from module.device.prefetch import ScreenshotPrefetcher
+from module.device.screenshot_deque import ScreenshotDeque
 from module.exception import RequestHumanTakeover, ScriptError
 from module.logger import logger
 
@@ -27,7 +28,33 @@ class Screenshot(Adb, WSA, DroidCast, AScreenCap, Scrcpy, NemuIpc, LDOpenGL):
     _minicap_uninstalled = False
     _screenshot_interval = Timer(0.1)
     _last_save_time = {}
-    image: np.ndarray
+    _image = None
+    # Increases every time a new image is set, used as frame identity.
+    # Detection results of the same image_id can be reused, see ModuleBase.detection_cache
+    image_id = 0
+
+    @property
+    def image(self) -> np.ndarray:
+        return self._image
+
+    @image.setter
+    def image(self, value):
+        self._image = value
+        self.image_id += 1
+
+    # Last screenshot, to detect unchanged screenshots
+    _image_prev = None
+    # If the last screenshot is the same as the previous one.
+    # Unchanged screenshots keep their image_id, so cached detection results are still valid.
+    image_unchanged = False
+    # Number of continuous unchanged screenshots
+    _image_unchanged_count = 0
+    # Extra wait before next screenshot when screen is static
+    _screenshot_backoff = 0.
+    # Start backing off after N continuous unchanged screenshots
+    SCREENSHOT_BACKOFF_AFTER = 3
+    # Maximum extra wait in seconds
+    SCREENSHOT_BACKOFF_MAX = 1.0
 
     @cached_property
     def screenshot_methods(self):
@@ -48,26 +75,72 @@ class Screenshot(Adb, WSA, DroidCast, AScreenCap, Scrcpy, NemuIpc, LDOpenGL):
     def screenshot_method_override(self) -> str:
         return ''
 
+    # If screen may have changed since the last screenshot, by a click or swipe
+    _screenshot_controlled = False
+
+    @cached_property
+    def screenshot_prefetcher(self):
+        return ScreenshotPrefetcher(capture=self._screenshot_capture, wait=self._screenshot_wait)
+
+    @property
+    def screenshot_prefetch_enabled(self):
+        return self.config.Optimization_ScreenshotPrefetch and not self.screenshot_method_override
+
+    def _screenshot_wait(self):
+        self._screenshot_interval.wait()
+        if self._screenshot_backoff > 0:
+            time.sleep(self._screenshot_backoff)
+        self._screenshot_interval.reset()
+
+    def _screenshot_capture(self):
+        """
+        Returns:
+            np.ndarray:
+        """
+        if self.screenshot_method_override:
+            method = self.screenshot_method_override
+        else:
+            method = self.config.Emulator_ScreenshotMethod
+        method = self.screenshot_methods.get(method, self.screenshot_adb)
+        image = method()
+
+        lazy = self.config.Emulator_ScreenshotDedithering and self.config.Emulator_ScreenshotDeditheringLazy
+        if self.config.Emulator_ScreenshotDedithering and not lazy:
+            # This will take 40-60ms
+            cv2.fastNlMeansDenoising(image, image, h=17, templateWindowSize=1, searchWindowSize=2)
+        image = self._handle_orientated_image(image)
+        if lazy:
+            # Denoise areas on their first access
+            image = LazyDeditherImage(image)
+        return image
+
     def screenshot(self):
         """
         Returns:
             np.ndarray:
         """
-        self._screenshot_interval.wait()
-        self._screenshot_interval.reset()
+        prefetch = self.screenshot_prefetch_enabled
+        # If prefetch, screenshot interval is waited in prefetch thread
+        if not prefetch:
+            self.screenshot_prefetch_stop()
+            self._screenshot_wait()
 
         for _ in range(2):
-            if self.screenshot_method_override:
-                method = self.screenshot_method_override
+            if prefetch:
+                # Frames taken before click are outdated
+                after = time.time() if self._screenshot_controlled else 0.
+                self._screenshot_controlled = False
+                image = self.screenshot_prefetcher.get(after=after)
             else:
-                method = self.config.Emulator_ScreenshotMethod
-            method = self.screenshot_methods.get(method, self.screenshot_adb)
-            self.image = method()
+                image = self._screenshot_capture()
 
-            if self.config.Emulator_ScreenshotDedithering:
-                # This will take 40-60ms
-                cv2.fastNlMeansDenoising(self.image, self.image, h=17, templateWindowSize=1, searchWindowSize=2)
-            self.image = self._handle_orientated_image(self.image)
+            self.image_unchanged = self._image_delta_check(image)
+            if self.image_unchanged:
+                # Replace image but keep image_id
+                self._image = image
+            else:
+                self.image = image
+            self._screenshot_backoff_update()
 
             if self.config.Error_SaveError:
                 self.screenshot_deque.append({'time': datetime.now(), 'image': self.image})
@@ -75,13 +148,75 @@ class Screenshot(Adb, WSA, DroidCast, AScreenCap, Scrcpy, NemuIpc, LDOpenGL):
             if self.check_screen_size() and self.check_screen_black():
                 break
             else:
+                self._screenshot_controlled = True
                 continue
 
         return self.image
 
+    def screenshot_prefetch_stop(self):
+        if 'screenshot_prefetcher' in self.__dict__:
+            self.screenshot_prefetcher.stop()
+
     @property
     def has_cached_image(self):
-        return hasattr(self, 'image') and self.image is not None
+        return self._image is not None
+
+    def _image_delta_check(self, image):
+        """
+        Compare screenshot with the previous one pixel by pixel,
+        so a changed digit or a small icon is never missed.
+        This takes about 0.3ms on 1280x720 images.
+
+        Args:
+            image (np.ndarray):
+
+        Returns:
+            bool: True if unchanged.
+        """
+        # Lazy de-dithering modifies images in place, compare raw images instead
+        if isinstance(image, LazyDeditherImage) and image._raw is not None:
+            image = image._raw
+        prev = self._image_prev
+        # Screenshots are new arrays every time, keeping a reference is safe
+        self._image_prev = image
+        if prev is None or prev.shape != image.shape:
+            return False
+        # A screenshot method reusing its output array can't be compared, take it as changed
+        if np.may_share_memory(prev, image):
+            return False
+        return cv2.norm(image, prev, cv2.NORM_INF) <= 0
+
+    def _screenshot_backoff_update(self):
+        """
+        Take screenshots slower when screen is static, and snap back once screen changed.
+        """
+        if self.image_unchanged:
+            self._image_unchanged_count += 1
+        else:
+            self._image_unchanged_count = 0
+
+        if not self.config.Optimization_ScreenshotAdaptiveInterval:
+            self._screenshot_backoff = 0.
+            return
+
+        count = self._image_unchanged_count - self.SCREENSHOT_BACKOFF_AFTER
+        if count >= 0:
+            backoff = self._screenshot_interval.limit * 2 ** count
+            backoff = min(backoff, self.SCREENSHOT_BACKOFF_MAX)
+            if backoff != self._screenshot_backoff:
+                logger.info(f'Screen static, screenshot backoff {round(backoff, 3)}s')
+            self._screenshot_backoff = backoff
+        else:
+            self._screenshot_backoff = 0.
+
+    def screenshot_on_control(self):
+        """
+        Call this when screen is expected to change, such as after a click.
+        Back to normal screenshot interval and drop the prefetched screenshot.
+        """
+        self._image_unchanged_count = 0
+        self._screenshot_backoff = 0.
+        self._screenshot_controlled = True
 
     def _handle_orientated_image(self, image):
         """
@@ -91,7 +226,7 @@ class Screenshot(Adb, WSA, DroidCast, AScreenCap, Scrcpy, NemuIpc, LDOpenGL):
         Returns:
             np.ndarray:
         """
-        width, height = image_size(self.image)
+        width, height = image_size(image)
         if width == 1280 and height == 720:
             return image
 
@@ -118,7 +253,11 @@ class Screenshot(Adb, WSA, DroidCast, AScreenCap, Scrcpy, NemuIpc, LDOpenGL):
             raise RequestHumanTakeover
         # Limit in 1~300
         length = max(1, min(length, 300))
-        return deque(maxlen=length)
+        try:
+            memory_limit = float(self.config.Error_ScreenshotMemoryLimit)
+        except (TypeError, ValueError):
+            memory_limit = 0
+        return ScreenshotDeque(maxlen=length, memory_limit=max(memory_limit, 0) * 1024 * 1024)
 
     def save_screenshot(self, genre='items', interval=None, to_base_folder=False):
         """Save a screenshot. Use millisecond timestamp as file name.
@@ -0,0 +1,143 @@
+import zlib
+from collections import deque
+
+import numpy as np
+
+
+class ScreenshotFrame:
+    def __init__(self, time, data, shape, key):
+        """
+        Args:
+            time (datetime):
+            data (bytes, np.ndarray): zlib compressed image, or difference to previous frame if not a key frame.
+                Or raw image if deque is not compressed.
+            shape (tuple):
+            key (bool): If this is a key frame.
+        """
+        self.time = time
+        self.data = data
+        self.shape = shape
+        self.key = key
+
+
+class ScreenshotDeque:
+    """
+    A deque of recent screenshots for error logs, stored compressed in memory.
+
+    Raw screenshots are 2.7MB each, 300 of them cost 830MB.
+    Here every KEY_INTERVAL-th screenshot is stored as a zlib compressed key frame,
+    the others are stored as compressed difference to their previous frame, which are mostly zeros.
+    Images are decoded only when iterating, which happens when error logs are saved.
+    Compression costs about 10ms per screenshot, so short deques that hold little memory
+    store raw images instead, the same as a plain deque.
+
+    Interface is the same as `deque(maxlen=length)` of dicts `{'time': datetime, 'image': np.ndarray}`,
+    except that images from iteration are decoded copies.
+    """
+    KEY_INTERVAL = 10
+    # Deques not longer than this store raw images
+    RAW_LENGTH = 10
+
+    def __init__(self, maxlen, memory_limit=0):
+        """
+        Args:
+            maxlen (int): Maximum number of screenshots.
+            memory_limit (int, float): Maximum bytes held, 0 for unlimited.
+                Evicted frames still referenced by later frames are counted.
+                At least 1 screenshot is kept even if exceeded.
+        """
+        self.maxlen = maxlen
+        self.memory_limit = memory_limit
+        self.compress = maxlen > self.RAW_LENGTH
+        self.frames = deque()
+        # Number of leading frames evicted but kept as reference of later frames
+        self.skip = 0
+        # Bytes held in compressed data
+        self.memory = 0
+        # Bytes of raw images held
+        self.memory_raw = 0
+        # Copy of the last image, to calculate difference
+        self._prev = None
+        self._since_key = 0
+
+    def __len__(self):
+        return len(self.frames) - self.skip
+
+    def __iter__(self):
+        image = None
+        for index, frame in enumerate(list(self.frames)):
+            if not self.compress:
+                if index >= self.skip:
+                    yield {'time': frame.time, 'image': frame.data}
+                continue
+            data = np.frombuffer(zlib.decompress(frame.data), dtype=np.uint8).reshape(frame.shape)
+            if frame.key:
+                image = data.copy()
+            else:
+                image = np.add(image, data)
+            if index >= self.skip:
+                yield {'time': frame.time, 'image': image}
+
+    @property
+    def compression_ratio(self):
+        return self.memory_raw / self.memory if self.memory else 0.
+
+    def append(self, item):
+        """
+        Args:
+            item (dict): {'time': datetime, 'image': np.ndarray}
+        """
+        image = item['image']
+        shape = image.shape
+        if not self.compress:
+            self.frames.append(ScreenshotFrame(time=item['time'], data=image, shape=shape, key=True))
+            self.memory += image.nbytes
+            self.memory_raw += image.nbytes
+            self._trim()
+            return
+
+        key = self._prev is None or self._prev.shape != shape or self._since_key >= self.KEY_INTERVAL - 1
+        if key:
+            data = zlib.compress(np.ascontiguousarray(image), 1)
+            self._prev = np.array(image)
+            self._since_key = 0
+        else:
+            # uint8 overflows on purpose, adding it back to previous image restores the original one
+            data = zlib.compress(np.subtract(image, self._prev), 1)
+            np.copyto(self._prev, image)
+            self._since_key += 1
+
+        self.frames.append(ScreenshotFrame(time=item['time'], data=data, shape=shape, key=key))
+        self.memory += len(data)
+        self.memory_raw += image.nbytes
+        self._trim()
+
+    def _trim(self):
+        while len(self) > self.maxlen:
+            self._evict()
+        while self.memory_limit and self.memory > self.memory_limit and len(self) > 1:
+            self._evict()
+
+    def _evict(self):
+        """
+        Remove the oldest screenshot, data is released once no later frames reference it.
+        """
+        self.skip += 1
+        # Release leading frames once the first visible frame is a key frame
+        if self.skip < len(self.frames) and self.frames[self.skip].key:
+            for _ in range(self.skip):
+                self._pop()
+            self.skip = 0
+
+    def _pop(self):
+        frame = self.frames.popleft()
+        self.memory -= frame.data.nbytes if isinstance(frame.data, np.ndarray) else len(frame.data)
+        self.memory_raw -= int(np.prod(frame.shape))
+
+    def clear(self):
+        self.frames.clear()
+        self.skip = 0
+        self.memory = 0
+        self.memory_raw = 0
+        self._prev = None
+        self._since_key = 0
@@ -23,7 +23,7 @@ class EnemySearchingHandler(InfoHandler):
         if not self.is_in_map():
             return False
 
-        if MAP_ENEMY_SEARCHING.match_luma(self.device.image, offset=(5, 5)):
+        if self.match_luma(MAP_ENEMY_SEARCHING, offset=(5, 5)):
             return True
 
         return False
@@ -1,5 +1,3 @@
-from scipy import signal
-
 from module.base.base import ModuleBase
 from module.base.button import Button
 from module.base.timer import Timer
@@ -52,6 +50,7 @@ class InfoHandler(ModuleBase):
             # Blue lines are in a interval of 56
             'distance': 50,
         }
+        from scipy import signal
         peaks, _ = signal.find_peaks(line, **parameters)
         return len(peaks)
 
@@ -312,6 +311,7 @@ class InfoHandler(ModuleBase):
             'rel_height': 5,
         }
         y_count = np.sum(image, axis=1)
+        from scipy import signal
         peaks, properties = signal.find_peaks(y_count, **parameters)
         buttons = []
         total = len(peaks)
@@ -352,6 +352,7 @@ class InfoHandler(ModuleBase):
             # rel_height is about 240 / 48
             'rel_height': 4,
         }
+        from scipy import signal
         peaks, properties = signal.find_peaks(line, **parameters)
         buttons = []
         total = len(peaks)
@@ -1,7 +1,6 @@
 from typing import Union
 
 import numpy as np
-from scipy.signal import find_peaks
 from uiautomator2 import UiObject
 from uiautomator2.exceptions import XPathElementNotFoundError
 from uiautomator2.xpath import XPath, XPathSelector
@@ -246,6 +245,7 @@ class LoginHandler(UI):
             sims_height = np.mean(sims, axis=1)
             # pyplot.plot(sims_height, color='r')
             # pyplot.show()
+            from scipy.signal import find_peaks
             peaks, __ = find_peaks(sims_height, height=225)
             if len(peaks) == 2:
                 peaks = (peaks[0] + peaks[1]) / 2
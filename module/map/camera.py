@@ -54,6 +54,8 @@ class Camera(MapOperation):
             else:
                 whitelist, blacklist = None, None
 
+            # Search the new position locally in the next map detection
+            self.view.track(vector)
             vector = distance * vector
             vector = -vector
             self.device.swipe_vector(vector, name=name, box=box, whitelist_area=whitelist, blacklist_area=blacklist)
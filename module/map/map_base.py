@@ -1,4 +1,5 @@
 import copy
+import heapq
 
 from module.base.utils import location2node, node2location
 from module.logger import logger
@@ -35,6 +36,11 @@ class CampaignMap:
         self.poor_map_data = False
         self.camera_sight = (-3, -1, 3, 2)
         self.grid_connection = {}
+        # Adjacency arrays built from grid_connection, see _path_graph_get()
+        self._path_graph = None
+        # Cost fields of find_path_initial().
+        # Key: (start, ambush_cost, has_enemy). Value: (state, cost, connection)
+        self._path_cache = {}
 
     def __iter__(self):
         return iter(self.grids.values())
@@ -72,6 +78,7 @@ class CampaignMap:
                 grid = self.grid_class()
                 grid.location = (x, y)
                 self.grids[(x, y)] = grid
+        self.path_cache_clear()
 
         # camera_data can be generate automatically, but it's better to set it manually.
         self.camera_data = [location2node(loca) for loca in camera_2d((0, 0, *self._shape), sight=self.camera_sight)]
@@ -256,6 +263,7 @@ class CampaignMap:
             bool: If used wall data.
         """
         logger.info(f'grid_connection: wall={wall}, portal={portal}')
+        self.path_cache_clear()
 
         # Generate grid connection.
         total = set([grid for grid in self.grids.keys()])
@@ -511,8 +519,45 @@ class CampaignMap:
                  range(self.shape[0] + 1)])
             logger.info(text)
 
+    def path_cache_clear(self):
+        """
+        Drop adjacency arrays and cached cost fields.
+        Call this after modifying grids or grid_connection directly.
+        """
+        self._path_graph = None
+        self._path_cache = {}
+
+    def _path_graph_get(self):
+        """
+        Returns:
+            tuple: (grids, index, forward, backward)
+                grids (list[GridInfo]): All grids, sorted by location.
+                index (dict): Key: tuple, grid location. Value: int, index in grids.
+                forward (list[tuple[int]]): Index of grids that each grid connects to.
+                backward (list[tuple[int]]): Index of grids that connect to each grid.
+        """
+        if self._path_graph is None:
+            locations = sorted(self.grids.keys())
+            grids = [self.grids[loca] for loca in locations]
+            index = {loca: i for i, loca in enumerate(locations)}
+            forward = [tuple(sorted(index[arr] for arr in self.grid_connection[loca])) for loca in locations]
+            backward = [[] for _ in locations]
+            for i, arr in enumerate(forward):
+                for j in arr:
+                    backward[j].append(i)
+            backward = [tuple(arr) for arr in backward]
+            self._path_graph = (grids, index, forward, backward)
+
+        return self._path_graph
+
     def find_path_initial(self, location, has_ambush=True, has_enemy=True):
         """
+        Calculate grid.cost and grid.connection from a start grid, using Dijkstra.
+        Entering a grid costs 1, or 10 if grid may ambush.
+        Enemies are reachable but not walked through, if has_enemy.
+
+        Cost fields are cached until grids that affect them change.
+
         Args:
             location (tuple(int)): Grid location
             has_ambush (bool): MAP_HAS_AMBUSH
@@ -520,39 +565,78 @@ class CampaignMap:
         """
         location = location_ensure(location)
         ambush_cost = 10 if has_ambush else 1
-        for grid in self:
-            grid.cost = 9999
-            grid.connection = None
-        start = self[location]
-        start.cost = 0
-        visited = [start]
-        visited = set(visited)
+        grids, index, forward, backward = self._path_graph_get()
+
+        # 0 for blocked grids, `cost * 2 + 1` for grids that can be walked through, `cost * 2` for others
+        state = tuple([
+            0 if grid.is_land or grid.is_mechanism_block
+            else (ambush_cost if grid.may_ambush else 1) * 2 + (grid.is_sea or not has_enemy)
+            for grid in grids
+        ])
+        key = (location, ambush_cost, has_enemy)
+        cached = self._path_cache.get(key)
+        if cached is not None and cached[0] == state:
+            _, cost, connection = cached
+        else:
+            cost, connection = self._find_path_dijkstra(index[location], state, grids, forward, backward)
+            self._path_cache[key] = (state, cost, connection)
 
-        while 1:
-            new = visited.copy()
-            for grid in visited:
-                for arr in self.grid_connection[grid.location]:
-                    arr = self[arr]
-                    if arr.is_land or arr.is_mechanism_block:
-                        continue
-                    cost = ambush_cost if arr.may_ambush else 1
-                    cost += grid.cost
-
-                    if cost < arr.cost:
-                        arr.cost = cost
-                        arr.connection = grid.location
-                    elif cost == arr.cost:
-                        if abs(arr.location[0] - grid.location[0]) == 1:
-                            arr.connection = grid.location
-                    if arr.is_sea or not has_enemy:
-                        new.add(arr)
-            if len(new) == len(visited):
-                break
-            visited = new
+        for grid, c, conn in zip(grids, cost, connection):
+            grid.cost = c
+            grid.connection = conn
 
         # self.show_cost()
         # self.show_connection()
 
+    @staticmethod
+    def _find_path_dijkstra(start, state, grids, forward, backward):
+        """
+        Args:
+            start (int): Index of start grid.
+            state (tuple[int]): See find_path_initial()
+            grids (list[GridInfo]):
+            forward (list[tuple[int]]):
+            backward (list[tuple[int]]):
+
+        Returns:
+            tuple[list[int], list[tuple]]: Cost and connection of each grid.
+        """
+        cost = [9999] * len(grids)
+        cost[start] = 0
+        queue = [(0, start)]
+        while queue:
+            c, i = heapq.heappop(queue)
+            if c > cost[i]:
+                continue
+            # Start grid is always walked through
+            if i != start and not state[i] & 1:
+                continue
+            for j in forward[i]:
+                s = state[j]
+                if not s:
+                    continue
+                new = c + (s >> 1)
+                if new < cost[j]:
+                    cost[j] = new
+                    heapq.heappush(queue, (new, j))
+
+        # Connect to the previous grid on a shortest path, prefer horizontal moves.
+        connection = [None] * len(grids)
+        for j, c in enumerate(cost):
+            if j == start or c >= 9999:
+                continue
+            step = state[j] >> 1
+            x = grids[j].location[0]
+            for i in backward[j]:
+                if cost[i] + step != c or (i != start and not state[i] & 1):
+                    continue
+                if connection[j] is None or abs(grids[i].location[0] - x) == 1:
+                    connection[j] = grids[i].location
+                    if abs(grids[i].location[0] - x) == 1:
+                        break
+
+        return cost, connection
+
     def find_path_initial_multi_fleet(self, location_dict, current, has_ambush):
         """
         Args:
@@ -53,3 +53,13 @@ class MapDetector:
         self.lower_edge = bool(self.backend.lower_edge)
         self.upper_edge = bool(self.backend.upper_edge)
         self.generate = self.backend.generate
+
+    def track(self, vector):
+        """
+        Tell detector that camera is going to move, so next load() can search locally.
+
+        Args:
+            vector (tuple, np.ndarray): Camera movement in grids.
+        """
+        if isinstance(self.backend, Homography):
+            self.backend.track(vector)
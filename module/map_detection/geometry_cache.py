@@ -0,0 +1,196 @@
+import hashlib
+import os
+import sys
+from collections import OrderedDict
+
+import numpy as np
+
+from module.logger import logger
+
+GEOMETRY_CACHE_FOLDER = './bin/map_geometry'
+GEOMETRY_CACHE_VERSION = 1
+# Maximum files kept in GEOMETRY_CACHE_FOLDER, oldest files are removed first
+GEOMETRY_CACHE_LIMIT = 64
+# Maximum bytes of frame geometry kept in memory
+GEOMETRY_FRAME_LIMIT = 4 * 1024 * 1024
+
+
+def _normalize(data):
+    """
+    Convert data to something with a stable repr().
+    """
+    if isinstance(data, np.ndarray):
+        data = np.ascontiguousarray(data)
+        return 'ndarray', data.shape, data.dtype.str, hashlib.sha1(data.data).hexdigest()
+    if isinstance(data, (list, tuple)):
+        return tuple(_normalize(d) for d in data)
+    if isinstance(data, dict):
+        return tuple((k, _normalize(v)) for k, v in sorted(data.items()))
+    if isinstance(data, np.generic):
+        return data.item()
+    return data
+
+
+def _nbytes(value):
+    """
+    Rough memory usage of cached values.
+    """
+    if isinstance(value, np.ndarray):
+        return value.nbytes + sys.getsizeof(value[:0])
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(_nbytes(v) for v in value)
+    return sys.getsizeof(value)
+
+
+def geometry_key(*args):
+    """
+    Args:
+        *args: Anything that decides the geometry, such as HOMO_STORAGE, DETECTING_AREA, HOMO_TILE.
+
+    Returns:
+        str: Such as `3f0a94c2b1d07e55`
+    """
+    text = repr((GEOMETRY_CACHE_VERSION, _normalize(args)))
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()[:16]
+
+
+class GeometryCache:
+    """
+    Cache of map geometry, such as homography matrices and UI masks in homography space.
+
+    Geometry of a static map configuration, such as a preset HOMO_STORAGE, is calculated once
+    and saved to GEOMETRY_CACHE_FOLDER, repeated runs of the same campaign start with warm geometry.
+    Homography detected from screenshots differs slightly every time, callers shouldn't cache it.
+    Geometry that changes every frame, such as grid perspective data, is kept in memory only,
+    writing it to disk costs more than calculating.
+    """
+
+    def __init__(self, folder=GEOMETRY_CACHE_FOLDER, frame_limit=GEOMETRY_FRAME_LIMIT, limit=GEOMETRY_CACHE_LIMIT):
+        """
+        Args:
+            folder (str):
+            frame_limit (int): Maximum bytes of frame geometry kept in memory.
+            limit (int): Maximum files kept in folder.
+        """
+        self.folder = folder
+        self.frame_limit = frame_limit
+        self.limit = limit
+        # Set to False to calculate everything
+        self.enabled = True
+        # Key: str. Value: dict[str, np.ndarray]
+        self.persistent = {}
+        # LRU, Key: hashable. Value: tuple[anything, int], value and its bytes
+        self.frame = OrderedDict()
+        self.frame_bytes = 0
+
+    def file(self, key):
+        return os.path.join(self.folder, f'{key}.npz')
+
+    def get(self, key):
+        """
+        Args:
+            key (str): From geometry_key()
+
+        Returns:
+            dict[str, np.ndarray]: Or None if not cached.
+        """
+        if not self.enabled:
+            return None
+        try:
+            return self.persistent[key]
+        except KeyError:
+            pass
+
+        file = self.file(key)
+        if not os.path.exists(file):
+            return None
+        try:
+            with np.load(file, allow_pickle=False) as f:
+                data = {name: f[name] for name in f.files}
+        except Exception as e:
+            logger.warning(f'Failed to load map geometry {file}: {e}')
+            return None
+        self.persistent[key] = data
+        return data
+
+    def set(self, key, **arrays):
+        """
+        Args:
+            key (str): From geometry_key()
+            **arrays (np.ndarray):
+        """
+        if not self.enabled:
+            return
+        self.persistent[key] = arrays
+
+        file = self.file(key)
+        tmp = f'{file}.tmp'
+        try:
+            os.makedirs(self.folder, exist_ok=True)
+            with open(tmp, 'wb') as f:
+                np.savez_compressed(f, **arrays)
+            os.replace(tmp, file)
+        except OSError as e:
+            logger.warning(f'Failed to save map geometry {file}: {e}')
+            return
+        self.evict()
+
+    def evict(self):
+        """
+        Remove the oldest files if there are more than `limit` files in folder.
+        """
+        try:
+            files = [os.path.join(self.folder, file) for file in os.listdir(self.folder) if file.endswith('.npz')]
+            if len(files) <= self.limit:
+                return
+            files = sorted(files, key=os.path.getmtime)
+            for file in files[:len(files) - self.limit]:
+                os.remove(file)
+        except OSError as e:
+            logger.warning(f'Failed to evict map geometry: {e}')
+
+    def frame_get(self, key):
+        """
+        Args:
+            key: Hashable.
+
+        Returns:
+            Cached value, or None.
+        """
+        if not self.enabled:
+            return None
+        try:
+            value, _ = self.frame[key]
+        except KeyError:
+            return None
+        self.frame.move_to_end(key)
+        return value
+
+    def frame_set(self, key, value):
+        if not self.enabled:
+            return
+        nbytes = _nbytes(value)
+        old = self.frame.pop(key, None)
+        if old is not None:
+            self.frame_bytes -= old[1]
+        self.frame[key] = (value, nbytes)
+        self.frame_bytes += nbytes
+        while self.frame_bytes > self.frame_limit and len(self.frame) > 1:
+            _, (_, evicted) = self.frame.popitem(last=False)
+            self.frame_bytes -= evicted
+
+    def clear(self, disk=False):
+        """
+        Args:
+            disk (bool): True to delete files in GEOMETRY_CACHE_FOLDER as well.
+        """
+        self.persistent.clear()
+        self.frame.clear()
+        self.frame_bytes = 0
+        if disk and os.path.exists(self.folder):
+            for file in os.listdir(self.folder):
+                if file.endswith('.npz'):
+                    os.remove(os.path.join(self.folder, file))
+
+
+GEOMETRY_CACHE = GeometryCache()
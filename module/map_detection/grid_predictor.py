@@ -2,11 +2,56 @@ from module.base.utils import *
 from module.config.config import AzurLaneConfig
 from module.exception import ScriptError
 from module.logger import logger
+from module.map_detection.geometry_cache import GEOMETRY_CACHE
 from module.map_detection.utils import *
 from module.map_detection.utils_assets import *
 from module.template.assets import *
 
 
+def template_similarity(image, template):
+    """
+    Same as Template.match(), but returns the max similarity instead of bool.
+
+    Args:
+        image (np.ndarray):
+        template (Template):
+
+    Returns:
+        float:
+    """
+    images = template.image if template.is_gif else [template.image]
+    sim = -1.
+    for t in images:
+        res = cv2.matchTemplate(image, t, cv2.TM_CCOEFF_NORMED)
+        sim = max(sim, cv2.minMaxLoc(res)[1])
+    return sim
+
+
+def batch_template_similarity(images, template):
+    """
+    Match one template on many images of the same shape, with a single cv2.matchTemplate() call.
+    Images are stacked vertically, windows across two images are dropped.
+
+    Args:
+        images (np.ndarray): Shape (count, height, width).
+        template (Template):
+
+    Returns:
+        np.ndarray: Max similarity on each image, shape (count,).
+    """
+    count, height, width = images.shape
+    mosaic = images.reshape(count * height, width)
+    sim = np.full(count, -1., dtype=np.float32)
+    for t in (template.image if template.is_gif else [template.image]):
+        th, tw = t.shape[:2]
+        res = cv2.matchTemplate(mosaic, t, cv2.TM_CCOEFF_NORMED)
+        # Pad to `count * height` rows, so each image has `height` rows, `height - th + 1` of them are valid.
+        res = np.pad(res, ((0, th - 1), (0, 0)), mode='constant', constant_values=-1)
+        res = res.reshape(count, height, width - tw + 1)[:, :height - th + 1, :]
+        np.maximum(sim, res.max(axis=(1, 2)), out=sim)
+    return sim
+
+
 class GridPredictor:
     def __init__(self, location, image, corner, config):
         """
@@ -37,10 +82,26 @@ class GridPredictor:
                 self.template_enemy_genre[f'Siren_{name}'] = globals().get(f'TEMPLATE_SIREN_{name}')
 
         self.area = corner2area(self.corner)
-        self.homo_data = cv2.getPerspectiveTransform(
-            src=self.corner.astype(np.float32),
-            dst=area2corner((0, 0, *self.config.HOMO_TILE)).astype(np.float32))
-        self.homo_invt = cv2.invert(self.homo_data)[1]
+        key = ('grid', corner.tobytes(), self.config.HOMO_TILE)
+        cached = GEOMETRY_CACHE.frame_get(key)
+        if cached is None:
+            homo_data = cv2.getPerspectiveTransform(
+                src=self.corner.astype(np.float32),
+                dst=area2corner((0, 0, *self.config.HOMO_TILE)).astype(np.float32))
+            cached = (homo_data, cv2.invert(homo_data)[1])
+            GEOMETRY_CACHE.frame_set(key, cached)
+        self.homo_data, self.homo_invt = cached
+
+    @cached_property
+    def feature_cache(self):
+        """
+        Features of current image, filled by relative_match() and relative_hsv_count(),
+        or by View.predict_batch() for all grids at once.
+        Cleared by View when image changes.
+
+        Key: tuple, see relative_match() and relative_hsv_count(). Value: float or int.
+        """
+        return {}
 
     def screen2grid(self, points):
         """
@@ -80,6 +141,14 @@ class GridPredictor:
         cv2.morphologyEx(image_edge, cv2.MORPH_CLOSE, kernel, dst=image_edge)
         return image_edge
 
+    # (area, shape) of features in predict()
+    _area_enemy_scale = ((-0.415 - 0.7, -0.62 - 0.7, -0.415, -0.62), (50, 50))
+    _area_enemy_genre = (-0.5, -1, 0.5, 0)
+    _area_boss = ((-0.55, -0.2, 0.45, 0.2), (50, 20))
+    _area_submarine = ((-0.86, 0.08, -0.36, 0.58), (50, 50))
+    _area_fleet = ((-1, -2, -0.5, -1.5), (50, 50))
+    _area_current_fleet = ((-0.5, -3.5, 0.5, -2.5), (50, 50))
+
     def predict(self):
         self.enemy_scale = self.predict_enemy_scale()
         self.enemy_genre = self.predict_enemy_genre()
@@ -127,6 +196,67 @@ class GridPredictor:
             image = cv2.resize(image, shape, interpolation=cv2.INTER_CUBIC)
         return image
 
+    def relative_feature_image(self, area, shape, color=None, gray=False):
+        """
+        Args:
+            area (tuple): upper_left_x, upper_left_y, bottom_right_x, bottom_right_y, such as (-1, -1, 1, 1).
+            shape (tuple): Output image shape, (width, height).
+            color (tuple): RGB. If given, convert to color similarity.
+            gray (bool): If convert to gray.
+
+        Returns:
+            np.ndarray: Shape (height, width).
+        """
+        image = self.relative_crop(area, shape=shape)
+        if color is not None:
+            return color_similarity_2d(image, color=color)
+        if gray:
+            return rgb2gray(image)
+        return image
+
+    def relative_match(self, template, area, shape, color=None, gray=False):
+        """
+        Args:
+            template (Template):
+            area (tuple): upper_left_x, upper_left_y, bottom_right_x, bottom_right_y, such as (-1, -1, 1, 1).
+            shape (tuple): Output image shape, (width, height).
+            color (tuple): RGB. If given, match on color similarity.
+            gray (bool): If match on gray image.
+
+        Returns:
+            float: Max similarity, cached in feature_cache.
+        """
+        key = ('match', template, area, shape, color, gray)
+        try:
+            return self.feature_cache[key]
+        except KeyError:
+            pass
+        image = self.relative_feature_image(area, shape=shape, color=color, gray=gray)
+        sim = template_similarity(image, template)
+        self.feature_cache[key] = sim
+        return sim
+
+    def batch_features(self):
+        """
+        Features that predict() always calculates, View.predict_batch() calculates them for all grids at once.
+        Subclasses that override predict() should override this too.
+
+        Returns:
+            list[tuple]: Keys of feature_cache.
+        """
+        features = [
+            ('match', TEMPLATE_ENEMY_L, *self._area_enemy_scale, (255, 130, 132), False),
+            ('match', TEMPLATE_ENEMY_M, *self._area_enemy_scale, (255, 235, 156), False),
+            ('match', TEMPLATE_ENEMY_S, *self._area_enemy_scale, (255, 235, 156), False),
+            ('match', TEMPLATE_ENEMY_BOSS, *self._area_boss, (255, 77, 82), False),
+            ('match', TEMPLATE_SUBMARINE, *self._area_submarine, (255, 243, 156), False),
+            ('match', TEMPLATE_FLEET_AMMO, *self._area_fleet, (255, 255, 255), False),
+            ('hsv', *self._area_current_fleet, (138, 151), (0, 100), (0, 100)),
+        ]
+        for name, template, shape in self._enemy_genre_templates():
+            features.append(('match', template, self._area_enemy_genre, shape, None, True))
+        return features
+
     def relative_rgb_count(self, area, color, shape=(50, 50), threshold=221):
         """
         Args:
@@ -155,13 +285,19 @@ class GridPredictor:
         Returns:
             int: Number of matched pixels.
         """
-        image = self.relative_crop(area, shape=shape)
-        cv2.cvtColor(image, cv2.COLOR_RGB2HSV, dst=image)
+        key = ('hsv', area, shape, h, s, v)
+        try:
+            return self.feature_cache[key]
+        except KeyError:
+            pass
+        # relative_crop() may return a view of self.image, don't convert in place
+        image = cv2.cvtColor(self.relative_crop(area, shape=shape), cv2.COLOR_RGB2HSV)
         lower = (h[0] / 2, s[0] * 2.55, v[0] * 2.55)
         upper = (h[1] / 2 + 1, s[1] * 2.55 + 1, v[1] * 2.55 + 1)
         # Don't set `dst`, output image is (50, 50) but `image` is (50, 50, 3)
         image = cv2.inRange(image, lower, upper)
         count = cv2.countNonZero(image)
+        self.feature_cache[key] = count
         return count
 
     def predict_enemy_scale(self):
@@ -171,21 +307,37 @@ class GridPredictor:
         Returns:
             int: 1: Small, 2: Middle, 3: Large, 0: Unknown.
         """
-        image = self.relative_crop((-0.415 - 0.7, -0.62 - 0.7, -0.415, -0.62), shape=(50, 50))
-        red = color_similarity_2d(image, (255, 130, 132))
-        yellow = color_similarity_2d(image, (255, 235, 156))
-
-        if TEMPLATE_ENEMY_L.match(red, similarity=0.75):
+        if self.relative_match(TEMPLATE_ENEMY_L, *self._area_enemy_scale, color=(255, 130, 132)) > 0.75:
             scale = 3
-        elif TEMPLATE_ENEMY_M.match(yellow):
+        elif self.relative_match(TEMPLATE_ENEMY_M, *self._area_enemy_scale, color=(255, 235, 156)) > 0.85:
             scale = 2
-        elif TEMPLATE_ENEMY_S.match(yellow):
+        elif self.relative_match(TEMPLATE_ENEMY_S, *self._area_enemy_scale, color=(255, 235, 156)) > 0.85:
             scale = 1
         else:
             scale = 0
 
         return scale
 
+    def _enemy_genre_templates(self):
+        """
+        Yields:
+            str, Template, tuple: Template name, template, image shape to match on.
+        """
+        scaling_dic = self.config.MAP_ENEMY_GENRE_DETECTION_SCALING
+        for name, template in self.template_enemy_genre.items():
+            if template is None:
+                logger.warning(f'Enemy detection template not found: {name}')
+                logger.warning('Please create it with dev_tools/relative_record.py or dev_tools/relative_crop.py, '
+                               'then place it under ./assets/<server>/template')
+                raise ScriptError(f'Enemy detection template not found: {name}')
+
+            short_name = name[6:] if name.startswith('Siren_') else name
+            scaling = scaling_dic.get(short_name, 1)
+            scaling = (scaling,) if not isinstance(scaling, tuple) else scaling
+            for scale in scaling:
+                shape = tuple(np.round(np.array((60, 60)) * scale).astype(int).tolist())
+                yield name, template, shape
+
     def predict_enemy_genre(self):
         if self.config.MAP_SIREN_HAS_BOSS_ICON:
             if self.enemy_scale:
@@ -202,25 +354,10 @@ class GridPredictor:
                 if TEMPLATE_ENEMY_BOSS.match(image, similarity=0.7):
                     return 'Siren_Siren'
 
-        image_dic = {}
-        scaling_dic = self.config.MAP_ENEMY_GENRE_DETECTION_SCALING
-        for name, template in self.template_enemy_genre.items():
-            if template is None:
-                logger.warning(f'Enemy detection template not found: {name}')
-                logger.warning('Please create it with dev_tools/relative_record.py or dev_tools/relative_crop.py, '
-                               'then place it under ./assets/<server>/template')
-                raise ScriptError(f'Enemy detection template not found: {name}')
-
-            short_name = name[6:] if name.startswith('Siren_') else name
-            scaling = scaling_dic.get(short_name, 1)
-            scaling = (scaling,) if not isinstance(scaling, tuple) else scaling
-            for scale in scaling:
-                if scale not in image_dic:
-                    shape = tuple(np.round(np.array((60, 60)) * scale).astype(int))
-                    image_dic[scale] = rgb2gray(self.relative_crop((-0.5, -1, 0.5, 0), shape=shape))
-
-                if template.match(image_dic[scale], similarity=self.config.MAP_ENEMY_GENRE_SIMILARITY):
-                    return name
+        similarity = self.config.MAP_ENEMY_GENRE_SIMILARITY
+        for name, template, shape in self._enemy_genre_templates():
+            if self.relative_match(template, self._area_enemy_genre, shape, gray=True) > similarity:
+                return name
 
         return None
 
@@ -228,9 +365,7 @@ class GridPredictor:
         if self.enemy_genre == 'Siren_Siren':
             return False
 
-        image = self.relative_crop((-0.55, -0.2, 0.45, 0.2), shape=(50, 20))
-        image = color_similarity_2d(image, color=(255, 77, 82))
-        if TEMPLATE_ENEMY_BOSS.match(image, similarity=0.75):
+        if self.relative_match(TEMPLATE_ENEMY_BOSS, *self._area_boss, color=(255, 77, 82)) > 0.75:
             return True
 
         # Small boss icon
@@ -246,14 +381,10 @@ class GridPredictor:
         return self.relative_rgb_count(area=(-0.5, -1, 0.5, 0), color=(255, 255, 60), shape=(50, 50)) > 35
 
     def predict_fleet(self):
-        image = self.relative_crop((-1, -2, -0.5, -1.5), shape=(50, 50))
-        image = color_similarity_2d(image, color=(255, 255, 255))
-        return TEMPLATE_FLEET_AMMO.match(image)
+        return self.relative_match(TEMPLATE_FLEET_AMMO, *self._area_fleet, color=(255, 255, 255)) > 0.85
 
     def predict_submarine(self):
-        image = self.relative_crop((-0.86, 0.08, -0.36, 0.58), shape=(50, 50))
-        image = color_similarity_2d(image, color=(255, 243, 156))
-        return TEMPLATE_SUBMARINE.match(image)
+        return self.relative_match(TEMPLATE_SUBMARINE, *self._area_submarine, color=(255, 243, 156)) > 0.85
 
     def predict_caught_by_siren(self):
         image = self.relative_crop((-1, -1.5, 1, 0.5), shape=(120, 120))
@@ -276,7 +407,8 @@ class GridPredictor:
         return False
 
     def predict_current_fleet(self):
-        count = self.relative_hsv_count(area=(-0.5, -3.5, 0.5, -2.5), h=(141 - 3, 141 + 10), shape=(50, 50))
+        area, shape = self._area_current_fleet
+        count = self.relative_hsv_count(area=area, h=(141 - 3, 141 + 10), shape=shape)
         if count < 600:
             return False
 
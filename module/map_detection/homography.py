@@ -3,10 +3,12 @@ import time
 import numpy as np
 from PIL import ImageDraw, ImageOps
 
+from module.base.decorator import cached_property, del_cached_property
 from module.base.utils import *
 from module.config.config import AzurLaneConfig
 from module.exception import MapDetectionError
 from module.logger import logger
+from module.map_detection.geometry_cache import GEOMETRY_CACHE, geometry_key
 from module.map_detection.perspective import Perspective
 from module.map_detection.utils import *
 from module.map_detection.utils_assets import *
@@ -47,11 +49,17 @@ class Homography:
     Private
     """
     homo_storage: tuple
+    # Key of homography in GEOMETRY_CACHE
+    homo_key: str
+    # If homography is from a preset storage, only those are cached
+    homo_static: bool
     homo_data: np.ndarray
     homo_invt: np.ndarray
     homo_size: tuple
     homo_loca: np.ndarray
     homo_loaded: bool
+    # Expected homo_loca in next detection, see track()
+    track_loca: list
 
     map_inner: np.ndarray
     _map_edge_count: tuple
@@ -63,6 +71,7 @@ class Homography:
         """
         self.config = config
         self.homo_loaded = False
+        self.track_loca = []
 
     @cached_property
     def ui_mask_homo_stroke(self):
@@ -70,6 +79,11 @@ class Homography:
             mask = ASSETS.ui_mask_os
         else:
             mask = ASSETS.ui_mask
+        key = geometry_key('ui_mask_homo_stroke', self.homo_key, mask)
+        cached = GEOMETRY_CACHE.get(key) if self.homo_static else None
+        if cached is not None:
+            return cached['mask']
+
         image = cv2.warpPerspective(mask, self.homo_data, self.homo_size)
         kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (5, 5))
         image = cv2.erode(image, kernel).astype('uint8')
@@ -79,6 +93,8 @@ class Homography:
         image[-pad:, :] = 0
         image[:, :pad] = 0
         image[:, -pad:] = 0
+        if self.homo_static:
+            GEOMETRY_CACHE.set(key, mask=image)
         return image
 
     def load(self, image):
@@ -107,7 +123,7 @@ class Homography:
             src_pts = hori.cross(vert).points
             x = len(perspective.vertical) - 1
             y = len(perspective.horizontal) - 1
-            self.find_homography(size=(x, y), src_pts=src_pts)
+            self.find_homography(size=(x, y), src_pts=src_pts, static=False)
         elif image is not None:
             perspective_ = Perspective(self.config)
             perspective_.load(image)
@@ -120,15 +136,30 @@ class Homography:
         else:
             raise MapDetectionError('No data feed to load_homography, please input at least one.')
 
-    def find_homography(self, size, src_pts, overflow=True):
+    def find_homography(self, size, src_pts, overflow=True, static=True):
         """
         Args:
             size (tuple): (x, y)
             src_pts (list[tuple]): [upper-left, upper-right, bottom-left, bottom-right]
             overflow (bool): True if get full transformed image, false if get valid area only.
+            static (bool): True if src_pts is a preset, which will be cached.
+                False if src_pts is detected from screenshot, which differs slightly every time.
         """
         self.homo_storage = (size, [(x, y) for x, y in np.round(src_pts, 3)])
         logger.attr('homo_storage', self.homo_storage)
+        del_cached_property(self, 'ui_mask_homo_stroke')
+        self.track_loca = []
+
+        self.homo_static = static
+        self.homo_key = geometry_key(
+            'homography', self.homo_storage, self.config.DETECTING_AREA, self.config.HOMO_TILE, overflow)
+        cached = GEOMETRY_CACHE.get(self.homo_key) if static else None
+        if cached is not None:
+            self.homo_data = cached['homo_data']
+            self.homo_invt = cached['homo_invt']
+            self.homo_size = tuple(cached['homo_size'].tolist())
+            self.homo_loaded = True
+            return
 
         # Generate perspective data
         src_pts = np.array(src_pts) - self.config.DETECTING_AREA[:2]
@@ -152,6 +183,8 @@ class Homography:
         self.homo_invt = cv2.invert(homo)[1]
         self.homo_size = tuple(size.tolist())
         self.homo_loaded = True
+        if static:
+            GEOMETRY_CACHE.set(self.homo_key, homo_data=self.homo_data, homo_invt=self.homo_invt, homo_size=size)
 
     def detect(self, image):
         """
@@ -178,7 +211,10 @@ class Homography:
         # Image.fromarray(image_edge, mode='L').show()
 
         # Find free tile
-        if self.search_tile_center(image_edge, threshold_good=self.config.HOMO_CENTER_GOOD_THRESHOLD,
+        if self.search_tile_track(image_edge, threshold=self.config.HOMO_CENTER_GOOD_THRESHOLD,
+                                  margin=self.config.HOMO_TRACK_MARGIN):
+            pass
+        elif self.search_tile_center(image_edge, threshold_good=self.config.HOMO_CENTER_GOOD_THRESHOLD,
                                    threshold=self.config.HOMO_CENTER_THRESHOLD):
             pass
         elif self.search_tile_corner(image_edge, threshold=self.config.HOMO_CORNER_THRESHOLD):
@@ -189,6 +225,7 @@ class Homography:
             raise MapDetectionError('Failed to find a free tile')
 
         self.homo_loca %= self.config.HOMO_TILE
+        self.track_loca = [self.homo_loca] if self.config.HOMO_TRACK else []
 
         # Detect map edges
         self.lower_edge, self.upper_edge, self.left_edge, self.right_edge = False, False, False, False
@@ -214,6 +251,67 @@ class Homography:
             point2str(*self.homo_loca, length=3))
                     )
 
+    def track(self, vector):
+        """
+        Expect camera to move, next detection searches around the predicted homo_loca first.
+
+        Args:
+            vector (tuple, np.ndarray): Camera movement in grids, such as (0.4, -1.2).
+        """
+        if not self.config.HOMO_TRACK or not self.track_loca:
+            return
+        last = self.track_loca[-1]
+        # Map moves to the opposite
+        predict = (last - np.multiply(vector, self.config.HOMO_TILE)) % self.config.HOMO_TILE
+        # Keep last homo_loca as a candidate, in case the screenshot is taken before swipe
+        self.track_loca = [predict, last]
+
+    def search_tile_track(self, image, threshold=0.9, margin=20):
+        """
+        Search for the center of empty tile, around the expected positions only.
+        Tiles near the screen center are searched first, as they are less likely to be covered by UI.
+
+        Args:
+            image (np.ndarray): Monochrome image.
+            threshold (float):
+            margin (int): Search area extends from the expected tile center, in pixels.
+
+        Returns:
+            bool: If success.
+        """
+        if not self.track_loca:
+            return False
+
+        template = ASSETS.tile_center_image
+        size = np.array(template.shape[::-1])
+        tile = np.array(self.config.HOMO_TILE)
+        center = np.array(image.shape[::-1]) // 2
+        neighbours = sorted(
+            [(x, y) for x in range(-1, 2) for y in range(-1, 2)], key=lambda p: abs(p[0]) + abs(p[1]))
+        similarity = 0.
+        for expected in self.track_loca:
+            base = expected + self.config.HOMO_CENTER_OFFSET
+            base = base + np.round((center - base) / tile) * tile
+            for offset in neighbours:
+                x1, y1 = np.round(base + np.multiply(offset, tile) - margin).astype(int)
+                x2, y2 = np.array((x1, y1)) + size + margin * 2
+                x1, y1 = max(x1, 0), max(y1, 0)
+                x2, y2 = min(x2, image.shape[1]), min(y2, image.shape[0])
+                if x2 - x1 < size[0] or y2 - y1 < size[1]:
+                    continue
+                result = cv2.matchTemplate(image[y1:y2, x1:x2], template, cv2.TM_CCOEFF_NORMED)
+                _, sim, _, loca = cv2.minMaxLoc(result)
+                similarity = max(similarity, sim)
+                if sim > threshold:
+                    loca = np.add(loca, (x1, y1))
+                    self.homo_loca = loca - self.config.HOMO_CENTER_OFFSET
+                    self.map_inner = loca
+                    logger.attr_align('tile_track', f'{float2str(sim)} (good match)')
+                    return True
+
+        logger.attr_align('tile_track', f'{float2str(similarity)} (bad match)')
+        return False
+
     def search_tile_center(self, image, threshold_good=0.9, threshold=0.8, encourage=1.0):
         """
         Search for the center of empty tile.
@@ -378,6 +476,16 @@ class Homography:
         """
         Yields (tuple): ((x, y), [upper-left, upper-right, bottom-left, bottom-right])
         """
+        key = ('generate', self.homo_key, tuple(np.ravel(self.homo_loca).tolist()), edge_th,
+               self.left_edge, self.lower_edge, self.right_edge, self.upper_edge)
+        cached = GEOMETRY_CACHE.frame_get(key)
+        if cached is None:
+            cached = list(self._generate(edge_th=edge_th))
+            GEOMETRY_CACHE.frame_set(key, cached)
+        for data in cached:
+            yield data
+
+    def _generate(self, edge_th=9):
         area = [
             self.left_edge - edge_th if self.left_edge else 0,
             self.lower_edge - edge_th if self.lower_edge else 0,
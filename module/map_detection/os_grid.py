@@ -178,6 +178,10 @@ class OSGridPredictor(GridPredictor):
                 self.is_siren = True
                 self.enemy_scale = 0
 
+    def batch_features(self):
+        # OS grids use their own templates
+        return []
+
     def predict_fleet(self):
         # OS don't have ammo icon
         return super().predict_current_fleet()
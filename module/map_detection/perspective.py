@@ -3,7 +3,6 @@ import warnings
 
 import numpy as np
 from PIL import Image, ImageDraw, ImageOps
-from scipy import signal
 
 from module.base.utils import *
 from module.config.config import AzurLaneConfig
@@ -192,6 +191,7 @@ class Perspective:
             image = np.pad(image, ((0, 0), (0, pad)), mode='constant', constant_values=255)
         origin_shape = image.shape
         out = np.zeros(origin_shape[0] * origin_shape[1], dtype='uint8')
+        from scipy import signal
         peaks, _ = signal.find_peaks(image.ravel(), **param)
         out[peaks] = 255
         out = out.reshape(origin_shape)
@@ -1,5 +1,4 @@
 import numpy as np
-from scipy import optimize
 
 from module.base.utils import area_pad
 
@@ -390,6 +389,8 @@ def fit_points(points, mod, encourage=1):
     # return result['x'] % mod
 
     # Brute-force global minimizer
+    # Import here, scipy.optimize takes 0.4s to import but only map detection needs it
+    from scipy import optimize
     area = np.append(-mod - 10, mod + 10)
     result = optimize.brute(cal_distance, ((area[0], area[2]), (area[1], area[3])))
     return result % mod
@@ -1,12 +1,15 @@
 import collections
+import copy
 import time
 
+from module.base.decorator import del_cached_property
 from module.base.utils import *
-from module.exception import MapDetectionError
+from module.exception import MapDetectionError, ScriptError
 from module.logger import logger
 from module.map.map_grids import SelectedGrids
 from module.map_detection.detector import MapDetector
 from module.map_detection.grid import Grid
+from module.map_detection.grid_predictor import batch_template_similarity
 from module.map_detection.utils import *
 from module.map_detection.utils_assets import *
 
@@ -28,6 +31,9 @@ class View(MapDetector):
         super().__init__(config)
         self.mode = mode
         self.grid_class = grid_class
+        # Grids just created in last load(), before predicting anything.
+        # Key: (location, corner bytes). Value: Grid.
+        self._grid_prototype = {}
 
     def __iter__(self):
         return iter(self.grids.values())
@@ -59,11 +65,24 @@ class View(MapDetector):
         super().load(image)
 
         # Create local view map
+        # Grids at the same position as last load() are copied from prototypes,
+        # instead of calculating perspective data again.
+        # Don't reuse grid objects directly, the previous view may still be in use to predict swipe.
         grids = {}
-
+        prototype = {}
         for loca, points in self.generate():
             if area_in_area(area1=corner2area(points), area2=self.config.DETECTING_AREA):
-                grids[loca] = self.grid_class(location=loca, image=image, corner=points, config=self.config)
+                key = (loca, points.tobytes())
+                grid = self._grid_prototype.get(key)
+                if grid is None:
+                    grid = self.grid_class(location=loca, image=image, corner=points, config=self.config)
+                    prototype[key] = copy.copy(grid)
+                else:
+                    prototype[key] = grid
+                    grid = copy.copy(grid)
+                    grid.image = image
+                grids[loca] = grid
+        self._grid_prototype = prototype
 
         # Handle grids offset
         offset = list(grids.keys())
@@ -97,13 +116,73 @@ class View(MapDetector):
                 raise MapDetectionError(f'Camera outside map: offset=({x}, {y})')
             break
 
+    def predict_batch(self, grids):
+        """
+        Calculate features of all grids at once, results are stored in grid.feature_cache.
+        Crops of all grids are stacked, so color conversions run once,
+        and each template is matched once on the stacked image instead of once per grid.
+
+        Args:
+            grids (list[GridPredictor]):
+        """
+        count = len(grids)
+        crops = {}
+        images = {}
+
+        def get_crops(area, shape):
+            # Shape (count * height, width, 3)
+            key = (area, shape)
+            if key not in crops:
+                crops[key] = np.concatenate([grid.relative_crop(area, shape=shape) for grid in grids], axis=0)
+            return crops[key]
+
+        for feature in grids[0].batch_features():
+            kind, *args = feature
+            if kind == 'match':
+                template, area, shape, color, gray = args
+                key = (area, shape, color, gray)
+                if key not in images:
+                    image = get_crops(area, shape)
+                    if color is not None:
+                        image = color_similarity_2d(image, color=color)
+                    elif gray:
+                        image = rgb2gray(image)
+                    images[key] = image.reshape(count, shape[1], shape[0])
+                result = batch_template_similarity(images[key], template).tolist()
+            elif kind == 'hsv':
+                area, shape, h, s, v = args
+                image = cv2.cvtColor(get_crops(area, shape), cv2.COLOR_RGB2HSV)
+                lower = (h[0] / 2, s[0] * 2.55, v[0] * 2.55)
+                upper = (h[1] / 2 + 1, s[1] * 2.55 + 1, v[1] * 2.55 + 1)
+                image = cv2.inRange(image, lower, upper)
+                result = np.count_nonzero(image.reshape(count, -1), axis=1).tolist()
+            else:
+                raise ScriptError(f'Unknown batch feature: {kind}')
+
+            for grid, value in zip(grids, result):
+                grid.feature_cache[feature] = value
+
     def predict(self):
         """
         Predict grid info.
         """
         start_time = time.time()
-        for grid in self:
-            grid.predict()
+        grids = list(self)
+        for grid in grids:
+            del_cached_property(grid, 'feature_cache')
+        if self.config.MAP_PREDICT_BATCH and grids:
+            self.predict_batch(grids)
+
+        threads = self.config.MAP_PREDICT_THREADS
+        if threads > 1 and len(grids) > 1:
+            # OpenCV releases GIL
+            from concurrent.futures import ThreadPoolExecutor
+            with ThreadPoolExecutor(max_workers=threads) as executor:
+                for future in [executor.submit(grid.predict) for grid in grids]:
+                    future.result()
+        else:
+            for grid in grids:
+                grid.predict()
         logger.attr_align('predict', len(self.grids.keys()), front=float2str(time.time() - start_time) + 's')
 
     def update(self, image):
@@ -116,6 +195,7 @@ class View(MapDetector):
         for grid in self:
             grid.reset()
             grid.image = image
+            del_cached_property(grid, 'feature_cache')
 
     def select(self, **kwargs):
         """
@@ -0,0 +1,175 @@
+import time
+from collections import deque
+
+import gevent
+from gevent.event import AsyncResult, Event
+
+from module.logger import logger
+
+# Images are resized to this height before inference, same as _preprocess_img_array() of OCR backends
+IMG_HEIGHT = 32
+
+
+def padded_width(img_list):
+    """
+    Args:
+        img_list (list[np.ndarray]):
+
+    Returns:
+        int: Width that images are padded to, when they are inferred in one batch.
+    """
+    return max(int(round(IMG_HEIGHT / img.shape[0] * img.shape[1])) for img in img_list)
+
+
+class OcrRequest:
+    def __init__(self, img_list, cand_alphabet):
+        """
+        Args:
+            img_list (list[np.ndarray]):
+            cand_alphabet (str): None for no limit.
+        """
+        self.img_list = img_list
+        self.cand_alphabet = cand_alphabet
+        self.width = padded_width(img_list)
+        self.result = AsyncResult()
+
+
+class OcrBatcher:
+    """
+    Coalesce concurrent OCR requests on the same model into one inference batch.
+
+    OCR server runs in gevent, each rpc call is a greenlet.
+    Calls submit() their images and wait, while a worker greenlet collects requests
+    for at most `max_wait` seconds or `max_batch` images, and runs them in one forward.
+    Requests arriving during inference are queued and go to the next batch,
+    so batches grow as more Alas instances share the server.
+
+    Images in a batch are zero-padded to the widest one, and the bidirectional GRU reads the padding,
+    so only requests padded to the same width are batched together.
+    Results are then the same as running each request alone, no matter what other instances send.
+    """
+
+    def __init__(self, model, max_batch=64, max_wait=0.005, name=''):
+        """
+        Args:
+            model (AlOcr):
+            max_batch (int): Maximum images in one batch.
+                A single request larger than it still runs as a whole.
+            max_wait (float): Seconds to wait for more requests before inference.
+            name (str):
+        """
+        self.model = model
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.name = name
+        self.queue = deque()
+        self.wakeup = Event()
+        self.worker = None
+
+        # Stats
+        self.batch_count = 0
+        self.request_count = 0
+        self.image_count = 0
+        self.max_batch_size = 0
+        self.max_queue_depth = 0
+        self.inference_time = 0.
+
+    def submit(self, img_list, cand_alphabet=None):
+        """
+        Args:
+            img_list (list[np.ndarray]):
+            cand_alphabet (str): None for no limit.
+
+        Returns:
+            list[list[str]]: Same as AlOcr.ocr_for_single_lines()
+        """
+        if len(img_list) == 0:
+            return []
+        if self.worker is None or self.worker.dead:
+            self.worker = gevent.spawn(self._loop)
+
+        request = OcrRequest(img_list, cand_alphabet)
+        self.queue.append(request)
+        self.max_queue_depth = max(self.max_queue_depth, len(self.queue))
+        self.wakeup.set()
+        return request.result.get()
+
+    def _collect(self):
+        """
+        Returns:
+            list[OcrRequest]: Requests of the next batch, at least one.
+                All of them have the same padded width as the first request in queue.
+        """
+        batch = [self.queue.popleft()]
+        count = len(batch[0].img_list)
+        width = batch[0].width
+        remain = deque()
+        while self.queue:
+            request = self.queue.popleft()
+            if request.width == width and count + len(request.img_list) <= self.max_batch:
+                batch.append(request)
+                count += len(request.img_list)
+            else:
+                remain.append(request)
+        # Don't replace self.queue, submit() appends to the same object
+        self.queue.extend(remain)
+        return batch
+
+    def _loop(self):
+        while 1:
+            self.wakeup.wait()
+            # Let other greenlets submit their requests
+            if sum(len(request.img_list) for request in self.queue) < self.max_batch:
+                gevent.sleep(self.max_wait)
+            batch = self._collect()
+            if not self.queue:
+                self.wakeup.clear()
+            self._run(batch)
+
+    def _run(self, batch):
+        """
+        Args:
+            batch (list[OcrRequest]):
+        """
+        img_list = []
+        cand_alphabet_list = []
+        for request in batch:
+            img_list += request.img_list
+            cand_alphabet_list += [request.cand_alphabet] * len(request.img_list)
+
+        start = time.time()
+        try:
+            result = self.model.batch_ocr_for_single_lines(img_list, cand_alphabet_list)
+        except Exception as e:
+            logger.exception(e)
+            for request in batch:
+                request.result.set_exception(e)
+            return
+        self.inference_time += time.time() - start
+
+        self.batch_count += 1
+        self.request_count += len(batch)
+        self.image_count += len(img_list)
+        self.max_batch_size = max(self.max_batch_size, len(img_list))
+
+        index = 0
+        for request in batch:
+            request.result.set(result[index:index + len(request.img_list)])
+            index += len(request.img_list)
+
+    @property
+    def stats(self):
+        """
+        Returns:
+            dict:
+        """
+        return {
+            'queue_depth': len(self.queue),
+            'max_queue_depth': self.max_queue_depth,
+            'batch_count': self.batch_count,
+            'request_count': self.request_count,
+            'image_count': self.image_count,
+            'avg_batch_size': round(self.image_count / self.batch_count, 2) if self.batch_count else 0.,
+            'max_batch_size': self.max_batch_size,
+            'avg_inference_time': round(self.inference_time / self.batch_count, 4) if self.batch_count else 0.,
+        }
@@ -0,0 +1,90 @@
+import hashlib
+from collections import OrderedDict
+
+import numpy as np
+
+from module.logger import logger
+
+
+class OcrCache:
+    """
+    LRU cache of OCR results, keyed by hash of pre-processed crops.
+
+    Counters and timers are OCR'd again and again on frames where nothing changed,
+    a hit skips both local inference and the round trip to OCR server.
+    """
+
+    def __init__(self, size=512):
+        """
+        Args:
+            size (int): Maximum results kept.
+        """
+        self.size = size
+        self.cache = OrderedDict()
+        self.hit = 0
+        self.miss = 0
+
+    @staticmethod
+    def key(image, lang, alphabet):
+        """
+        Args:
+            image (np.ndarray): Pre-processed image.
+            lang (str):
+            alphabet (str):
+
+        Returns:
+            tuple:
+        """
+        image = np.ascontiguousarray(image)
+        digest = hashlib.blake2b(image.data, digest_size=16).digest()
+        return lang, alphabet, image.shape, image.dtype.str, digest
+
+    def get(self, key):
+        """
+        Args:
+            key (tuple):
+
+        Returns:
+            list[str]: Result, or None if not cached.
+        """
+        try:
+            result = self.cache[key]
+        except KeyError:
+            self.miss += 1
+            return None
+        self.cache.move_to_end(key)
+        self.hit += 1
+        return list(result)
+
+    def set(self, key, result):
+        """
+        Args:
+            key (tuple):
+            result (list[str]):
+        """
+        self.cache[key] = tuple(result)
+        self.cache.move_to_end(key)
+        while len(self.cache) > self.size:
+            self.cache.popitem(last=False)
+
+    @property
+    def hit_rate(self):
+        total = self.hit + self.miss
+        return self.hit / total if total else 0.
+
+    def show(self):
+        total = self.hit + self.miss
+        if total:
+            logger.attr('OcrCache', f'hit rate {round(self.hit_rate * 100, 1)}% ({self.hit}/{total}), '
+                                    f'{len(self.cache)} results cached')
+
+    def counter_clear(self):
+        self.hit = 0
+        self.miss = 0
+
+    def clear(self):
+        self.cache.clear()
+        self.counter_clear()
+
+
+OCR_CACHE = OcrCache()
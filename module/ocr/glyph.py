@@ -0,0 +1,250 @@
+import os
+
+import cv2
+import numpy as np
+
+from module.logger import logger
+
+GLYPH_FOLDER = './bin/glyph'
+
+
+def segment_glyphs(image, threshold=128):
+    """
+    Split a single line image into glyphs by column projection.
+
+    Args:
+        image (np.ndarray): Output of Ocr.pre_process(), letters in black, background in white.
+        threshold (int): Pixels darker than it are letters.
+
+    Returns:
+        list[np.ndarray]: Binary glyph images, letters in 1.
+            All glyphs share the vertical extent of the line, so ':' and '-' keep their position.
+    """
+    ink = (image < threshold).astype(np.uint8)
+    rows = np.where(ink.any(axis=1))[0]
+    if not len(rows):
+        return []
+    ink = ink[rows[0]:rows[-1] + 1]
+
+    columns = ink.any(axis=0).astype(np.int8)
+    # Starts and ends of continuous columns with ink
+    edge = np.diff(np.concatenate([[0], columns, [0]]))
+    starts = np.where(edge == 1)[0]
+    ends = np.where(edge == -1)[0]
+    return [ink[:, start:end] for start, end in zip(starts, ends)]
+
+
+class GlyphRecognizer:
+    """
+    A template matching recognizer for fixed-font text, such as digits, counters and durations.
+
+    Glyphs are normalized to GLYPH_SIZE, keeping aspect ratio, and compared to known templates
+    with normalized cross-correlation. Templates are learnt from results of the neural model,
+    and can be preloaded from GLYPH_FOLDER, see dev_tools/glyph_benchmark.py.
+    """
+    # (width, height)
+    GLYPH_SIZE = (16, 24)
+    # Minimum similarity to accept a glyph
+    SIMILARITY = 0.85
+    # Minimum similarity gap between the best char and the second best char
+    MARGIN = 0.05
+    # Maximum templates of each char, to cover different fonts
+    MAX_TEMPLATES = 8
+    # Times that the neural model has to give the same char on a glyph, before it's learnt as template
+    LEARN_AGREE = 3
+
+    def __init__(self, name='azur_lane'):
+        """
+        Args:
+            name (str): Model lang.
+        """
+        self.name = name
+        # Key: str, char. Value: list[np.ndarray], normalized glyphs
+        self.templates = {}
+        # Glyphs waiting to be confirmed, list of [char, normalized glyph, times agreed]
+        self.candidates = []
+        self._stacked = None
+        self._loaded = False
+
+    @property
+    def file(self):
+        return os.path.join(GLYPH_FOLDER, f'{self.name}.npz')
+
+    def normalize(self, glyph):
+        """
+        Args:
+            glyph (np.ndarray): Binary glyph image.
+
+        Returns:
+            np.ndarray: Shape (height, width) of GLYPH_SIZE, float32, zero mean and unit norm,
+                or None if glyph is a blank image.
+        """
+        width, height = self.GLYPH_SIZE
+        h, w = glyph.shape
+        # Pad to the aspect ratio of GLYPH_SIZE, so narrow glyphs like '1' stay narrow
+        target = int(np.ceil(h * width / height))
+        if w < target:
+            left = (target - w) // 2
+            glyph = cv2.copyMakeBorder(glyph, 0, 0, left, target - w - left, cv2.BORDER_CONSTANT, value=0)
+        glyph = cv2.resize(glyph.astype(np.float32), (width, height), interpolation=cv2.INTER_AREA)
+        glyph -= glyph.mean()
+        norm = np.linalg.norm(glyph)
+        if norm < 1e-6:
+            return None
+        return glyph / norm
+
+    def load(self):
+        """
+        Load templates from file once, missing file is fine.
+        """
+        if self._loaded:
+            return
+        self._loaded = True
+        try:
+            data = np.load(self.file)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logger.warning(f'Failed to load glyph templates: {e}')
+            return
+        for char, glyphs in zip(data['chars'], data['glyphs']):
+            self.templates.setdefault(str(char), []).append(glyphs)
+        self._stacked = None
+        logger.info(f'Glyph templates loaded: {self.file}, {sum(len(v) for v in self.templates.values())} glyphs')
+
+    def save(self):
+        os.makedirs(GLYPH_FOLDER, exist_ok=True)
+        chars = [char for char, glyphs in self.templates.items() for _ in glyphs]
+        glyphs = [glyph for glyphs in self.templates.values() for glyph in glyphs]
+        np.savez_compressed(self.file, chars=np.array(chars), glyphs=np.array(glyphs, dtype=np.float32))
+        logger.info(f'Glyph templates saved: {self.file}, {len(glyphs)} glyphs')
+
+    @property
+    def stacked(self):
+        """
+        Returns:
+            tuple[list[str], np.ndarray]: Chars, and templates in shape (n, width * height).
+        """
+        if self._stacked is None:
+            chars = [char for char, glyphs in self.templates.items() for _ in glyphs]
+            glyphs = [glyph.ravel() for glyphs in self.templates.values() for glyph in glyphs]
+            glyphs = np.array(glyphs, dtype=np.float32).reshape(len(glyphs), -1)
+            self._stacked = (chars, glyphs)
+        return self._stacked
+
+    def learn(self, image, text, trusted=False):
+        """
+        Add glyphs of an image with known text as templates.
+
+        Results of the neural model are not checked, a glyph becomes a template only after the model gives
+        the same char on it LEARN_AGREE times, and is dropped if the model ever gives another char.
+
+        Args:
+            image (np.ndarray): Output of Ocr.pre_process()
+            text (str, list[str]): Result of the neural model, or labelled text.
+            trusted (bool): True if text is labelled, learn immediately.
+
+        Returns:
+            bool: If learnt.
+        """
+        text = [char for char in text if char != ' ']
+        glyphs = segment_glyphs(image)
+        if not text or len(glyphs) != len(text):
+            return False
+
+        learnt = False
+        for char, glyph in zip(text, glyphs):
+            glyph = self.normalize(glyph)
+            if glyph is None:
+                continue
+            templates = self.templates.setdefault(char, [])
+            if len(templates) >= self.MAX_TEMPLATES:
+                continue
+            # Skip glyphs already known
+            if any(float(np.sum(glyph * t)) > 0.98 for t in templates):
+                continue
+            if not trusted and not self._agree(char, glyph):
+                continue
+            templates.append(glyph)
+            learnt = True
+
+        if learnt:
+            self._stacked = None
+        return learnt
+
+    def _agree(self, char, glyph):
+        """
+        Args:
+            char (str): Char given by the neural model.
+            glyph (np.ndarray): Normalized glyph.
+
+        Returns:
+            bool: If the glyph has been given the same char LEARN_AGREE times.
+        """
+        for index, candidate in enumerate(self.candidates):
+            if float(np.sum(glyph * candidate[1])) <= 0.98:
+                continue
+            if candidate[0] != char:
+                # Model disagrees with itself, this glyph is ambiguous
+                self.candidates.pop(index)
+                return False
+            candidate[2] += 1
+            if candidate[2] >= self.LEARN_AGREE:
+                self.candidates.pop(index)
+                return True
+            return False
+
+        self.candidates.append([char, glyph, 1])
+        # Limit memory, drop the oldest candidates
+        if len(self.candidates) > 256:
+            self.candidates = self.candidates[-256:]
+        return self.LEARN_AGREE <= 1
+
+    def recognize(self, image, alphabet=None):
+        """
+        Args:
+            image (np.ndarray): Output of Ocr.pre_process()
+            alphabet (str): Candidate chars, None for no limit.
+
+        Returns:
+            list[str]: Same as AlOcr.ocr_for_single_lines() of one image,
+                or None if any glyph has a low confidence.
+        """
+        self.load()
+        if not self.templates:
+            return None
+        glyphs = segment_glyphs(image)
+        if not glyphs:
+            return None
+
+        chars, templates = self.stacked
+        if alphabet is not None:
+            allowed = np.array([char in alphabet for char in chars])
+        else:
+            allowed = np.ones(len(chars), dtype=bool)
+        if not allowed.any():
+            return None
+
+        glyphs = [self.normalize(glyph) for glyph in glyphs]
+        if any(glyph is None for glyph in glyphs):
+            return None
+        # Correlation of each glyph to each template, shape (n_glyphs, n_templates)
+        similarity = np.array([glyph.ravel() for glyph in glyphs]) @ templates.T
+        similarity[:, ~allowed] = -1.
+
+        result = []
+        for row in similarity:
+            best = int(np.argmax(row))
+            if row[best] < self.SIMILARITY:
+                return None
+            others = [sim for char, sim in zip(chars, row) if char != chars[best]]
+            if others and row[best] - max(others) < self.MARGIN:
+                return None
+            result.append(chars[best])
+        return result
+
+
+# Key: str, lang. Value: GlyphRecognizer
+GLYPH_RECOGNIZER = {
+    'azur_lane': GlyphRecognizer('azur_lane'),
+}
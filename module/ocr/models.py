@@ -2,6 +2,32 @@ from module.base.decorator import cached_property
 
 
 class OcrModel:
+    # Inference backend of each model
+    # 'mxnet': AlOcr, cnocr running on mxnet, takes seconds to import.
+    # 'numpy': NumpyOcr, same weights running on NumPy, loads in milliseconds.
+    BACKEND = {
+        'azur_lane': 'mxnet',
+        'cnocr': 'mxnet',
+        'jp': 'mxnet',
+        'tw': 'mxnet',
+    }
+
+    def get_model(self, name, **kwargs):
+        """
+        Args:
+            name (str): Model name, also the attribute name.
+            **kwargs: Arguments of AlOcr.
+
+        Returns:
+            AlOcr, NumpyOcr:
+        """
+        if self.BACKEND.get(name, 'mxnet') == 'numpy':
+            from module.ocr.numpy_ocr import NumpyOcr
+            return NumpyOcr(name=name, **kwargs)
+        else:
+            from module.ocr.al_ocr import AlOcr
+            return AlOcr(name=name, **kwargs)
+
     @cached_property
     def azur_lane(self):
         # Folder: ./bin/cnocr_models/azur_lane
@@ -12,9 +38,8 @@ class OcrModel:
         # Font: Impact, AgencyFB-Regular, MStiffHeiHK-UltraBold
         # Charset: 0123456789ABCDEFGHIJKLMNPQRSTUVWXYZ:/- (Letter 'O' and <space> is not included)
         # _num_classes: 39
-        from module.ocr.al_ocr import AlOcr
-        return AlOcr(model_name='densenet-lite-gru', model_epoch=15, root='./bin/cnocr_models/azur_lane',
-                     name='azur_lane')
+        return self.get_model('azur_lane', model_name='densenet-lite-gru', model_epoch=15,
+                              root='./bin/cnocr_models/azur_lane')
 
     @cached_property
     def cnocr(self):
@@ -26,13 +51,11 @@ class OcrModel:
         # Font: Various
         # Charset: Number, English character, Chinese character, symbols, <space>
         # _num_classes: 6426
-        from module.ocr.al_ocr import AlOcr
-        return AlOcr(model_name='densenet-lite-gru', model_epoch=39, root='./bin/cnocr_models/cnocr', name='cnocr')
+        return self.get_model('cnocr', model_name='densenet-lite-gru', model_epoch=39, root='./bin/cnocr_models/cnocr')
 
     @cached_property
     def jp(self):
-        from module.ocr.al_ocr import AlOcr
-        return AlOcr(model_name='densenet-lite-gru', model_epoch=125, root='./bin/cnocr_models/jp', name='jp')
+        return self.get_model('jp', model_name='densenet-lite-gru', model_epoch=125, root='./bin/cnocr_models/jp')
 
     @cached_property
     def tw(self):
@@ -44,8 +67,7 @@ class OcrModel:
         # Font: Various, 6 kinds
         # Charset: Numbers, Upper english characters, Chinese traditional characters
         # _num_classes: 5322
-        from module.ocr.al_ocr import AlOcr
-        return AlOcr(model_name='densenet-lite-gru', model_epoch=63, root='./bin/cnocr_models/tw', name='tw')
+        return self.get_model('tw', model_name='densenet-lite-gru', model_epoch=63, root='./bin/cnocr_models/tw')
 
 
 OCR_MODEL = OcrModel()
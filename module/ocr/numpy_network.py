@@ -0,0 +1,380 @@
+import json
+import struct
+
+import numpy as np
+from numpy.lib.stride_tricks import as_strided
+
+# Magic numbers of mxnet NDArray files
+NDARRAY_LIST_MAGIC = 0x112
+NDARRAY_V2_MAGIC = 0xF993FAC9
+# mxnet type_flag to numpy dtype
+MXNET_DTYPE = {
+    0: np.float32,
+    1: np.float64,
+    2: np.float16,
+    3: np.uint8,
+    4: np.int32,
+    5: np.int8,
+    6: np.int64,
+}
+
+
+def load_mxnet_params(file):
+    """
+    Read a `.params` file saved by mxnet, without importing mxnet.
+
+    Args:
+        file (str):
+
+    Returns:
+        dict: Key: str, param name without `arg:` or `aux:`. Value: np.ndarray.
+    """
+    with open(file, 'rb') as f:
+        data = f.read()
+
+    def read(fmt, offset):
+        size = struct.calcsize(fmt)
+        return struct.unpack(fmt, data[offset:offset + size]), offset + size
+
+    (magic, _, count), offset = read('<QQQ', 0)
+    if magic != NDARRAY_LIST_MAGIC:
+        raise ValueError(f'Invalid mxnet params file: {file}')
+
+    arrays = []
+    for _ in range(count):
+        (magic, storage), offset = read('<Ii', offset)
+        if magic != NDARRAY_V2_MAGIC or storage != 0:
+            raise ValueError(f'Unsupported NDArray in {file}, magic={hex(magic)}, storage={storage}')
+        (ndim,), offset = read('<I', offset)
+        shape, offset = read(f'<{ndim}q', offset)
+        if ndim == 0:
+            arrays.append(np.zeros((), dtype=np.float32))
+            continue
+        (_, _, type_flag), offset = read('<iii', offset)
+        dtype = np.dtype(MXNET_DTYPE[type_flag])
+        size = int(np.prod(shape)) * dtype.itemsize
+        arrays.append(np.frombuffer(data[offset:offset + size], dtype=dtype).reshape(shape).copy())
+        offset += size
+
+    (count,), offset = read('<Q', offset)
+    names = []
+    for _ in range(count):
+        (length,), offset = read('<Q', offset)
+        names.append(data[offset:offset + length].decode('utf-8'))
+        offset += length
+
+    return {name.split(':', 1)[-1]: array for name, array in zip(names, arrays)}
+
+
+def parse_tuple(string):
+    """
+    Args:
+        string (str): Such as '(1, 1)', '()', '-1'
+
+    Returns:
+        tuple[int]:
+    """
+    string = string.strip().strip('()[]')
+    return tuple(int(i) for i in string.split(',') if i.strip())
+
+
+def mxnet_reshape(shape, target):
+    """
+    Output shape of mxnet Reshape, with special values 0, -1, -2, -3, -4.
+
+    Args:
+        shape (tuple[int]): Input shape.
+        target (tuple[int]):
+
+    Returns:
+        tuple[int]:
+    """
+    out = []
+    index = 0
+    i = 0
+    while i < len(target):
+        value = target[i]
+        if value == 0:
+            out.append(shape[index])
+            index += 1
+        elif value == -1:
+            out.append(-1)
+            index += 1
+        elif value == -2:
+            out += list(shape[index:])
+            index = len(shape)
+        elif value == -3:
+            out.append(shape[index] * shape[index + 1])
+            index += 2
+        elif value == -4:
+            a, b = target[i + 1], target[i + 2]
+            if a == -1:
+                a = shape[index] // b
+            if b == -1:
+                b = shape[index] // a
+            out += [a, b]
+            index += 1
+            i += 2
+        else:
+            out.append(value)
+            index += 1
+        i += 1
+    if -1 in out:
+        known = int(np.prod([d for d in out if d != -1]))
+        out[out.index(-1)] = int(np.prod(shape)) // known
+    return tuple(out)
+
+
+def sigmoid(x):
+    return 1. / (1. + np.exp(-x))
+
+
+class NumpyNetwork:
+    """
+    Run an exported mxnet symbol graph in inference mode with NumPy.
+
+    Only the operators used by cnocr densenet-lite-gru models are supported.
+    Convolutions and matrix products go through BLAS, which uses all cores on batched input.
+    """
+
+    def __init__(self, symbol_file, params_file, output='blockgrad0'):
+        """
+        Args:
+            symbol_file (str): `*-symbol.json`
+            params_file (str): `*-0015.params`
+            output (str): Name of the output node.
+        """
+        with open(symbol_file, 'r', encoding='utf-8') as f:
+            self.nodes = json.load(f)['nodes']
+        self.params = {k: v.astype(np.float32) for k, v in load_mxnet_params(params_file).items()}
+        names = [node['name'] for node in self.nodes]
+        self.output = names.index(output)
+        # Nodes required by output, in topological order
+        required = set()
+        stack = [self.output]
+        while stack:
+            index = stack.pop()
+            if index in required:
+                continue
+            required.add(index)
+            stack += [i[0] for i in self.nodes[index]['inputs']]
+        self.order = sorted(required)
+        # Operators may write into their first input, if it's an intermediate value used by nobody else
+        consumers = {}
+        for index in self.order:
+            for i in self.nodes[index]['inputs']:
+                consumers[i[0]] = consumers.get(i[0], 0) + 1
+        for index in self.order:
+            inputs = self.nodes[index]['inputs']
+            if inputs and self.nodes[inputs[0][0]]['op'] != 'null' and consumers[inputs[0][0]] == 1:
+                self.nodes[index]['inplace'] = True
+        self._fold_batch_norm()
+
+    def _fold_batch_norm(self):
+        """
+        Pre-calculate scale and shift of BatchNorm layers.
+        """
+        self.batch_norm = {}
+        for node in self.nodes:
+            if node['op'] != 'BatchNorm':
+                continue
+            gamma, beta, mean, var = [self.params[self.nodes[i[0]]['name']] for i in node['inputs'][1:]]
+            attrs = node.get('attrs', {})
+            if attrs.get('fix_gamma', 'True') == 'True':
+                gamma = np.ones_like(gamma)
+            scale = gamma / np.sqrt(var + float(attrs.get('eps', 1e-3)))
+            shift = beta - mean * scale
+            self.batch_norm[node['name']] = (scale.reshape(1, -1, 1, 1), shift.reshape(1, -1, 1, 1))
+
+    def forward(self, data):
+        """
+        Args:
+            data (np.ndarray): Shape (batch, channel, height, width)
+
+        Returns:
+            np.ndarray: Output of the graph.
+        """
+        values = {}
+        for index in self.order:
+            node = self.nodes[index]
+            op = node['op']
+            if op == 'null':
+                if node['name'] == 'data':
+                    values[index] = np.asarray(data, dtype=np.float32)
+                elif node['name'] in self.params:
+                    values[index] = self.params[node['name']]
+                continue
+            inputs = [values.get(i[0]) for i in node['inputs']]
+            values[index] = self.__getattribute__(f'op_{op}')(node, *inputs)
+        return values[self.output]
+
+    """
+    Operators
+    """
+
+    @staticmethod
+    def op_Convolution(node, x, weight, bias=None):
+        attrs = node['attrs']
+        sh, sw = parse_tuple(attrs.get('stride', '(1, 1)'))
+        ph, pw = parse_tuple(attrs.get('pad', '(0, 0)'))
+        groups = int(attrs.get('num_group', 1))
+        n, c, _, _ = x.shape
+        out_channel, _, kh, kw = weight.shape
+
+        if ph or pw:
+            x = np.pad(x, ((0, 0), (0, 0), (ph, ph), (pw, pw)), 'constant')
+        h, w = x.shape[2:]
+        ho, wo = (h - kh) // sh + 1, (w - kw) // sw + 1
+
+        if kh == kw == sh == sw == 1 and groups == 1:
+            out = np.matmul(weight.reshape(out_channel, c), x.reshape(n, c, h * w))
+        else:
+            x = np.ascontiguousarray(x)
+            s = x.strides
+            cols = as_strided(x, shape=(n, c, kh, kw, ho, wo),
+                              strides=(s[0], s[1], s[2], s[3], s[2] * sh, s[3] * sw))
+            if groups == 1:
+                cols = cols.reshape(n, c * kh * kw, ho * wo)
+                out = np.matmul(weight.reshape(out_channel, -1), cols)
+            else:
+                cols = cols.reshape(n, groups, c // groups * kh * kw, ho * wo)
+                weight = weight.reshape(groups, out_channel // groups, -1)
+                out = np.einsum('gok,ngkp->ngop', weight, cols, optimize=True)
+        out = out.reshape(n, out_channel, ho, wo)
+        if bias is not None and attrs.get('no_bias', 'False') != 'True':
+            out += bias.reshape(1, -1, 1, 1)
+        return out
+
+    def op_BatchNorm(self, node, x, *args):
+        scale, shift = self.batch_norm[node['name']]
+        shape = (1, -1) + (1,) * (x.ndim - 2)
+        out = np.multiply(x, scale.reshape(shape), out=x if node.get('inplace') else None)
+        out += shift.reshape(shape)
+        return out
+
+    @staticmethod
+    def op_Activation(node, x):
+        act = node['attrs']['act_type']
+        if act == 'relu':
+            return np.maximum(x, 0., out=x if node.get('inplace') else None)
+        if act == 'sigmoid':
+            return sigmoid(x)
+        if act == 'tanh':
+            return np.tanh(x)
+        raise NotImplementedError(f'Activation {act}')
+
+    @staticmethod
+    def op_Pooling(node, x):
+        attrs = node['attrs']
+        kh, kw = parse_tuple(attrs['kernel'])
+        sh, sw = parse_tuple(attrs.get('stride', attrs['kernel']))
+        if attrs.get('pool_type', 'max') != 'max' or (kh, kw) != (sh, sw) or parse_tuple(attrs.get('pad', '(0, 0)')) != (0, 0):
+            raise NotImplementedError(f'Pooling {attrs}')
+        ho, wo = x.shape[2] // kh, x.shape[3] // kw
+        # Maximum of strided slices, much faster than reducing on non-contiguous axes
+        out = None
+        for i in range(kh):
+            for j in range(kw):
+                part = x[:, :, i:ho * kh:kh, j:wo * kw:kw]
+                out = part.copy() if out is None else np.maximum(out, part, out=out)
+        return out
+
+    @staticmethod
+    def op_Concat(node, *args):
+        return np.concatenate(args, axis=int(node['attrs'].get('dim', 1)))
+
+    @staticmethod
+    def op__rnn_param_concat(node, *args):
+        return np.concatenate(args, axis=int(node['attrs'].get('dim', 0)))
+
+    @staticmethod
+    def op_Reshape(node, x):
+        return x.reshape(mxnet_reshape(x.shape, parse_tuple(node['attrs']['shape'])))
+
+    @staticmethod
+    def op_expand_dims(node, x):
+        return np.expand_dims(x, int(node['attrs']['axis']))
+
+    @staticmethod
+    def op_squeeze(node, x):
+        return np.squeeze(x, axis=int(node['attrs']['axis']))
+
+    @staticmethod
+    def op_transpose(node, x):
+        return np.transpose(x, parse_tuple(node['attrs']['axes']))
+
+    @staticmethod
+    def op_Dropout(node, x):
+        return x
+
+    op_BlockGrad = op_Dropout
+    op_MakeLoss = op_Dropout
+
+    @staticmethod
+    def op__zeros(node):
+        # Initial states of RNN, created in op_RNN
+        return None
+
+    @staticmethod
+    def op_FullyConnected(node, x, weight, bias=None):
+        if node['attrs'].get('flatten', 'True') == 'True':
+            x = x.reshape(x.shape[0], -1)
+        out = np.matmul(x, weight.T)
+        if bias is not None and node['attrs'].get('no_bias', 'False') != 'True':
+            out += bias
+        return out
+
+    @staticmethod
+    def op_SoftmaxActivation(node, x):
+        x = x.reshape(x.shape[0], -1)
+        x = np.exp(x - x.max(axis=1, keepdims=True))
+        return x / x.sum(axis=1, keepdims=True)
+
+    @staticmethod
+    def op_RNN(node, x, params, state=None):
+        """
+        Single layer GRU, optionally bidirectional, in the layout of mxnet and cuDNN.
+
+        Args:
+            x (np.ndarray): Shape (seq_len, batch, input_size)
+            params (np.ndarray): Flattened i2h and h2h weights of each direction, then their biases.
+        """
+        attrs = node['attrs']
+        if attrs['mode'] != 'gru' or int(attrs.get('num_layers', 1)) != 1:
+            raise NotImplementedError(f'RNN {attrs}')
+        hidden = int(attrs['state_size'])
+        directions = 2 if attrs.get('bidirectional', 'False') == 'True' else 1
+        seq_len, batch, input_size = x.shape
+
+        weights = []
+        offset = 0
+        for _ in range(directions):
+            i2h = params[offset:offset + 3 * hidden * input_size].reshape(3 * hidden, input_size)
+            offset += i2h.size
+            h2h = params[offset:offset + 3 * hidden * hidden].reshape(3 * hidden, hidden)
+            offset += h2h.size
+            weights.append([i2h, h2h])
+        for direction in range(directions):
+            weights[direction].append(params[offset:offset + 3 * hidden])
+            offset += 3 * hidden
+            weights[direction].append(params[offset:offset + 3 * hidden])
+            offset += 3 * hidden
+
+        outputs = []
+        for direction, (i2h, h2h, i2h_bias, h2h_bias) in enumerate(weights):
+            # Input projection of all steps at once
+            gates_x = np.matmul(x, i2h.T) + i2h_bias
+            h = np.zeros((batch, hidden), dtype=np.float32)
+            out = np.empty((seq_len, batch, hidden), dtype=np.float32)
+            steps = range(seq_len) if direction == 0 else range(seq_len - 1, -1, -1)
+            for t in steps:
+                gates_h = np.matmul(h, h2h.T) + h2h_bias
+                xr, xz, xn = np.split(gates_x[t], 3, axis=1)
+                hr, hz, hn = np.split(gates_h, 3, axis=1)
+                r = sigmoid(xr + hr)
+                z = sigmoid(xz + hz)
+                n = np.tanh(xn + r * hn)
+                h = (1. - z) * n + z * h
+                out[t] = h
+            outputs.append(out)
+        return np.concatenate(outputs, axis=2)
@@ -0,0 +1,222 @@
+import os
+
+import cv2
+import numpy as np
+
+from module.exception import RequestHumanTakeover
+from module.logger import logger
+from module.ocr.line_split import line_split
+from module.ocr.numpy_network import NumpyNetwork
+
+
+class NumpyOcr:
+    """
+    Run bundled cnocr models with NumPy, without importing mxnet and cnocr.
+
+    Same weights, same pre-processing and same interface as AlOcr,
+    loading a model takes milliseconds instead of seconds.
+    Only densenet-lite-gru models are supported.
+    """
+    MODEL_FILE_PREFIX = 'cnocr-v1.2.0'
+    IMG_HEIGHT = 32
+    # Image width of each output step, of densenet models
+    SEQ_LEN_CMPR_RATIO = 4
+
+    def __init__(
+            self,
+            model_name='densenet-lite-gru',
+            model_epoch=None,
+            cand_alphabet=None,
+            root='',
+            context='cpu',
+            name=None,
+    ):
+        self._model_name = model_name
+        self._model_epoch = model_epoch
+        self._model_dir = root
+        self._net = None
+        self._cand_alph_idx = None
+        # Key: str, cand_alphabet. Value: np.ndarray, mask on classes
+        self._cand_alphabet_mask = {}
+
+    def init(self):
+        prefix = os.path.join(self._model_dir, f'{self.MODEL_FILE_PREFIX}-{self._model_name}')
+        symbol_file = f'{prefix}-symbol.json'
+        params_file = '%s-%04d.params' % (prefix, self._model_epoch)
+        label_file = os.path.join(self._model_dir, 'label_cn.txt')
+        for file in [label_file, params_file, symbol_file]:
+            if not os.path.exists(file):
+                logger.warning(f'Ocr model not prepared: {self._model_dir}')
+                logger.critical(f'Please check if required files of pre-trained OCR model exist: {file}')
+                raise RequestHumanTakeover
+
+        logger.info(f'Loading OCR model: {self._model_dir} (numpy)')
+        # Same as cnocr.utils.read_charset
+        self._alphabet = [None]
+        with open(label_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.rstrip('\n')
+                self._alphabet.append(' ' if line == '<space>' else line)
+        self._inv_alph_dict = {char: index for index, char in enumerate(self._alphabet)}
+        self._net = NumpyNetwork(symbol_file, params_file)
+
+    def _ensure_model(self):
+        if self._net is None:
+            self.init()
+
+    def load(self):
+        """
+        Load model now, instead of on the first OCR call.
+        """
+        self._ensure_model()
+
+    def set_cand_alphabet(self, cand_alphabet):
+        self._ensure_model()
+        self._cand_alph_idx = None if cand_alphabet is None else self._get_cand_alphabet_mask(cand_alphabet)
+
+    def _get_cand_alphabet_mask(self, cand_alphabet):
+        """
+        Args:
+            cand_alphabet (str):
+
+        Returns:
+            np.ndarray: Shape (num_classes,), 1 on candidates and blank, 0 on others.
+        """
+        if cand_alphabet in self._cand_alphabet_mask:
+            return self._cand_alphabet_mask[cand_alphabet]
+        mask = np.zeros(len(self._alphabet), dtype='int8')
+        mask[[0] + [self._inv_alph_dict[word] for word in cand_alphabet]] = 1
+        self._cand_alphabet_mask[cand_alphabet] = mask
+        return mask
+
+    def _preprocess_img_array(self, img):
+        """
+        Same as AlOcr._preprocess_img_array()
+
+        Returns:
+            np.ndarray: Shape (1, height, width)
+        """
+        if img.ndim == 3:
+            img = cv2.cvtColor(img, cv2.COLOR_RGB2GRAY)
+        new_width = int(round(self.IMG_HEIGHT / img.shape[0] * img.shape[1]))
+        img = cv2.resize(img, (new_width, self.IMG_HEIGHT))
+        img = np.expand_dims(img, 0).astype('float32') / 255.0
+        return img
+
+    @staticmethod
+    def _pad_arrays(img_list):
+        """
+        Same as CnOcr._pad_arrays(), padding to the same width.
+        """
+        img_widths = [img.shape[2] for img in img_list]
+        max_width = max(img_widths)
+        img_list = [np.pad(img, ((0, 0), (0, 0), (0, max_width - img.shape[2])), 'constant', constant_values=0.0)
+                    for img in img_list]
+        return img_list, img_widths
+
+    def _gen_line_pred_chars(self, line_prob, img_width, max_img_width):
+        """
+        Same as AlOcr._gen_line_pred_chars()
+        """
+        class_ids = np.argmax(line_prob, axis=-1)
+        # Delete low confidence result
+        class_ids *= np.max(line_prob, axis=-1) > 0.5
+
+        if img_width < max_img_width:
+            end_idx = img_width // self.SEQ_LEN_CMPR_RATIO
+            if end_idx < len(class_ids):
+                class_ids[end_idx:] = 0
+
+        # Same as CtcMetrics.ctc_label(), remove blanks and repeats
+        result = []
+        prev = 0
+        for class_id in class_ids.tolist():
+            if class_id != 0 and class_id != prev:
+                result.append(self._alphabet[class_id])
+            prev = class_id
+        return result
+
+    def _predict(self, img_list, cand_alphabet_list):
+        """
+        Args:
+            img_list (list[np.ndarray]):
+            cand_alphabet_list (list): Mask of each image, None for no limit.
+
+        Returns:
+            list[list[str]]:
+        """
+        if len(img_list) == 0:
+            return []
+        img_list = [self._preprocess_img_array(img) for img in img_list]
+        batch_size = len(img_list)
+        img_list, img_widths = self._pad_arrays(img_list)
+
+        prob = self._net.forward(np.stack(img_list))
+        # [seq_len, batch_size, num_classes]
+        prob = np.reshape(prob, (-1, batch_size, prob.shape[1]))
+
+        max_width = max(img_widths)
+        res = []
+        for i, mask in enumerate(cand_alphabet_list):
+            line_prob = prob[:, i, :]
+            if mask is not None:
+                line_prob = line_prob * mask
+            res.append(self._gen_line_pred_chars(line_prob, img_widths[i], max_width))
+        return res
+
+    def ocr_for_single_line(self, img_fp):
+        return self.ocr_for_single_lines([img_fp])[0]
+
+    def ocr_for_single_lines(self, img_list):
+        self._ensure_model()
+        return self._predict(img_list, [self._cand_alph_idx] * len(img_list))
+
+    def atomic_ocr_for_single_line(self, img_fp, cand_alphabet=None):
+        return self.atomic_ocr_for_single_lines([img_fp], cand_alphabet)[0]
+
+    def atomic_ocr_for_single_lines(self, img_list, cand_alphabet=None):
+        return self.batch_ocr_for_single_lines(img_list, [cand_alphabet] * len(img_list))
+
+    def batch_ocr_for_single_lines(self, img_list, cand_alphabet_list):
+        """
+        Same as AlOcr.batch_ocr_for_single_lines()
+        """
+        self._ensure_model()
+        masks = [None if cand_alphabet is None else self._get_cand_alphabet_mask(cand_alphabet)
+                 for cand_alphabet in cand_alphabet_list]
+        return self._predict(img_list, masks)
+
+    def ocr(self, img_fp):
+        """
+        Same as CnOcr.ocr(), split image into lines and recognize each line.
+
+        Args:
+            img_fp (np.ndarray): Shape (height, width) or (height, width, 3)
+
+        Returns:
+            list[list[str]]:
+        """
+        self._ensure_model()
+        img = img_fp
+        if min(img.shape[0], img.shape[1]) < 2:
+            return ''
+        # Convert white letters on black background to black on white
+        if img.mean() < 145:
+            img = 255 - img
+        line_img_list = [line_img for line_img, _ in line_split(img, blank=True)]
+        return self.ocr_for_single_lines(line_img_list)
+
+    def atomic_ocr(self, img_fp, cand_alphabet=None):
+        self.set_cand_alphabet(cand_alphabet)
+        return self.ocr(img_fp)
+
+    def debug(self, img_list):
+        """
+        Args:
+            img_list: List of numpy array, (height, width)
+        """
+        from PIL import Image
+        img_list = [(self._preprocess_img_array(img) * 255.0).astype(np.uint8) for img in img_list]
+        img_list, img_widths = self._pad_arrays(img_list)
+        image = cv2.hconcat(img_list)[0, :, :]
+        Image.fromarray(image).show()
@@ -6,6 +6,8 @@ from module.base.button import Button
 from module.base.decorator import cached_property
 from module.base.utils import *
 from module.logger import logger
+from module.ocr.cache import OCR_CACHE
+from module.ocr.glyph import GLYPH_RECOGNIZER
 from module.ocr.rpc import ModelProxyFactory
 from module.webui.setting import State
 
@@ -21,6 +23,11 @@ else:
 class Ocr:
     SHOW_LOG = True
     SHOW_REVISE_WARNING = False
+    # Try template matching on glyphs before the neural model, for fixed-font text only.
+    # Opt-in per class or per object, such as `ocr.GLYPH = True`
+    GLYPH = False
+    # Serve results of identical pre-processed crops from OCR_CACHE
+    CACHE = True
 
     def __init__(self, buttons, lang='azur_lane', letter=(255, 255, 255), threshold=128, alphabet=None, name=None):
         """
@@ -76,6 +83,49 @@ class Ocr:
         """
         return result
 
+    def recognize(self, image_list):
+        """
+        Args:
+            image_list (list[np.ndarray]): Pre-processed images.
+
+        Returns:
+            list[list[str]]: Chars of each image.
+        """
+        if not self.CACHE:
+            return self._recognize(image_list)
+
+        keys = [OCR_CACHE.key(image, self.lang, self.alphabet) for image in image_list]
+        result_list = [OCR_CACHE.get(key) for key in keys]
+        missing = [index for index, result in enumerate(result_list) if result is None]
+        if missing:
+            for index, result in zip(missing, self._recognize([image_list[index] for index in missing])):
+                result_list[index] = result
+                OCR_CACHE.set(keys[index], result)
+        return result_list
+
+    def _recognize(self, image_list):
+        """
+        Args:
+            image_list (list[np.ndarray]): Pre-processed images.
+
+        Returns:
+            list[list[str]]: Chars of each image.
+        """
+        glyph = GLYPH_RECOGNIZER.get(self.lang) if self.GLYPH else None
+        if glyph is None:
+            return self.cnocr.atomic_ocr_for_single_lines(image_list, self.alphabet)
+
+        result_list = [glyph.recognize(image, self.alphabet) for image in image_list]
+        # Images with low confidence glyphs go to the neural model, and their results are learnt
+        fallback = [index for index, result in enumerate(result_list) if result is None]
+        if fallback:
+            image_fallback = [image_list[index] for index in fallback]
+            for index, image, result in zip(
+                    fallback, image_fallback, self.cnocr.atomic_ocr_for_single_lines(image_fallback, self.alphabet)):
+                result_list[index] = result
+                glyph.learn(image, result)
+        return result_list
+
     def ocr(self, image, direct_ocr=False):
         """
         Args:
@@ -95,7 +145,7 @@ class Ocr:
         # This will show the images feed to OCR model
         # self.cnocr.debug(image_list)
 
-        result_list = self.cnocr.atomic_ocr_for_single_lines(image_list, self.alphabet)
+        result_list = self.recognize(image_list)
         result_list = [''.join(result) for result in result_list]
         result_list = [self.after_process(result) for result in result_list]
 
@@ -139,7 +189,6 @@ class Digit(Ocr):
     Do OCR on a digit, such as `45`.
     Method ocr() returns int, or a list of int.
     """
-
     def __init__(self, buttons, lang='azur_lane', letter=(255, 255, 255), threshold=128, alphabet='0123456789IDSB',
                  name=None):
         super().__init__(buttons, lang=lang, letter=letter, threshold=threshold, alphabet=alphabet, name=name)
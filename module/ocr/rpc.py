@@ -1,8 +1,11 @@
 import argparse
 import multiprocessing
-import pickle
+import threading
+
+import numpy as np
 
 from module.logger import logger
+from module.ocr.transport import SharedMemoryRing, encode_image
 from module.webui.setting import State
 
 process: multiprocessing.Process = None
@@ -11,6 +14,11 @@ process: multiprocessing.Process = None
 class ModelProxy:
     client = None
     online = True
+    # Shared memory transport to a local OCR server, None to send images in bytes
+    ring: SharedMemoryRing = None
+    # Held from encoding images until server replies,
+    # so another thread won't overwrite the ring while server is reading it
+    lock = threading.Lock()
 
     @classmethod
     def init(cls, address="127.0.0.1:22268"):
@@ -25,6 +33,20 @@ class ModelProxy:
         except:
             cls.online = False
             logger.warning("Ocr server not running")
+            return
+
+        host = address.rsplit(':', 1)[0]
+        if host in ['127.0.0.1', 'localhost']:
+            try:
+                cls.ring = SharedMemoryRing()
+                # Server may run on a python without shared memory support
+                cls.client.check_transport(cls.ring.encode_list([np.zeros((2, 2), dtype=np.uint8)])[0])
+                logger.info('Using shared memory to transport images')
+            except Exception as e:
+                logger.info(f'Shared memory unavailable, transport images in bytes: {e}')
+                if cls.ring is not None:
+                    cls.ring.close()
+                    cls.ring = None
 
     @classmethod
     def close(cls):
@@ -33,10 +55,38 @@ class ModelProxy:
             cls.client.close()
             logger.info('Successfully disconnected to OCR server')
             cls.client = None
+        if cls.ring is not None:
+            cls.ring.close()
+            cls.ring = None
 
     def __init__(self, lang) -> None:
         self.lang = lang
 
+    def encode(self, img_fp):
+        """
+        Args:
+            img_fp (np.ndarray):
+
+        Returns:
+            list: Image in transport format, see module/ocr/transport.py
+        """
+        if self.ring is not None:
+            self.ring.reset()
+            return self.ring.encode(img_fp)
+        return encode_image(img_fp)
+
+    def encode_list(self, img_list):
+        """
+        Args:
+            img_list (list[np.ndarray]):
+
+        Returns:
+            list[list]:
+        """
+        if self.ring is not None:
+            return self.ring.encode_list(img_list)
+        return [encode_image(img_fp) for img_fp in img_list]
+
     def ocr(self, img_fp):
         """
         Args:
@@ -46,11 +96,12 @@ class ModelProxy:
 
         """
         if self.online:
-            img_str = img_fp.dumps()
-            try:
-                return self.client("ocr", self.lang, img_str)
-            except:
-                self.online = False
+            with self.lock:
+                img_str = self.encode(img_fp)
+                try:
+                    return self.client("ocr", self.lang, img_str)
+                except:
+                    self.online = False
         from module.ocr.models import OCR_MODEL
         return OCR_MODEL.__getattribute__(self.lang).ocr(img_fp)
 
@@ -63,11 +114,12 @@ class ModelProxy:
 
         """
         if self.online:
-            img_str = img_fp.dumps()
-            try:
-                return self.client("ocr_for_single_line", self.lang, img_str)
-            except:
-                self.online = False
+            with self.lock:
+                img_str = self.encode(img_fp)
+                try:
+                    return self.client("ocr_for_single_line", self.lang, img_str)
+                except:
+                    self.online = False
         from module.ocr.models import OCR_MODEL
         return OCR_MODEL.__getattribute__(self.lang).ocr_for_single_line(img_fp)
 
@@ -80,11 +132,12 @@ class ModelProxy:
 
         """
         if self.online:
-            img_str_list = [img_fp.dumps() for img_fp in img_list]
-            try:
-                return self.client("ocr_for_single_lines", self.lang, img_str_list)
-            except:
-                self.online = False
+            with self.lock:
+                img_str_list = self.encode_list(img_list)
+                try:
+                    return self.client("ocr_for_single_lines", self.lang, img_str_list)
+                except:
+                    self.online = False
         from module.ocr.models import OCR_MODEL
         return OCR_MODEL.__getattribute__(self.lang).ocr_for_single_lines(img_list)
 
@@ -107,11 +160,12 @@ class ModelProxy:
 
         """
         if self.online:
-            img_str = img_fp.dumps()
-            try:
-                return self.client("atomic_ocr", self.lang, img_str, cand_alphabet)
-            except:
-                self.online = False
+            with self.lock:
+                img_str = self.encode(img_fp)
+                try:
+                    return self.client("atomic_ocr", self.lang, img_str, cand_alphabet)
+                except:
+                    self.online = False
         from module.ocr.models import OCR_MODEL
         return OCR_MODEL.__getattribute__(self.lang).atomic_ocr(img_fp, cand_alphabet)
 
@@ -125,11 +179,12 @@ class ModelProxy:
 
         """
         if self.online:
-            img_str = img_fp.dumps()
-            try:
-                return self.client("atomic_ocr_for_single_line", self.lang, img_str, cand_alphabet)
-            except:
-                self.online = False
+            with self.lock:
+                img_str = self.encode(img_fp)
+                try:
+                    return self.client("atomic_ocr_for_single_line", self.lang, img_str, cand_alphabet)
+                except:
+                    self.online = False
         from module.ocr.models import OCR_MODEL
         return OCR_MODEL.__getattribute__(self.lang).atomic_ocr_for_single_line(img_fp, cand_alphabet)
 
@@ -143,11 +198,12 @@ class ModelProxy:
 
         """
         if self.online:
-            img_str_list = [img_fp.dumps() for img_fp in img_list]
-            try:
-                return self.client("atomic_ocr_for_single_lines", self.lang, img_str_list, cand_alphabet)
-            except:
-                self.online = False
+            with self.lock:
+                img_str_list = self.encode_list(img_list)
+                try:
+                    return self.client("atomic_ocr_for_single_lines", self.lang, img_str_list, cand_alphabet)
+                except:
+                    self.online = False
         from module.ocr.models import OCR_MODEL
         return OCR_MODEL.__getattribute__(self.lang).atomic_ocr_for_single_lines(img_list, cand_alphabet)
 
@@ -160,11 +216,12 @@ class ModelProxy:
 
         """
         if self.online:
-            img_str_list = [img_fp.dumps() for img_fp in img_list]
-            try:
-                return self.client("debug", self.lang, img_str_list)
-            except:
-                self.online = False
+            with self.lock:
+                img_str_list = self.encode_list(img_list)
+                try:
+                    return self.client("debug", self.lang, img_str_list)
+                except:
+                    self.online = False
         from module.ocr.models import OCR_MODEL
         return OCR_MODEL.__getattribute__(self.lang).debug(img_list)
 
@@ -182,28 +239,80 @@ class ModelProxyFactory:
         ModelProxy.close()
 
 
-def start_ocr_server(port=22268):
+def start_ocr_server(port=22268, max_batch=64, max_wait=0.005):
+    """
+    Args:
+        port (int):
+        max_batch (int): Maximum images in one inference batch.
+        max_wait (float): Seconds to wait for requests from other instances before inference.
+    """
     import zerorpc
     import zmq
+    from gevent.local import local
     from module.ocr.al_ocr import AlOcr
+    from module.ocr.batcher import OcrBatcher
     from module.ocr.models import OcrModel
+    from module.ocr.transport import ImageDecoder, is_loopback
+
+    # Each request runs in its own greenlet
+    request = local()
+
+    class PeerMiddleware:
+        """
+        Record whether the current request comes from loopback,
+        using the peer address that zmq attaches to received frames.
+        """
+
+        def server_before_exec(self, request_event):
+            loopback = False
+            for frame in request_event.identity or []:
+                try:
+                    loopback = is_loopback(frame.get('Peer-Address'))
+                except Exception:
+                    # Not a zmq.Frame or libzmq too old to report peer address
+                    pass
+                break
+            request.loopback = loopback
 
     class OCRServer(OcrModel):
+        def __init__(self):
+            # Key: str, lang. Value: OcrBatcher
+            self.batchers = {}
+            self.decoder = ImageDecoder()
+
+        def decode(self, img_fp):
+            return self.decoder.decode(img_fp, allow_shm=getattr(request, 'loopback', False))
+
+        def decode_list(self, img_list):
+            return self.decoder.decode_list(img_list, allow_shm=getattr(request, 'loopback', False))
+
+        def get_batcher(self, lang) -> OcrBatcher:
+            if lang not in self.batchers:
+                self.batchers[lang] = OcrBatcher(
+                    self.__getattribute__(lang), max_batch=max_batch, max_wait=max_wait, name=lang)
+            return self.batchers[lang]
+
         def hello(self):
             return "hello"
 
+        def check_transport(self, img_fp):
+            return list(self.decode(img_fp).shape)
+
+        def stats(self):
+            return {lang: batcher.stats for lang, batcher in self.batchers.items()}
+
         def ocr(self, lang, img_fp):
-            img_fp = pickle.loads(img_fp)
+            img_fp = self.decode(img_fp)
             cnocr: AlOcr = self.__getattribute__(lang)
             return cnocr.ocr(img_fp)
 
         def ocr_for_single_line(self, lang, img_fp):
-            img_fp = pickle.loads(img_fp)
+            img_fp = self.decode(img_fp)
             cnocr: AlOcr = self.__getattribute__(lang)
             return cnocr.ocr_for_single_line(img_fp)
 
         def ocr_for_single_lines(self, lang, img_list):
-            img_list = [pickle.loads(img_fp) for img_fp in img_list]
+            img_list = self.decode_list(img_list)
             cnocr: AlOcr = self.__getattribute__(lang)
             return cnocr.ocr_for_single_lines(img_list)
 
@@ -212,26 +321,26 @@ def start_ocr_server(port=22268):
             return cnocr.set_cand_alphabet(cand_alphabet)
 
         def atomic_ocr(self, lang, img_fp, cand_alphabet):
-            img_fp = pickle.loads(img_fp)
+            img_fp = self.decode(img_fp)
             cnocr: AlOcr = self.__getattribute__(lang)
             return cnocr.atomic_ocr(img_fp, cand_alphabet)
 
         def atomic_ocr_for_single_line(self, lang, img_fp, cand_alphabet):
-            img_fp = pickle.loads(img_fp)
-            cnocr: AlOcr = self.__getattribute__(lang)
-            return cnocr.atomic_ocr_for_single_line(img_fp, cand_alphabet)
+            img_fp = self.decode(img_fp)
+            return self.get_batcher(lang).submit([img_fp], cand_alphabet)[0]
 
         def atomic_ocr_for_single_lines(self, lang, img_list, cand_alphabet):
-            img_list = [pickle.loads(img_fp) for img_fp in img_list]
-            cnocr: AlOcr = self.__getattribute__(lang)
-            return cnocr.atomic_ocr_for_single_lines(img_list, cand_alphabet)
+            img_list = self.decode_list(img_list)
+            return self.get_batcher(lang).submit(img_list, cand_alphabet)
 
         def debug(self, lang, img_list):
-            img_list = [pickle.loads(img_fp) for img_fp in img_list]
+            img_list = self.decode_list(img_list)
             cnocr: AlOcr = self.__getattribute__(lang)
             return cnocr.debug(img_list)
 
-    server = zerorpc.Server(OCRServer())
+    context = zerorpc.Context()
+    context.register_middleware(PeerMiddleware())
+    server = zerorpc.Server(OCRServer(), context=context)
     try:
         server.bind(f"tcp://*:{port}")
     except zmq.error.ZMQError:
@@ -241,10 +350,10 @@ def start_ocr_server(port=22268):
     server.run()
 
 
-def start_ocr_server_process(port=22268):
+def start_ocr_server_process(port=22268, max_batch=64, max_wait=0.005):
     global process
     if not alive():
-        process = multiprocessing.Process(target=start_ocr_server, args=(port,))
+        process = multiprocessing.Process(target=start_ocr_server, args=(port, max_batch, max_wait))
         process.start()
 
 
@@ -271,6 +380,18 @@ if __name__ == "__main__":
         type=int,
         help="Port to listen. Default to OcrServerPort in deploy setting",
     )
+    parser.add_argument(
+        "--max-batch",
+        type=int,
+        default=64,
+        help="Maximum images in one inference batch. Default to 64",
+    )
+    parser.add_argument(
+        "--max-wait",
+        type=float,
+        default=0.005,
+        help="Seconds to wait for requests from other instances before inference. Default to 0.005",
+    )
     args, _ = parser.parse_known_args()
     port = args.port or State.deploy_config.OcrServerPort
-    start_ocr_server(port=port)
+    start_ocr_server(port=port, max_batch=args.max_batch, max_wait=args.max_wait)
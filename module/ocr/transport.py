@@ -0,0 +1,238 @@
+import ipaddress
+import os
+import re
+import secrets
+from collections import OrderedDict
+
+import numpy as np
+
+from module.logger import logger
+
+try:
+    # Python >= 3.8
+    from multiprocessing import shared_memory
+except ImportError:
+    shared_memory = None
+
+# Image transport of OCR rpc, msgpack encoded lists instead of pickle,
+# so the server never unpickles data from the network.
+# [TRANSPORT_BYTES, data, shape, dtype]
+TRANSPORT_BYTES = 0
+# [TRANSPORT_SHM, name, offset, shape, dtype]
+TRANSPORT_SHM = 1
+# Image data types allowed on the wire
+VALID_DTYPE = ['|u1', '|i1', '<u2', '<i2', '<f4', '<f8']
+# Shared memory segments created by SharedMemoryRing, server attaches nothing else
+SHM_PREFIX = 'alas_ocr_'
+SHM_NAME = re.compile(rf'^/?{SHM_PREFIX}\d+_[0-9a-f]{{8}}$')
+
+
+def is_loopback(address):
+    """
+    Args:
+        address (str, bytes): IP address, such as `127.0.0.1`, `::1`, `::ffff:127.0.0.1`
+
+    Returns:
+        bool:
+    """
+    try:
+        address = ipaddress.ip_address(_to_str(address))
+    except ValueError:
+        return False
+    if getattr(address, 'ipv4_mapped', None) is not None:
+        address = address.ipv4_mapped
+    return address.is_loopback
+
+
+def _to_str(value):
+    # msgpack may return str as bytes, depending on version
+    if isinstance(value, bytes):
+        return value.decode('utf-8')
+    return value
+
+
+def _parse_array_info(shape, dtype):
+    """
+    Args:
+        shape (list[int]):
+        dtype (str, bytes):
+
+    Returns:
+        tuple[tuple[int], np.dtype, int]: shape, dtype, number of bytes.
+
+    Raises:
+        ValueError: If shape or dtype is invalid.
+    """
+    dtype = _to_str(dtype)
+    if dtype not in VALID_DTYPE:
+        raise ValueError(f'Invalid image dtype: {dtype}')
+    dtype = np.dtype(dtype)
+    shape = tuple(int(i) for i in shape)
+    if not 1 <= len(shape) <= 3 or any(i < 0 for i in shape):
+        raise ValueError(f'Invalid image shape: {shape}')
+    return shape, dtype, int(np.prod(shape)) * dtype.itemsize
+
+
+def encode_image(image):
+    """
+    Args:
+        image (np.ndarray):
+
+    Returns:
+        list: [TRANSPORT_BYTES, data, shape, dtype]
+    """
+    image = np.ascontiguousarray(image)
+    return [TRANSPORT_BYTES, image.tobytes(), list(image.shape), image.dtype.str]
+
+
+class SharedMemoryRing:
+    """
+    Client side of shared memory transport.
+
+    Images are copied into a shared memory segment created by client,
+    only the name, offset, shape and dtype are sent to server.
+    OCR calls are synchronous, so the ring restarts from the beginning on every call.
+    """
+
+    def __init__(self, size=4 * 1024 * 1024):
+        """
+        Args:
+            size (int): Bytes of shared memory.
+
+        Raises:
+            OSError: If shared memory is not available.
+        """
+        if shared_memory is None:
+            raise OSError('multiprocessing.shared_memory requires Python >= 3.8')
+        name = f'{SHM_PREFIX}{os.getpid()}_{secrets.token_hex(4)}'
+        self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        self.size = size
+        self.offset = 0
+
+    def reset(self):
+        self.offset = 0
+
+    def encode(self, image):
+        """
+        Args:
+            image (np.ndarray):
+
+        Returns:
+            list: [TRANSPORT_SHM, name, offset, shape, dtype],
+                or [TRANSPORT_BYTES, ...] if ring is full.
+        """
+        image = np.ascontiguousarray(image)
+        if self.shm is None or image.dtype.str not in VALID_DTYPE or self.offset + image.nbytes > self.size:
+            return encode_image(image)
+
+        offset = self.offset
+        buffer = np.ndarray(image.shape, dtype=image.dtype, buffer=self.shm.buf, offset=offset)
+        buffer[...] = image
+        del buffer
+        # Align to 64 bytes
+        self.offset += image.nbytes + (-image.nbytes % 64)
+        return [TRANSPORT_SHM, self.shm.name, offset, list(image.shape), image.dtype.str]
+
+    def encode_list(self, img_list):
+        """
+        Args:
+            img_list (list[np.ndarray]):
+
+        Returns:
+            list[list]:
+        """
+        self.reset()
+        return [self.encode(image) for image in img_list]
+
+    def close(self):
+        if self.shm is not None:
+            self.shm.close()
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
+            self.shm = None
+
+
+class ImageDecoder:
+    """
+    Server side of image transport.
+
+    Shared memory transport is accepted only when caller allows it, that is, the request comes from loopback,
+    and only for segments named by SharedMemoryRing, so network clients can't make server read other memory.
+    """
+
+    def __init__(self, max_segments=32):
+        """
+        Args:
+            max_segments (int): Maximum shared memory segments kept attached.
+        """
+        self.max_segments = max_segments
+        # Key: str, name. Value: SharedMemory
+        self.segments = OrderedDict()
+
+    def _attach(self, name):
+        if name in self.segments:
+            self.segments.move_to_end(name)
+            return self.segments[name]
+        if shared_memory is None:
+            raise ValueError('Shared memory transport is not supported')
+        if not SHM_NAME.match(name):
+            raise ValueError(f'Invalid shared memory name: {name}')
+
+        shm = shared_memory.SharedMemory(name=name)
+        try:
+            # Segment is owned by client, don't let resource tracker of server unlink it
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(shm._name, 'shared_memory')
+        except (ImportError, AttributeError, KeyError):
+            pass
+        self.segments[name] = shm
+        while len(self.segments) > self.max_segments:
+            _, old = self.segments.popitem(last=False)
+            old.close()
+        logger.info(f'Shared memory attached: {name}')
+        return shm
+
+    def decode(self, data, allow_shm=False):
+        """
+        Args:
+            data (list): Output of encode_image() or SharedMemoryRing.encode()
+            allow_shm (bool): Whether to accept shared memory transport, True only for loopback clients.
+
+        Returns:
+            np.ndarray: A copy owned by server.
+
+        Raises:
+            ValueError: If data is invalid.
+        """
+        if not isinstance(data, (list, tuple)) or not data:
+            raise ValueError('Invalid image transport, client may be outdated')
+
+        if data[0] == TRANSPORT_BYTES and len(data) == 4:
+            _, buffer, shape, dtype = data
+            shape, dtype, nbytes = _parse_array_info(shape, dtype)
+            if len(buffer) != nbytes:
+                raise ValueError(f'Image data size mismatch: {len(buffer)} != {nbytes}')
+            return np.frombuffer(buffer, dtype=dtype).reshape(shape).copy()
+
+        if data[0] == TRANSPORT_SHM and len(data) == 5:
+            if not allow_shm:
+                raise ValueError('Shared memory transport is only allowed from localhost')
+            _, name, offset, shape, dtype = data
+            shape, dtype, nbytes = _parse_array_info(shape, dtype)
+            shm = self._attach(_to_str(name))
+            offset = int(offset)
+            if offset < 0 or offset + nbytes > shm.size:
+                raise ValueError(f'Image out of shared memory: offset={offset}, size={nbytes}')
+            return np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=offset).copy()
+
+        raise ValueError('Invalid image transport, client may be outdated')
+
+    def decode_list(self, img_list, allow_shm=False):
+        return [self.decode(data, allow_shm=allow_shm) for data in img_list]
+
+    def close(self):
+        for shm in self.segments.values():
+            shm.close()
+        self.segments.clear()
@@ -1,5 +1,4 @@
 import numpy as np
-from scipy import signal
 
 from module.base.base import ModuleBase
 from module.base.button import Button
@@ -236,6 +235,7 @@ class AdaptiveScroll(Scroll):
             'width': 2,
         }
         parameters.update(self.parameters)
+        from scipy import signal
         peaks, _ = signal.find_peaks(image, **parameters)
         peaks //= wlen
 
@@ -1,4 +1,4 @@
-from module.base.button import Button
+from module.base.button import Button, ButtonSet
 from module.base.decorator import run_once
 from module.base.timer import Timer
 from module.combat.assets import GET_ITEMS_1, GET_ITEMS_2, GET_SHIP
@@ -231,6 +231,8 @@ class UI(InfoHandler):
         # Create connection
         Page.init_connection(destination)
         self.interval_clear(list(Page.iter_check_buttons()))
+        pages = [page for page in Page.iter_pages() if page.parent is not None and page.check_button is not None]
+        check_buttons = ButtonSet([page.check_button for page in pages], name='PAGE_CHECK')
 
         logger.hr(f"UI goto {destination}")
         while 1:
@@ -246,18 +248,13 @@ class UI(InfoHandler):
                 break
 
             # Other pages
-            clicked = False
-            for page in Page.iter_pages():
-                if page.parent is None or page.check_button is None:
-                    continue
-                if self.appear(page.check_button, offset=offset, interval=5):
-                    logger.info(f'Page switch: {page} -> {page.parent}')
-                    button = page.links[page.parent]
-                    self.device.click(button)
-                    self.ui_button_interval_reset(button)
-                    clicked = True
-                    break
-            if clicked:
+            appear = self.appear_any(check_buttons, offset=offset, interval=5)
+            if appear is not None:
+                page = [page for page in pages if page.check_button is appear][0]
+                logger.info(f'Page switch: {page} -> {page.parent}')
+                button = page.links[page.parent]
+                self.device.click(button)
+                self.ui_button_interval_reset(button)
                 continue
 
             # Additional
@@ -541,7 +538,7 @@ class UI(InfoHandler):
 
         # Idle page
         if self.get_interval_timer(IDLE, interval=3).reached():
-            if IDLE.match_luma(self.device.image, offset=(5, 5)):
+            if self.match_luma(IDLE, offset=(5, 5)):
                 logger.info(f'UI additional: {IDLE} -> {REWARD_GOTO_MAIN}')
                 self.device.click(REWARD_GOTO_MAIN)
                 self.get_interval_timer(IDLE).reset()
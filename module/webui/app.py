@@ -64,6 +64,7 @@ from module.webui.pin import put_input, put_select
 from module.webui.process_manager import ProcessManager
 from module.webui.remote_access import RemoteAccess
 from module.webui.setting import State
+from module.webui.supervisor import start_supervisor_process, stop_supervisor_process
 from module.webui.updater import updater
 from module.webui.utils import (
     Icon,
@@ -1537,6 +1538,8 @@ def startup():
         init_discord_rpc()
     if State.deploy_config.StartOcrServer:
         start_ocr_server_process(State.deploy_config.OcrServerPort)
+    if State.deploy_config.EnableSupervisor:
+        start_supervisor_process()
     if (
         State.deploy_config.EnableRemoteAccess
         and State.deploy_config.Password is not None
@@ -1555,6 +1558,7 @@ def clearup():
     stop_ocr_server_process()
     for alas in ProcessManager._processes.values():
         alas.stop()
+    stop_supervisor_process()
     State.clearup()
     task_handler.stop()
     logger.info("Alas closed.")
@@ -14,6 +14,7 @@ from module.logger import logger, set_file_logger, set_func_logger
 from module.submodule.submodule import load_mod
 from module.submodule.utils import get_available_mod, get_available_mod_func, get_config_mod, get_func_mod, list_mod_instance
 from module.webui.setting import State
+from module.webui.supervisor import SupervisedProcess, supervisor_start
 
 
 class ProcessManager:
@@ -25,13 +26,19 @@ class ProcessManager:
         self.renderables: List[ConsoleRenderable] = []
         self.renderables_max_length = 400
         self.renderables_reduce_length = 80
-        self._process: Process = None
+        self._process: Union[Process, SupervisedProcess] = None
         self.thd_log_queue_handler: threading.Thread = None
 
     def start(self, func, ev: threading.Event = None) -> None:
         if not self.alive:
             if func is None:
                 func = get_config_mod(self.config_name)
+            if State.deploy_config.EnableSupervisor:
+                self._process = supervisor_start(self.config_name, func, self._renderable_queue, ev)
+                if self._process is not None:
+                    logger.info(f"[{self.config_name}] forked from supervisor, pid: {self._process.pid}")
+                    self.start_log_queue_handler()
+                    return
             self._process = Process(
                 target=ProcessManager.run_process,
                 args=(
@@ -59,6 +59,8 @@ class State:
     manager: SyncManager = None
     electron: bool = False
     theme: str = "default"
+    # Running in supervisor or instances forked from it
+    supervised: bool = False
 
     @classmethod
     def init(cls):
@@ -0,0 +1,357 @@
+import gc
+import importlib
+import multiprocessing
+import os
+import threading
+import time
+
+from module.logger import logger
+from module.webui.setting import State
+
+process: multiprocessing.Process = None
+connection = None
+# Requests from webui threads share one pipe
+lock = threading.Lock()
+# In instances forked from supervisor, pipe to report that instance is ready
+ready_pipe = None
+
+# Modules that every instance imports on startup
+PRELOAD_MODULES = [
+    'alas',
+    'module.device.device',
+    'module.handler.login',
+    'module.ui.ui',
+    'module.campaign.run',
+    'module.os.operation_siren',
+]
+# OCR models used by almost all tasks, the others are loaded by instances on demand
+PRELOAD_OCR_MODELS = ['azur_lane', 'cnocr']
+
+
+def supervisor_available() -> bool:
+    """
+    Returns:
+        bool: Whether instances can be forked from a supervisor on this platform.
+    """
+    return hasattr(os, 'fork')
+
+
+class Supervisor:
+    """
+    A warm parent of Alas instances.
+
+    Supervisor imports modules, loads OCR models and the asset bundle once,
+    then forks an instance for each start request from webui.
+    Instances start without importing anything and share preloaded memory with
+    the supervisor and each other, pages are copied only when an instance writes to them.
+
+    Supervisor stays single-threaded, forking a process with running threads may deadlock.
+    Assets are not preloaded since they depend on the server of each instance,
+    but images in the asset bundle are memory-mapped and shared anyway.
+    """
+
+    def __init__(self, conn):
+        """
+        Args:
+            conn (multiprocessing.connection.Connection): Pipe to webui.
+        """
+        self.conn = conn
+        # Key: config_name. Value: multiprocessing.Process
+        self.instances = {}
+        # Key: config_name. Value: Cost to start in seconds, from webui request to instance ready
+        self.startup = {}
+        # Key: config_name. Value: tuple[Connection, float], ready pipe and request time,
+        # of instances not ready yet
+        self.pending = {}
+
+    def preload(self):
+        logger.hr('Supervisor preload', level=1)
+        start = time.time()
+        # Instances forked from supervisor keep OCR models loaded here
+        State.supervised = True
+
+        for name in PRELOAD_MODULES:
+            try:
+                importlib.import_module(name)
+            except Exception as e:
+                logger.warning(f'Failed to preload {name}: {e}')
+
+        if not State.deploy_config.UseOcrServer:
+            from module.ocr.models import OCR_MODEL
+            for name in PRELOAD_OCR_MODELS:
+                try:
+                    getattr(OCR_MODEL, name).load()
+                except Exception as e:
+                    logger.warning(f'Failed to preload OCR model {name}: {e}')
+
+        from module.base.asset_bundle import ASSET_BUNDLE
+        if ASSET_BUNDLE.index:
+            _ = ASSET_BUNDLE.data
+
+        # Objects created so far are shared with instances,
+        # move them out of GC tracking so collections in instances don't write to their pages
+        gc.collect()
+        gc.freeze()
+        logger.info(f'Supervisor preloaded in {round(time.time() - start, 3)}s')
+        self.show()
+
+    def start(self, config_name, func, q, ev, requested):
+        """
+        Args:
+            config_name (str):
+            func (str):
+            q (queue.Queue): Log queue of the instance.
+            ev (threading.Event): Stop event.
+            requested (float): Timestamp when webui requested to start.
+
+        Returns:
+            int: pid of the instance, or 0 if failed to start.
+        """
+        context = multiprocessing.get_context('fork')
+        reader, writer = context.Pipe(duplex=False)
+        instance = context.Process(
+            target=run_instance,
+            args=(writer, config_name, func, q, ev),
+        )
+        try:
+            instance.start()
+        except OSError as e:
+            logger.error(f'[{config_name}] failed to fork from supervisor: {e}')
+            reader.close()
+            return 0
+        finally:
+            writer.close()
+        self.instances[config_name] = instance
+        self.startup.pop(config_name, None)
+        self.pending[config_name] = (reader, requested)
+        logger.info(f'[{config_name}] forked from supervisor in {round(time.time() - requested, 3)}s')
+        return instance.pid
+
+    def check_ready(self):
+        """
+        Receive ready reports from instances.
+        """
+        for config_name, (reader, requested) in list(self.pending.items()):
+            try:
+                if not reader.poll():
+                    continue
+                ready = reader.recv()
+            except (EOFError, OSError):
+                # Exited before ready, or not an Alas scheduler that reports
+                ready = None
+            reader.close()
+            self.pending.pop(config_name, None)
+            if ready is not None:
+                self.startup[config_name] = ready - requested
+                logger.info(f'[{config_name}] ready in {round(self.startup[config_name], 3)}s')
+                self.show()
+
+    def reap(self):
+        """
+        Join exited instances.
+        """
+        for config_name, instance in list(self.instances.items()):
+            if instance.is_alive():
+                continue
+            instance.join()
+            logger.info(f'[{config_name}] exited, exitcode: {instance.exitcode}')
+            self.instances.pop(config_name, None)
+            self.startup.pop(config_name, None)
+            reader, _ = self.pending.pop(config_name, (None, None))
+            if reader is not None:
+                reader.close()
+            self.show()
+
+    @staticmethod
+    def memory(pid):
+        """
+        Args:
+            pid (int):
+
+        Returns:
+            str: Such as `rss 210.3MB, uss 45.1MB`.
+                USS is the memory unique to a process, which would be freed if the process exits.
+        """
+        import psutil
+        try:
+            p = psutil.Process(pid)
+            rss = p.memory_info().rss
+        except psutil.Error:
+            return 'exited'
+        try:
+            uss = p.memory_full_info().uss
+        except psutil.Error:
+            return f'rss {round(rss / 1048576, 1)}MB'
+        return f'rss {round(rss / 1048576, 1)}MB, uss {round(uss / 1048576, 1)}MB'
+
+    def show(self):
+        logger.attr('Supervisor', self.memory(os.getpid()))
+        for config_name, instance in self.instances.items():
+            if config_name in self.startup:
+                startup = f'{round(self.startup[config_name] * 1000, 1)}ms'
+            else:
+                startup = 'pending'
+            logger.attr(config_name, f'pid {instance.pid}, {self.memory(instance.pid)}, startup {startup}')
+
+    def loop(self):
+        while 1:
+            self.check_ready()
+            self.reap()
+            try:
+                if not self.conn.poll(1):
+                    continue
+                request = self.conn.recv()
+            except (EOFError, OSError):
+                logger.info('Webui disconnected, supervisor exit')
+                return
+
+            command, args = request[0], request[1:]
+            if command == 'start':
+                self.conn.send(self.start(*args))
+            else:
+                logger.warning(f'Unknown supervisor request: {command}')
+                self.conn.send(None)
+
+
+def run_instance(ready, config_name, func, q, ev):
+    """
+    Entry of instances forked from supervisor.
+
+    Args:
+        ready (multiprocessing.connection.Connection): Pipe to report ready, see supervisor_ready()
+        config_name (str):
+        func (str):
+        q (queue.Queue): Log queue of the instance.
+        ev (threading.Event): Stop event.
+    """
+    global ready_pipe
+    ready_pipe = ready
+    from module.webui.process_manager import ProcessManager
+    ProcessManager.run_process(config_name, func, q, ev)
+
+
+def supervisor_ready():
+    """
+    Report to supervisor that instance has loaded its config and started scheduler loop.
+    Does nothing if instance is not forked from supervisor or already reported.
+    """
+    global ready_pipe
+    if ready_pipe is None:
+        return
+    try:
+        ready_pipe.send(time.time())
+    except OSError:
+        pass
+    ready_pipe.close()
+    ready_pipe = None
+
+
+def run_supervisor(conn):
+    global connection
+    # Close the webui end inherited from fork, so supervisor gets EOF when webui exits
+    if connection is not None:
+        connection.close()
+        connection = None
+    supervisor = Supervisor(conn)
+    supervisor.preload()
+    supervisor.loop()
+
+
+class SupervisedProcess:
+    """
+    Handle of an instance forked by supervisor, with the same interface as multiprocessing.Process
+    that ProcessManager uses.
+    """
+
+    def __init__(self, pid):
+        """
+        Args:
+            pid (int):
+        """
+        import psutil
+        self.pid = pid
+        try:
+            # psutil.Process remembers create time, a reused pid won't be taken as alive
+            self._process = psutil.Process(pid)
+        except psutil.Error:
+            self._process = None
+
+    def is_alive(self) -> bool:
+        import psutil
+        if self._process is None:
+            return False
+        try:
+            # Exited instances are zombies until supervisor reaps them
+            return self._process.is_running() and self._process.status() != psutil.STATUS_ZOMBIE
+        except psutil.Error:
+            return False
+
+    def kill(self) -> None:
+        import psutil
+        if self._process is None:
+            return
+        try:
+            self._process.kill()
+        except psutil.Error:
+            pass
+
+
+def supervisor_start(config_name, func, q, ev=None):
+    """
+    Start an instance from supervisor.
+
+    Args:
+        config_name (str):
+        func (str):
+        q (queue.Queue): Log queue of the instance.
+        ev (threading.Event): Stop event.
+
+    Returns:
+        SupervisedProcess: Or None if supervisor is not running or failed to start.
+    """
+    if not alive():
+        return None
+    with lock:
+        try:
+            connection.send(('start', config_name, func, q, ev, time.time()))
+            # Supervisor is busy preloading on first request
+            if not connection.poll(60):
+                logger.warning('Supervisor does not respond within 60 seconds')
+                return None
+            pid = connection.recv()
+        except (EOFError, OSError) as e:
+            logger.warning(f'Failed to request supervisor: {e}')
+            return None
+    if not pid:
+        return None
+    return SupervisedProcess(pid)
+
+
+def start_supervisor_process():
+    global process, connection
+    if not supervisor_available():
+        logger.warning('Supervisor requires fork(), instances will start as new processes')
+        return
+    if not alive():
+        connection, child = multiprocessing.Pipe()
+        process = multiprocessing.Process(target=run_supervisor, args=(child,))
+        process.start()
+        child.close()
+
+
+def stop_supervisor_process():
+    global process, connection
+    if alive():
+        process.kill()
+        process = None
+    if connection is not None:
+        connection.close()
+        connection = None
+
+
+def alive() -> bool:
+    global process
+    if process is not None:
+        return process.is_alive()
+    else:
+        return False
@@ -103,6 +103,11 @@ Deploy:
   Misc:
     # Enable discord rich presence
     DiscordRichPresence: false
+    # Start alas instances by forking a supervisor process which has modules and OCR models preloaded
+    # Instances start in less than a second, and share memory of preloaded things
+    # Not available on Windows, instances will start as new processes
+    # [Default] false
+    EnableSupervisor: false
 
   RemoteAccess:
     # Enable remote access (using ssh reverse tunnel serve by https://github.com/wang0618/localshare)